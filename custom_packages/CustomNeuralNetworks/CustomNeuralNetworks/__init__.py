@@ -1,6 +1,8 @@
+from .precision_policy import * # noqa
 from .unet import * # noqa
 from .vgg19_unet import * # noqa
 from .resnet50_unet import * # noqa
+from .sparse_labels import * # noqa
 
 from pkg_resources import get_distribution, DistributionNotFound
 try:
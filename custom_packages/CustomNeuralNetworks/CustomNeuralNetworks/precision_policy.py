@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script implements the helpers that build the models under a mixed
+# precision policy (https://www.tensorflow.org/guide/mixed_precision). With a
+# mixed policy, the layers compute in 16 bits whilst their weights are kept
+# in float32, which halves the memory taken by the activations and allows
+# larger batches. bfloat16 is used on CPU (and TPU), as it has the same range
+# of float32 and needs no loss scaling, whilst float16 is used on GPU.
+#
+# Author: Davide Lomeo,
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import tensorflow as tf
+
+__all__ = ['get_mixed_policy', 'build_with_policy']
+
+
+def get_mixed_policy():
+    """
+    Function that returns the name of the mixed precision policy suited to
+    the available devices: 'mixed_float16' if a GPU is available and
+    'mixed_bfloat16' otherwise.
+
+    Returns
+    -------
+    str
+        The name of the mixed precision policy
+    """
+
+    if tf.config.list_physical_devices('GPU') != []:
+        return 'mixed_float16'
+
+    return 'mixed_bfloat16'
+
+
+def build_with_policy(build_function, input_shape, mixed_precision):
+    """
+    Function that calls the input function building a model under the
+    mixed precision policy, if mixed_precision is True, restoring the
+    previous global policy afterwards, so that the models built later
+    are not affected.
+
+    Parameters
+    ----------
+    build_function : function
+        Function that builds the model from the input shape
+    input_shape : tuple
+        Tuple containing the sizes of the input image (H, W, bands)
+    mixed_precision : bool or str
+        True to use the policy from get_mixed_policy(), the name of a policy
+        (e.g., 'mixed_bfloat16') or False to keep the current policy
+
+    Returns
+    -------
+    keras.model
+        The model built by the input function
+    """
+
+    if mixed_precision is False:
+        return build_function(input_shape)
+    elif mixed_precision is True:
+        mixed_precision = get_mixed_policy()
+
+    previous_policy = tf.keras.mixed_precision.global_policy()
+    tf.keras.mixed_precision.set_global_policy(mixed_precision)
+    try:
+        return build_function(input_shape)
+    finally:
+        tf.keras.mixed_precision.set_global_policy(previous_policy)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script implements the losses and metrics used to compile the models
+# when the labels are integer class maps (sparse labels, e.g. from
+# PrepareBatches(..., sparse_labels=True)) instead of one-hot tensors.
+#
+# Keras already provides sparse versions of the cross-entropy and of the
+# accuracy. Other losses and metrics (e.g., the focal loss or the precision
+# and recall) only accept one-hot labels, so they are wrapped by the
+# SparseLabelsLoss and SparseLabelsMetric classes, which convert the labels
+# of each batch into one-hot tensors only inside the loss or the metric.
+# The input pipeline therefore never carries the one-hot tensors.
+#
+# Author: Davide Lomeo,
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import tensorflow as tf
+
+__all__ = ['SparseLabelsLoss', 'SparseLabelsMetric', 'get_sparse_metrics']
+
+
+class SparseLabelsLoss(tf.keras.losses.Loss):
+    """
+    Class that wraps a loss expecting one-hot labels, so that the models can
+    be trained on integer class maps.
+
+    Parameters
+    ----------
+    loss : keras loss or function
+        Loss taking one-hot labels (e.g., a focal cross-entropy)
+    n_classes : int
+        number of classes of the classification
+    name : str, optional
+        Name of the loss (default 'sparse_labels_loss')
+
+    Methods
+    -------
+    call(y_true, y_pred)
+        compute the wrapped loss on the one-hot version of the labels
+    """
+    def __init__(self, loss, n_classes, name='sparse_labels_loss'):
+        "Class constructor"
+        super().__init__(name=name)
+        self.loss = loss
+        self.n_classes = n_classes
+
+    def call(self, y_true, y_pred):
+        "Function that computes the wrapped loss on one-hot labels"
+
+        y_true = tf.one_hot(tf.cast(y_true, tf.int32), self.n_classes,
+                            dtype=y_pred.dtype)
+
+        # The losses returning a value per pixel are reduced by this class
+        if isinstance(self.loss, tf.keras.losses.Loss):
+            return self.loss.call(y_true, y_pred)
+
+        return self.loss(y_true, y_pred)
+
+
+class SparseLabelsMetric(tf.keras.metrics.Metric):
+    """
+    Class that wraps a metric expecting one-hot labels, so that it can be
+    computed on integer class maps.
+
+    Parameters
+    ----------
+    metric : keras metric
+        Metric taking one-hot labels (e.g., Precision or Recall)
+    n_classes : int
+        number of classes of the classification
+    name : str, optional
+        Name of the metric (default is the name of the wrapped metric)
+
+    Methods
+    -------
+    update_state(y_true, y_pred, sample_weight=None)
+        update the wrapped metric with the one-hot version of the labels
+    result()
+        return the result of the wrapped metric
+    reset_state()
+        reset the wrapped metric
+    """
+    def __init__(self, metric, n_classes, name=None):
+        "Class constructor"
+        super().__init__(name=name or metric.name)
+        self.metric = metric
+        self.n_classes = n_classes
+
+    def update_state(self, y_true, y_pred, sample_weight=None):
+        "Function that updates the wrapped metric with one-hot labels"
+
+        y_true = tf.one_hot(tf.cast(y_true, tf.int32), self.n_classes,
+                            dtype=y_pred.dtype)
+
+        return self.metric.update_state(y_true, y_pred, sample_weight)
+
+    def result(self):
+        "Function that returns the result of the wrapped metric"
+        return self.metric.result()
+
+    def reset_state(self):
+        "Function that resets the wrapped metric"
+        self.metric.reset_state()
+
+
+def get_sparse_metrics(n_classes):
+    """
+    Function that returns the sparse equivalents of the metrics used to
+    compile the models in Notebook 2 (precision, recall, categorical
+    accuracy, categorical cross-entropy and Kullback-Leibler divergence),
+    computed on integer class maps.
+
+    Parameters
+    ----------
+    n_classes : int
+        number of classes of the classification
+
+    Returns
+    -------
+    list
+        List of keras metrics
+    """
+
+    return [
+        SparseLabelsMetric(tf.keras.metrics.Precision(name='prec'),
+                           n_classes),
+        SparseLabelsMetric(tf.keras.metrics.Recall(name='rec'), n_classes),
+        tf.keras.metrics.SparseCategoricalAccuracy(name='cat_acc'),
+        tf.keras.metrics.SparseCategoricalCrossentropy(name='cat_xntrp'),
+        SparseLabelsMetric(tf.keras.metrics.KLDivergence(name='KLDiv'),
+                           n_classes)
+    ]
@@ -14,6 +14,8 @@ import tensorflow as tf
 from tensorflow.keras import layers
 from tensorflow.keras.models import Model
 
+from .precision_policy import build_with_policy
+
 __all__ = ['UNet']
 
 
@@ -33,7 +35,7 @@ class UNet:
 
     Methods
     -------
-    build_model(input_shape)
+    build_model(input_shape, mixed_precision=False)
         Function that builds the U-Net using the input image shape
     """
     def __init__(self, n_classes):
@@ -41,7 +43,7 @@ class UNet:
         super().__init__()
         self.n_classes = n_classes
 
-    def build_model(self, input_shape):
+    def build_model(self, input_shape, mixed_precision=False):
         """
         Function that implement the UNet model as designed by Ronneberg
         et al. (2015) (https://arxiv.org/pdf/1505.04597.pdf) using a
@@ -53,6 +55,10 @@ class UNet:
         ----------
         input_shape : tuple
             Tuple containing the sizes of the input image (H, W, bands)
+        mixed_precision : bool or str, optional
+            True to build the model under a mixed precision policy
+            (bfloat16 on CPU, float16 on GPU), or the name of the policy
+            (default False). The softmax layer is always kept in float32
 
         Returns
         -------
@@ -76,6 +82,11 @@ class UNet:
             are multiple of 16 (i.e., 64, 126, 256, 384, 416, etc.)  ''')
             return None
 
+        return build_with_policy(self.__build, input_shape, mixed_precision)
+
+    def __build(self, input_shape):
+        "Function that builds the layers of the model"
+
         # Adapting the first layer of the model to the input image's shape
         input_img = layers.Input(input_shape)
 
@@ -96,9 +107,11 @@ class UNet:
 
         # Defining the last layer of the model with a softmax
         # in order to get probabilities for each pixel to belong
-        # to one of the n_classes expected classes
+        # to one of the n_classes expected classes. The probabilities are
+        # computed in float32 even with mixed precision, for stability
         output_img = layers.Conv2D(self.n_classes, (1, 1),
-                                   activation=tf.nn.softmax)(d4)
+                                   activation=tf.nn.softmax,
+                                   dtype='float32')(d4)
 
         # Building the model using input and output layers
         model = Model(input_img, output_img, name='U-Net')
@@ -18,6 +18,8 @@ from tensorflow.keras import layers
 from tensorflow.keras.models import Model
 from tensorflow.keras.applications import VGG19
 
+from .precision_policy import build_with_policy
+
 __all__ = ['VGG19Unet']
 
 
@@ -43,7 +45,7 @@ class VGG19Unet:
 
     Methods
     -------
-    build_model(input_shape)
+    build_model(input_shape, mixed_precision=False)
         Function that builds the U-Net using the input image shape
     """
     def __init__(self, n_classes):
@@ -51,7 +53,7 @@ class VGG19Unet:
         super().__init__()
         self.n_classes = n_classes
 
-    def build_model(self, input_shape):
+    def build_model(self, input_shape, mixed_precision=False):
         """
         Function that implements the UNet architecture
         (https://arxiv.org/abs/1505.04597) with a pre-trained VGG19
@@ -69,6 +71,10 @@ class VGG19Unet:
         ----------
         input_shape : tuple
             Tuple containing the sizes of the input image (H, W, bands)
+        mixed_precision : bool or str, optional
+            True to build the model under a mixed precision policy
+            (bfloat16 on CPU, float16 on GPU), or the name of the policy
+            (default False). The softmax layer is always kept in float32
 
         Returns
         -------
@@ -92,6 +98,11 @@ class VGG19Unet:
             are multiple of 16 (i.e., 64, 126, 256, 384, 416, etc.)  ''')
             return None
 
+        return build_with_policy(self.__build, input_shape, mixed_precision)
+
+    def __build(self, input_shape):
+        "Function that builds the layers of the model"
+
         # Adapting the first layer of the model to the input image's shape
         input_img = layers.Input(input_shape)
 
@@ -117,9 +128,11 @@ class VGG19Unet:
 
         # Defining the last layer of the model with a softmax
         # in order to get probabilities for each pixel to belong
-        # to one of the n_classes expected classes
+        # to one of the n_classes expected classes. The probabilities are
+        # computed in float32 even with mixed precision, for stability
         output_img = layers.Conv2D(self.n_classes, (1, 1),
-                                   activation=tf.nn.softmax)(d4)
+                                   activation=tf.nn.softmax,
+                                   dtype='float32')(d4)
 
         # Building the model using input and output layers
         model = Model(input_img, output_img, name='VGG19-UNet')
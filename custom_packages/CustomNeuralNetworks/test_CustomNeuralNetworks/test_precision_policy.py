@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the functions that build the models under a mixed
+# precision policy. The test checks that the layers built within
+# build_with_policy() follow the policy and that the global policy is
+# restored afterwards.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import tensorflow as tf
+from tensorflow.keras import layers
+from CustomNeuralNetworks import precision_policy
+
+
+def test_build_with_policy():
+    "Testing the get_mixed_policy() and build_with_policy() functions"
+
+    def build_layer(input_shape):
+        return layers.Dense(input_shape[0])
+
+    function_output_1 = precision_policy.get_mixed_policy()
+    function_output_2 = precision_policy.build_with_policy(
+        build_layer, (4,), 'mixed_bfloat16')
+    function_output_3 = precision_policy.build_with_policy(
+        build_layer, (4,), False)
+
+    assert function_output_1 in ['mixed_bfloat16', 'mixed_float16']
+    assert function_output_2.compute_dtype == 'bfloat16'
+    assert function_output_2.variable_dtype == 'float32'
+    assert function_output_3.compute_dtype == 'float32'
+    assert tf.keras.mixed_precision.global_policy().name == 'float32'
+
+    return
@@ -14,6 +14,8 @@
 # Date: 1 August 2021
 # Version: 1.0
 
+import numpy as np
+import tensorflow as tf
 from CustomNeuralNetworks import resnet50_unet
 
 
@@ -32,3 +34,31 @@ def test_ResNet50Unet():
     assert function_output_4 is not None
 
     return
+
+
+def test_ResNet50Unet_mixed_precision():
+    "Testing the ResNet50Unet class built with mixed precision"
+
+    resnet50unet = resnet50_unet.ResNet50Unet(7)
+    model_float32 = resnet50unet.build_model((64, 64, 3))
+    model_mixed = resnet50unet.build_model((64, 64, 3), mixed_precision=True)
+    function_output_1 = resnet50unet.build_model((64, 60, 3),
+                                                 mixed_precision=True)
+
+    # Using the same weights in both models to compare the predictions
+    model_mixed.set_weights(model_float32.get_weights())
+    images = np.random.default_rng(0).random((2, 64, 64, 3))
+    function_output_2 = model_float32.predict_on_batch(images)
+    function_output_3 = model_mixed.predict_on_batch(images)
+
+    compute_dtypes = [layer.compute_dtype for layer in model_mixed.layers]
+
+    assert function_output_1 is None
+    assert ('bfloat16' in compute_dtypes) | ('float16' in compute_dtypes)
+    assert model_mixed.layers[-1].compute_dtype == 'float32'
+    assert function_output_3.dtype == np.float32
+    assert tf.keras.mixed_precision.global_policy().name == 'float32'
+    np.testing.assert_allclose(function_output_3, function_output_2,
+                               atol=1e-2)
+
+    return
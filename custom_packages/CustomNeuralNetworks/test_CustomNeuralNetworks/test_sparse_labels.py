@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the losses and metrics that train the models on integer
+# class maps. The test compiles two U-Nets with the same weights, one with
+# one-hot labels and one with sparse labels, and checks that the loss and
+# the metrics are the same for both.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import numpy as np
+import tensorflow as tf
+from CustomNeuralNetworks import unet, sparse_labels
+
+
+def test_sparse_labels():
+    "Testing the SparseLabelsLoss and SparseLabelsMetric classes"
+
+    n_classes = 4
+    rng = np.random.default_rng(0)
+    images = rng.random((4, 16, 16, 3)).astype(np.float32)
+    classes = rng.integers(0, n_classes, (4, 16, 16)).astype(np.uint8)
+
+    model_one_hot = unet.UNet(n_classes).build_model((16, 16, 3))
+    model_sparse = unet.UNet(n_classes).build_model((16, 16, 3))
+    model_sparse.set_weights(model_one_hot.get_weights())
+
+    model_one_hot.compile(
+        loss=tf.keras.losses.CategoricalFocalCrossentropy(),
+        metrics=[tf.keras.metrics.Precision(name='prec'),
+                 tf.keras.metrics.Recall(name='rec'),
+                 tf.keras.metrics.CategoricalAccuracy(name='cat_acc'),
+                 tf.keras.metrics.CategoricalCrossentropy(name='cat_xntrp'),
+                 tf.keras.metrics.KLDivergence(name='KLDiv')])
+    model_sparse.compile(
+        loss=sparse_labels.SparseLabelsLoss(
+            tf.keras.losses.CategoricalFocalCrossentropy(), n_classes),
+        metrics=sparse_labels.get_sparse_metrics(n_classes))
+
+    function_output_1 = model_one_hot.evaluate(
+        images, tf.one_hot(classes, n_classes), return_dict=True, verbose=0)
+    function_output_2 = model_sparse.evaluate(
+        images, classes, return_dict=True, verbose=0)
+
+    assert function_output_1.keys() == function_output_2.keys()
+    for key in function_output_1:
+        np.testing.assert_allclose(function_output_2[key],
+                                   function_output_1[key], rtol=1e-5)
+
+    # Training one step on the sparse labels
+    history = model_sparse.fit(images, classes, epochs=1, verbose=0)
+    assert np.isfinite(history.history['loss'][0])
+
+    return
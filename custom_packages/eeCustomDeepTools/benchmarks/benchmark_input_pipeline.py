@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script measures the throughput of each stage of the input pipeline
+# on synthetic TFRecords written in the Earth Engine patch layout (GZIP
+# files and mixer.json), so it runs offline on CPU. The stages are:
+# - dataset_split: reading and splitting the raw records
+# - prepare_batches: PrepareBatches parsing one record at a time
+# - prepare_batches_batch_parse: PrepareBatches parsing whole batches
+# - prepare_prediction_dataset
+# - prepare_prediction_classes
+#
+# For each stage, the script reports the records per second, the MB per
+# second of GZIP files read and the peak resident memory (RSS). Each stage
+# runs in a new process, so that the peak memory of a stage is not
+# affected by the stages run before it. The results are appended to a
+# .jsonl file together with the configuration and the git commit, and
+# they are compared with the last run stored with the same configuration,
+# so that the changes to the data path can be justified with numbers.
+#
+# Run it from the eeCustomDeepTools folder:
+# -> python -m benchmarks.benchmark_input_pipeline --bands 12 --pixels 256
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import os
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+
+STAGES = ['dataset_split', 'prepare_batches', 'prepare_batches_batch_parse',
+          'prepare_prediction_dataset', 'prepare_prediction_classes']
+
+RESULTS_FILE = os.path.join(os.path.dirname(__file__), 'results',
+                            'input_pipeline.jsonl')
+
+
+def build_stage(stage, file_list, config):
+    """
+    Function that builds the datasets of the input stage. Returns the list
+    of datasets to read and whether their elements are batches of records.
+    """
+
+    import tensorflow as tf
+    import eeCustomDeepTools as cdt
+
+    bands = config['band_names']
+    dims = [config['pixels'], config['pixels']]
+    batch_size = config['batch_size']
+    n_classes = config['classes']
+
+    records = tf.data.TFRecordDataset(file_list, compression_type='GZIP')
+    if stage == 'dataset_split':
+        return list(cdt.dataset_split(
+            records, config['patches'], 0.7, 0.3)), False
+
+    elif stage.startswith('prepare_batches'):
+        features_dict = cdt.get_features_dict(
+            list(bands), 'classes', list(bands), dims)
+        prepare = cdt.PrepareBatches(features_dict, n_classes, 'classes')
+        train, test = cdt.dataset_split(records, config['patches'], 0.7, 0.3)
+        return list(prepare.prepare_batches(
+            batch_size, batch_size, train, test,
+            batch_parse=stage.endswith('batch_parse'))), True
+
+    elif stage == 'prepare_prediction_dataset':
+        return [cdt.prepare_prediction_dataset(
+            file_list, dims, list(bands), verbose=False)], True
+
+    elif stage == 'prepare_prediction_classes':
+        return [cdt.prepare_prediction_classes(
+            file_list, dims, ['classes'], verbose=False)], False
+
+
+def run_stage(stage, file_list, config):
+    """
+    Function that reads the datasets of the input stage config['repeats']
+    times, after a warm-up read of the first batch. Returns the records
+    read, the elapsed seconds and the peak RSS of the process in bytes.
+    """
+
+    import tensorflow as tf
+
+    datasets, batched = build_stage(stage, file_list, config)
+
+    # Warming up the pipelines (tracing of the mapped functions)
+    for dataset in datasets:
+        for _ in dataset.take(1):
+            pass
+
+    n_records = 0
+    start = time.perf_counter()
+    for _ in range(config['repeats']):
+        for dataset in datasets:
+            for element in dataset:
+                if batched:
+                    element = tf.nest.flatten(element)[0]
+                    n_records += int(element.shape[0])
+                else:
+                    n_records += 1
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if platform.system() != 'Darwin':
+        peak_rss *= 1024
+
+    return n_records, elapsed, peak_rss
+
+
+def git_commit():
+    "Function that returns the current git commit, if available"
+
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_last_run(results_file, config):
+    "Function that returns the last run stored with the same configuration"
+
+    if not os.path.exists(results_file):
+        return None
+
+    last_run = None
+    with open(results_file) as f:
+        for line in f:
+            run = json.loads(line)
+            if run['config'] == config:
+                last_run = run
+
+    return last_run
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure the records per second, the MB per second read '
+                    'and the peak memory of each stage of the input pipeline')
+    parser.add_argument('--bands', type=int, default=12)
+    parser.add_argument('--pixels', type=int, default=256)
+    parser.add_argument('--patches', type=int, default=128)
+    parser.add_argument('--files', type=int, default=2)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--classes', type=int, default=7)
+    parser.add_argument('--repeats', type=int, default=2)
+    parser.add_argument('--stages', nargs='+', default=STAGES,
+                        choices=STAGES)
+    parser.add_argument('--results', default=RESULTS_FILE,
+                        help='.jsonl file where the results are appended')
+    parser.add_argument('--no-save', action='store_true',
+                        help='only print the results')
+    args = parser.parse_args()
+
+    config = {
+        'bands': args.bands,
+        'band_names': ['B{}'.format(i + 1) for i in range(args.bands)],
+        'pixels': args.pixels,
+        'patches': args.patches,
+        'files': args.files,
+        'batch_size': args.batch_size,
+        'classes': args.classes,
+        'repeats': args.repeats
+    }
+
+    # Each stage runs in a fresh process to measure its own peak memory
+    context = multiprocessing.get_context('spawn')
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        from .synthetic_records import write_synthetic_records
+
+        file_list, _ = write_synthetic_records(
+            folder, 'record-', config['band_names'],
+            [args.pixels, args.pixels], args.patches, n_files=args.files,
+            n_classes=args.classes)
+        gzip_bytes = sum(os.path.getsize(f) for f in file_list)
+
+        for stage in args.stages:
+            with context.Pool(1) as pool:
+                n_records, elapsed, peak_rss = pool.apply(
+                    run_stage, (stage, file_list, config))
+
+            results[stage] = {
+                'records_per_s': round(n_records / elapsed, 2),
+                'mb_per_s': round(
+                    gzip_bytes * args.repeats / elapsed / 1e6, 2),
+                'peak_rss_mb': round(peak_rss / 1e6, 1)
+            }
+
+    config.pop('band_names')
+    last_run = load_last_run(args.results, config)
+
+    print('Bands: {}, patch size: {}x{}, patches: {}, batch size: {}'.format(
+        args.bands, args.pixels, args.pixels, args.patches, args.batch_size))
+    print('{:<30}{:>12}{:>10}{:>14}{:>10}'.format(
+        'stage', 'records/s', 'MB/s', 'peak RSS MB', 'change'))
+    for stage, result in results.items():
+        change = ''
+        if (last_run is not None) and (stage in last_run['results']):
+            change = '{:+.1%}'.format(
+                result['records_per_s'] /
+                last_run['results'][stage]['records_per_s'] - 1)
+        print('{:<30}{:>12.1f}{:>10.2f}{:>14.1f}{:>10}'.format(
+            stage, result['records_per_s'], result['mb_per_s'],
+            result['peak_rss_mb'], change))
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.results)),
+                    exist_ok=True)
+        with open(args.results, 'a') as f:
+            f.write(json.dumps({
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'commit': git_commit(),
+                'machine': {'cpus': os.cpu_count(),
+                            'platform': platform.platform()},
+                'config': config,
+                'results': results
+            }) + '\n')
+        print('Results appended to {}'.format(args.results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script compares the throughput (records per second) of the two
+# parsing modes of PrepareBatches: parsing one record at a time (default)
+# and parsing whole batches at once (batch_parse=True). Synthetic records
+# are written to a temporary folder, so the script runs offline on CPU.
+# The records are read both from the GZIP files and from memory, in order
+# to separate the cost of the decompression from the cost of the parsing.
+#
+# Run it from the eeCustomDeepTools folder:
+# -> python -m benchmarks.benchmark_prepare_batches --bands 21 --pixels 256
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import argparse
+import tempfile
+import time
+
+import tensorflow as tf
+from eeCustomDeepTools import PrepareBatches, get_features_dict
+from .synthetic_records import write_synthetic_records
+
+
+def time_mode(prepare, dataset, batch_size, batch_parse, repeats):
+    "Function that returns the records per second of the input parsing mode"
+
+    train, _ = prepare.prepare_batches(batch_size, batch_size, dataset,
+                                       dataset, batch_parse=batch_parse)
+
+    # Warming up the pipeline (tracing of the mapped functions)
+    for _ in train.take(1):
+        pass
+
+    start = time.perf_counter()
+    n_records = 0
+    for _ in range(repeats):
+        for features, _ in train:
+            n_records += features.shape[0]
+
+    return n_records / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare the records per second of PrepareBatches when '
+                    'parsing one record at a time and one batch at a time')
+    parser.add_argument('--bands', type=int, default=21)
+    parser.add_argument('--pixels', type=int, default=256)
+    parser.add_argument('--patches', type=int, default=256)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--classes', type=int, default=7)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    bands = ['B{}'.format(i + 1) for i in range(args.bands)]
+    dims = [args.pixels, args.pixels]
+
+    with tempfile.TemporaryDirectory() as folder:
+        file_list, _ = write_synthetic_records(
+            folder, 'record-', bands, dims, args.patches,
+            n_classes=args.classes)
+
+        features_dict = get_features_dict(
+            list(bands), 'classes', list(bands), dims)
+        prepare = PrepareBatches(features_dict, args.classes, 'classes')
+
+        # Reading the records from the GZIP files and from memory, so that
+        # the second measure only includes the parsing and the stacking
+        gzip_dataset = tf.data.TFRecordDataset(
+            file_list, compression_type='GZIP')
+        memory_dataset = gzip_dataset.cache()
+        for _ in memory_dataset:
+            pass
+
+        results = {}
+        for source, dataset in [('GZIP files', gzip_dataset),
+                                ('memory', memory_dataset)]:
+            results[source] = [
+                time_mode(prepare, dataset, args.batch_size, batch_parse,
+                          args.repeats) for batch_parse in [False, True]]
+
+    print('Bands: {}, patch size: {}x{}, batch size: {}'.format(
+        args.bands, args.pixels, args.pixels, args.batch_size))
+    for source, (per_record, per_batch) in results.items():
+        print('Reading from {}:'.format(source))
+        print('  per-record parsing: {:.1f} records/s'.format(per_record))
+        print('  per-batch parsing: {:.1f} records/s'.format(per_batch))
+        print('  speed-up: {:.2f}x'.format(per_batch / per_record))
+
+if __name__ == '__main__':
+    main()
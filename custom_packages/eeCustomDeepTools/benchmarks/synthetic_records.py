@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script contains a helper that writes small synthetic TFRecords
+# in the same layout used by Earth Engine when exporting image patches
+# (one float band per feature, a classification band in int64 format
+# and a mixer .json file). The helper is used by the benchmarks and by the
+# tests, so that the classes and functions that read TFRecords can be
+# measured and tested without accessing a user-specific cloud storage.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import json
+import numpy as np
+import tensorflow as tf
+
+
+def write_synthetic_records(folder, prefix, bands, dims, n_patches,
+                            n_files=1, n_classes=7, class_label='classes',
+                            seed=0, masked_patches=()):
+    """
+    Function that writes n_patches random patches split over n_files
+    GZIP-compressed TFRecords and the relative mixer file into the
+    input folder. The bands of the patches in masked_patches are all 0, as
+    the pixels masked in Earth Engine (e.g., by clouds) are exported.
+    Returns the list of TFRecords and the mixer path.
+    """
+
+    rng = np.random.default_rng(seed)
+    patch_size = dims[0] * dims[1]
+    options = tf.io.TFRecordOptions(compression_type='GZIP')
+
+    file_list = []
+    for f in range(n_files):
+        file_name = '{}/{}{:05d}.tfrecord.gz'.format(folder, prefix, f)
+        file_list.append(file_name)
+
+        with tf.io.TFRecordWriter(file_name, options) as writer:
+            for p in range(f, n_patches, n_files):
+                scale = 0 if p in masked_patches else 1
+                feature = {b: tf.train.Feature(float_list=tf.train.FloatList(
+                    value=scale * rng.random(patch_size, dtype=np.float32)))
+                           for b in bands}
+                feature[class_label] = tf.train.Feature(
+                    int64_list=tf.train.Int64List(
+                        value=rng.integers(0, n_classes, patch_size)))
+                example = tf.train.Example(
+                    features=tf.train.Features(feature=feature))
+                writer.write(example.SerializeToString())
+
+    mixer = {
+        'projection': {
+            'crs': 'EPSG:4326',
+            'affine': {'doubleMatrix': [1.0, 0.0, 0.0, 0.0, -1.0, 0.0]}},
+        'patchDimensions': list(dims),
+        'patchesPerRow': n_patches,
+        'totalPatches': n_patches
+    }
+    json_file = '{}/{}mixer.json'.format(folder, prefix)
+    with open(json_file, 'w') as js:
+        json.dump(mixer, js)
+
+    return file_list, json_file
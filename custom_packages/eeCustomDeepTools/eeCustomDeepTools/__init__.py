@@ -1,9 +1,22 @@
 from .get_patches_info import * # noqa
 from .records_split import * # noqa
+from .records_reader import * # noqa
+from .records_shuffle import * # noqa
+from .records_index import * # noqa
+from .records_cache import * # noqa
+from .storage_backends import * # noqa
+from .shard_cache import * # noqa
+from .memmap_store import * # noqa
 from .fixed_length_features import * # noqa
+from .spectral_indices import * # noqa
+from .patch_filter import * # noqa
 from .prepare_batches import * # noqa
 from .prepare_classes import * # noqa
 from .prepare_predictions import * # noqa
+from .evaluate_predictions import * # noqa
+from .tiled_inference import * # noqa
+from .predictions_writer import * # noqa
+from .quantize_model import * # noqa
 
 from pkg_resources import get_distribution, DistributionNotFound
 try:
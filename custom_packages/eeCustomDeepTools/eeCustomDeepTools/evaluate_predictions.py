@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script evaluates the predictions of a Keras model against the
+# classification obtained with the traditional classifier on Google Earth
+# Engine (as prepared by the prepare_prediction_classes() function).
+#
+# The predictions are consumed as a stream of batches, which are zipped with
+# the classification patches. For each batch, the confusion matrices of all
+# the patches are computed at once with a single bincount, and they are added
+# to the global confusion matrix. Only the confusion matrices are kept in
+# memory, so that any number of patches can be evaluated.
+#
+# The confusion matrices follow the Earth Engine convention: the rows are the
+# reference classes and the columns are the predicted classes. Therefore,
+# the producer's accuracy is computed on the rows and the user's (consumer's)
+# accuracy is computed on the columns.
+#
+# The patches rejected by prepare_prediction_dataset() (because mostly masked
+# or without data) are not predicted: stream_predictions() returns NaN
+# probabilities in their place, which the evaluation ignores.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import numpy as np
+import tensorflow as tf
+
+__all__ = ['StreamingEvaluator', 'stream_predictions', 'evaluate_predictions']
+
+
+class StreamingEvaluator:
+    """
+    Class that accumulates the confusion matrices of batches of predictions
+    and reference classes, and computes the accuracy metrics from them.
+
+    Parameters
+    ----------
+    n_classes : int
+        number of classes of the classification
+    per_patch : bool, optional
+        flag to also keep the confusion matrix of each patch (default False)
+    transpose : bool, optional
+        flag to transpose the predictions back to (height, width) before
+        comparing them (default True). The datasets prepared with this
+        package feed the models (width, height, bands) patches, so the
+        predictions are transposed back, as when writing them to Earth Engine
+
+    Functions
+    ---------
+    update(predictions, labels)
+        add a batch of predictions and reference classes to the matrices
+    evaluate(predictions, classes_dataset)
+        consume a stream of predictions zipped with the reference classes
+    get_metrics(decimal=4)
+        compute the accuracy metrics from the accumulated matrices
+    """
+
+    def __init__(self, n_classes, per_patch=False, transpose=True):
+        "Class constructor"
+
+        super().__init__()
+        self.n_classes = n_classes
+        self.per_patch = per_patch
+        self.transpose = transpose
+        self.confusion_matrix = np.zeros((n_classes, n_classes), np.int64)
+        self.patch_matrices = []
+
+    def update(self, predictions, labels):
+        """
+        Function that adds a batch of predictions and reference classes to
+        the confusion matrices. Reference classes outside the range of the
+        classes (e.g., no data) and patches with NaN probabilities (i.e.,
+        not predicted) are ignored.
+
+        Parameters
+        ----------
+        predictions : array
+            batch of probabilities (B, W, H, n_classes) or classes (B, W, H)
+        labels : array
+            batch of reference classes (B, H, W)
+
+        Returns
+        -------
+        numpy array
+            The confusion matrices of the patches in the batch (B, n, n)
+        """
+
+        predictions = tf.convert_to_tensor(predictions)
+        if predictions.shape.rank == 4:
+            # The classes of the patches not predicted are set out of range
+            rejected = tf.reduce_any(tf.math.is_nan(predictions),
+                                     axis=[1, 2, 3])
+            predictions = tf.where(
+                tf.reshape(rejected, [-1, 1, 1]), tf.constant(-1, tf.int64),
+                tf.argmax(predictions, axis=-1))
+        if self.transpose:
+            predictions = tf.transpose(predictions, perm=[0, 2, 1])
+
+        predictions = tf.cast(predictions, tf.int32)
+        labels = tf.cast(labels, tf.int32)
+        n_patches = tf.shape(labels)[0]
+        n = self.n_classes
+
+        # Each pixel is assigned to the cell of its patch's matrix, so that
+        # all the matrices of the batch are computed with a single bincount
+        patch_index = tf.broadcast_to(
+            tf.reshape(tf.range(n_patches), [-1, 1, 1]), tf.shape(labels))
+        valid = (labels >= 0) & (labels < n) & \
+                (predictions >= 0) & (predictions < n)
+        cells = tf.boolean_mask(
+            patch_index * n * n + labels * n + predictions, valid)
+        matrices = tf.reshape(
+            tf.math.bincount(cells, minlength=n_patches * n * n,
+                             maxlength=n_patches * n * n, dtype=tf.int64),
+            [n_patches, n, n]).numpy()
+
+        self.confusion_matrix += matrices.sum(axis=0)
+        if self.per_patch:
+            self.patch_matrices.append(matrices)
+
+        return matrices
+
+    def evaluate(self, predictions, classes_dataset):
+        """
+        Function that consumes a stream of batches of predictions together
+        with the dataset of the reference classes, patch by patch and in the
+        same order, and adds them to the confusion matrices.
+
+        Parameters
+        ----------
+        predictions : iterable
+            batches of predictions, e.g. from stream_predictions()
+        classes_dataset : tf.data.Dataset
+            reference classes from prepare_prediction_classes()
+
+        Returns
+        -------
+        dictionary
+            The accuracy metrics, as returned by get_metrics(), or None if
+            the classes dataset has fewer patches than the predictions
+        """
+
+        classes = iter(classes_dataset)
+        for batch in predictions:
+            batch_size = int(tf.shape(batch)[0])
+            try:
+                labels = tf.stack([next(classes) for _ in range(batch_size)])
+            except StopIteration:
+                print('ERROR: the classes dataset has fewer patches than the '
+                      'predictions')
+                return None
+            self.update(batch, labels)
+
+        return self.get_metrics()
+
+    def get_metrics(self, decimal=4):
+        """
+        Function that computes the overall accuracy, the kappa coefficient
+        and the user's and producer's accuracies of each class from the
+        global confusion matrix (and of each patch, if per_patch is True).
+        Classes with no pixels have an accuracy of nan.
+
+        Parameters
+        ----------
+        decimal : int, optional
+            Number of decimals for each figure
+
+        Returns
+        -------
+        dictionary
+            A dictionary containing the metrics and the confusion matrix
+        """
+
+        metrics = _matrix_metrics(self.confusion_matrix, decimal)
+        metrics['confusion_matrix'] = self.confusion_matrix.tolist()
+
+        if self.per_patch & (self.patch_matrices != []):
+            metrics['patches'] = [
+                _matrix_metrics(m, decimal)
+                for m in np.concatenate(self.patch_matrices)]
+
+        return metrics
+
+
+def stream_predictions(model, dataset):
+    """
+    Generator that runs the input model on one batch of the input dataset
+    at a time, so that the predictions never need to be held in memory
+    all together (as it happens with model.predict()). If the dataset holds
+    (patches, flags) tuples, as returned by prepare_prediction_dataset()
+    with min_valid_fraction, the model only runs on the flagged patches and
+    the other patches are returned as NaN probabilities, so that the
+    batches keep all the patches in their order.
+
+    Parameters
+    ----------
+    model : keras.model
+        Trained model
+    dataset : tf.data.Dataset
+        Batches of patches, e.g. from prepare_prediction_dataset()
+
+    Yields
+    ------
+    numpy array
+        The predictions of each batch
+    """
+
+    n_outputs = None
+    for batch in dataset:
+        if not isinstance(batch, tuple):
+            yield model.predict_on_batch(batch)
+            continue
+
+        batch, valid = batch[0], batch[1].numpy()
+        if valid.all():
+            yield model.predict_on_batch(batch)
+            continue
+
+        # The number of outputs is taken from the first prediction, running
+        # the model on a single patch if the first batch has no valid patch
+        predictions = None
+        if valid.any():
+            predictions = np.asarray(
+                model.predict_on_batch(tf.boolean_mask(batch, valid)))
+            n_outputs = predictions.shape[-1]
+        elif n_outputs is None:
+            n_outputs = np.asarray(
+                model.predict_on_batch(batch[:1])).shape[-1]
+
+        placeholders = np.full(
+            tuple(batch.shape[:3]) + (n_outputs,), np.nan, np.float32)
+        if predictions is not None:
+            placeholders[valid] = predictions
+
+        yield placeholders
+
+
+def evaluate_predictions(predictions, classes_dataset, n_classes,
+                         per_patch=False, decimal=4):
+    """
+    Function that evaluates a stream of predictions against the reference
+    classes using the StreamingEvaluator class.
+
+    Parameters
+    ----------
+    predictions : iterable
+        batches of predictions, e.g. from stream_predictions()
+    classes_dataset : tf.data.Dataset
+        reference classes from prepare_prediction_classes()
+    n_classes : int
+        number of classes of the classification
+    per_patch : bool, optional
+        flag to also return the metrics of each patch (default False)
+    decimal : int, optional
+        Number of decimals for each figure
+
+    Returns
+    -------
+    dictionary
+        A dictionary containing the metrics and the confusion matrix
+    """
+
+    if (not isinstance(n_classes, int)) | (n_classes <= 0):
+        print('ERROR: the number of classes needs to be a positive integer')
+        return None
+
+    evaluator = StreamingEvaluator(n_classes, per_patch)
+    if evaluator.evaluate(predictions, classes_dataset) is None:
+        return None
+
+    return evaluator.get_metrics(decimal)
+
+
+def _matrix_metrics(matrix, decimal):
+    "Helper function that computes the accuracy metrics of a matrix"
+
+    total = matrix.sum()
+    diagonal = np.diag(matrix).astype(np.float64)
+    rows = matrix.sum(axis=1)
+    columns = matrix.sum(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        overall = diagonal.sum() / total
+        expected = (rows * columns).sum() / float(total) ** 2
+        kappa = (overall - expected) / (1 - expected)
+        producers = diagonal / rows
+        users = diagonal / columns
+
+    return {
+        'overall_accuracy': round(float(overall), decimal),
+        'kappa_coefficient': round(float(kappa), decimal),
+        'producers_accuracy': np.round(producers, decimal).tolist(),
+        'users_accuracy': np.round(users, decimal).tolist()
+    }
@@ -9,6 +9,14 @@
 # More info can be found here:
 # https://developers.google.com/earth-engine/guides/tfrecord#mixer
 #
+# The files are listed and read through a storage backend (LocalStorage for
+# Google Drive and CloudStorage for Google Cloud Storage, or any custom
+# backend offering the same functions), which reads the files of a bucket
+# through a pooled client rather than starting a gsutil subprocess for each
+# file. If given a cache folder, the TFRecords and the mixer file are read
+# through a local ShardCache, so they are downloaded only once and the
+# following training runs read the local copies.
+#
 # Author: Davide Lomeo
 # Email: davide.lomeo20@imperial.ac.uk
 # GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
@@ -16,7 +24,8 @@
 # Version: 0.1.0
 
 import json
-import subprocess
+from .shard_cache import ShardCache
+from .storage_backends import LocalStorage, CloudStorage
 
 __all__ = ['GetFilesInfo']
 
@@ -34,21 +43,41 @@ class GetFilesInfo:
     ----------
     storage: str, optional
         the type of storage used: 'gdrive' or 'gstorage' (default is 'gdrive')
+    cache_dir: str, optional
+        local folder where the files are cached (default is no cache)
+    cache_bytes: int, optional
+        maximum size of the cache in bytes (default is 50 GiB)
+    backend: LocalStorage or CloudStorage, optional
+        the storage backend (default is CloudStorage for 'gstorage' and
+        LocalStorage for 'gdrive')
 
     Functions
     ---------
     get_mixer(json_file)
         Get the dictionary from the stored json file
+    get_mixers(json_files)
+        Get the dictionaries of several json files concurrently
     get_files(records_path, file_prefix)
         Loads the TFrecords and mixer using the input/ list and file prefix
     """
 
-    def __init__(self, storage='gdrive'):
+    def __init__(self, storage='gdrive', cache_dir=None,
+                 cache_bytes=50 * 2**30, backend=None):
         "Class constructor"
 
         super().__init__()
         self.storage = storage
 
+        self.backend = backend
+        if backend is None:
+            self.backend = CloudStorage() if storage == 'gstorage' \
+                           else LocalStorage()
+
+        self.cache = None
+        if cache_dir is not None:
+            self.cache = ShardCache(cache_dir, cache_bytes,
+                                    backend=self.backend)
+
     def get_mixer(self, json_file):
         """
         Function that loads the mixer file produced automatically by
@@ -69,33 +98,57 @@ class GetFilesInfo:
             print('ERROR: the input .json path needs to be in str format')
             return None
 
-        if self.storage == 'gdrive':
-            with open(json_file) as js:
-                mixer = json.load(js)
+        # Reading the local copy of the mixer file if using a cache
+        if self.cache is not None:
+            json_file = self.cache.fetch([json_file])[0]
 
-        if self.storage == 'gstorage':
-            proc = subprocess.Popen(
-                ["gsutil", "cat", json_file], stdout=subprocess.PIPE)
-            output = proc.stdout.read()
-            mixer = json.loads(output)
+        return json.loads(self.backend.read(json_file))
+
+    def get_mixers(self, json_files):
+        """
+        Function that loads the mixer files of several exports (e.g., of
+        different years or regions) at once, reading them concurrently.
+
+        Parameters
+        ----------
+        json_files : list
+            a list of paths to the stored .json files
 
-        return mixer
+        Returns
+        -------
+        dictionary
+            A dictionary with the paths as keys and the mixers as values
+        """
+
+        if not isinstance(json_files, list):
+            print('ERROR: the input .json paths need to be in a list')
+            return None
+
+        paths = json_files
+        if self.cache is not None:
+            paths = self.cache.fetch(json_files)
+
+        return {f: json.loads(content) for f, content in
+                zip(json_files, self.backend.read_many(paths))}
 
     def get_files(self, records_path, file_prefix):
         """
         Function that generates a list with all the TFRecords saved in
-        the input path (for gdrive storage) or input list (for gstorage) that
-        have the input prefix. The mixer .json file stored in the same location
-        is returned to be later used to extract the mixer file as a dictionary
-        and to export any generated asset to Earth Engine. The path to the
-        mixer file is returned for reproducibility, in order to capture any
-        unintentional file renaming and always find the mixer file inside the
-        folder with the TFRecords.
+        the input path (for gdrive storage) or input list or bucket folder
+        (for gstorage) that have the input prefix. The mixer .json file
+        stored in the same location is returned to be later used to extract
+        the mixer file as a dictionary and to export any generated asset to
+        Earth Engine. The path to the mixer file is returned for
+        reproducibility, in order to capture any unintentional file renaming
+        and always find the mixer file inside the folder with the TFRecords.
+        If using a cache, the TFRecords are downloaded into the cache and
+        their local paths are returned, while the mixer path is left remote.
 
         Parameters
         ----------
-        records_path : gdrive Path or gstorage list of files
-            Path to file or list of files. depending on storage used
+        records_path : gdrive Path or gstorage list of files or folder
+            Path to file or list of files (or gs:// folder). depending on
+            storage used
         file_prefix : str
             Prefix of the stored TFRecords and mixer files
 
@@ -126,8 +179,13 @@ class GetFilesInfo:
 
         # Checking if using Googe Cloud Storage and exctracing the filenames
         if self.storage == 'gstorage':
+            # Listing the bucket folder if given instead of a list
+            if isinstance(records_path, str):
+                records_path = self.backend.list_files(records_path)
+
             if not isinstance(records_path, list):
-                print('ERROR: for gstorage, the input needs to be a list')
+                print('ERROR: for gstorage, the input needs to be a list or '
+                      'a folder')
                 return None
 
             # Getting all the filenames
@@ -142,4 +200,7 @@ class GetFilesInfo:
                 elif f.endswith('.json'):
                     json_file = f
 
+        if self.cache is not None:
+            file_list = self.cache.fetch(file_list)
+
         return file_list, json_file
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script converts the TFRecords exported from Earth Engine into a store
+# of contiguous, memory-mapped NumPy arrays, so that the patches only need to
+# be parsed once. The store is a folder containing:
+# - features.npy: the patches as a float32 array of shape (N, H, W, C)
+# - labels.npy: the classification as a compact integer array of shape
+#   (N, H, W) (only if a classification band is provided)
+# - header.json: the mixer file and the information on the bands and arrays
+#
+# The patches are stored with the same layout and channel order produced by
+# the PrepareBatches class and by the prepare_prediction_dataset() function
+# (bands in alphabetical order), so that the store can be used with the
+# models trained on those datasets. As the arrays are memory-mapped, the
+# batches are slices of the arrays (no copy is made) and several processes
+# reading the same store share a single copy of it in the page cache.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import json
+
+import numpy as np
+import tensorflow as tf
+
+__all__ = ['records_to_memmap', 'MemmapPatches']
+
+
+def records_to_memmap(file_list, features_dict, store_path, class_label=None,
+                      mixer=None, batch_size=32):
+    """
+    Function that parses the input TFRecords and writes them into a store
+    of memory-mapped arrays. If the mixer is provided, the number of
+    patches is taken from it, otherwise the TFRecords are counted first.
+
+    Parameters
+    ----------
+    file_list : list
+        List of TFrecords file names (e.g., from GetFilesInfo.get_files)
+    features_dict : dict
+        dictionary containing Fixed Lenght Features (from get_features_dict)
+    store_path : str
+        Path to the folder of the store (created if it does not exist)
+    class_label : str, optional
+        name of the classification band, if the records have one
+    mixer : dict, optional
+        Mixer of the TFRecords (e.g., from GetFilesInfo.get_mixer)
+    batch_size : int, optional
+        Number of records parsed at a time (default 32)
+
+    Returns
+    -------
+    MemmapPatches
+        The store, ready to be read
+    """
+
+    if not isinstance(file_list, list):
+        print('ERROR: ensure that the file_list is a list')
+        return None
+    elif not isinstance(features_dict, dict):
+        print('ERROR: ensure that the features_dict is a dictionary')
+        return None
+    elif (class_label is not None) & (class_label not in features_dict):
+        print('ERROR: the class_label is not in the features dictionary')
+        return None
+
+    dataset = tf.data.TFRecordDataset(file_list, compression_type='GZIP')
+
+    if mixer is not None:
+        n_patches = mixer['totalPatches']
+    else:
+        n_patches = int(dataset.reduce(0, lambda count, _: count + 1))
+
+    bands = sorted(k for k in features_dict if k != class_label)
+    dims = list(features_dict[bands[0]].shape)
+
+    # (H, W) of the patches are swapped as in PrepareBatches
+    tf.io.gfile.makedirs(store_path)
+    features = np.lib.format.open_memmap(
+        store_path + '/features.npy', mode='w+', dtype=np.float32,
+        shape=(n_patches, dims[1], dims[0], len(bands)))
+    if class_label is not None:
+        labels = np.lib.format.open_memmap(
+            store_path + '/labels.npy', mode='w+', dtype=np.uint8,
+            shape=(n_patches, dims[0], dims[1]))
+
+    def parse_batch(example_protos):
+        "Function that parses and stacks a whole batch of records"
+        parsed = tf.io.parse_example(example_protos, features_dict)
+        stacked = tf.transpose(
+            tf.stack([parsed[b] for b in bands], axis=1), perm=[0, 3, 2, 1])
+        if class_label is None:
+            return stacked, tf.zeros([tf.shape(stacked)[0]], tf.int64)
+        return stacked, tf.cast(parsed[class_label], tf.int64)
+
+    # Writing the parsed batches straight into the memory-mapped arrays
+    start = 0
+    for batch_features, batch_labels in dataset.batch(batch_size).map(
+            parse_batch, num_parallel_calls=tf.data.AUTOTUNE):
+        end = start + batch_features.shape[0]
+        if end > n_patches:
+            print('ERROR: the TFRecords contain more than {} patches'.format(
+                n_patches))
+            return None
+        features[start:end] = batch_features.numpy()
+        if class_label is not None:
+            batch_labels = batch_labels.numpy()
+            if batch_labels.max() > np.iinfo(np.uint8).max:
+                print('ERROR: the classes need to be between 0 and 255')
+                return None
+            labels[start:end] = batch_labels
+        start = end
+
+    if start != n_patches:
+        print('WARNING: {} patches were expected but {} were found'.format(
+            n_patches, start))
+
+    features.flush()
+    if class_label is not None:
+        labels.flush()
+
+    header = {
+        'n_patches': start,
+        'bands': bands,
+        'class_label': class_label,
+        'features_shape': list(features.shape),
+        'features_dtype': features.dtype.name,
+        'labels_dtype': 'uint8' if class_label is not None else None,
+        'mixer': mixer
+    }
+    with open(store_path + '/header.json', 'w') as js:
+        json.dump(header, js)
+
+    return MemmapPatches(store_path)
+
+
+class MemmapPatches:
+    """
+    Class that reads a store of memory-mapped arrays generated with the
+    records_to_memmap() function. The batches are returned as slices of
+    the memory-mapped arrays, hence without copying the data.
+
+    Parameters
+    ----------
+    store_path : str
+        Path to the folder of the store
+
+    Functions
+    ---------
+    get_batch(start, end)
+        Get the features (and labels) of the patches between start and end
+    batches(batch_size, shuffle=False, seed=None)
+        Generator of the batches of patches as NumPy arrays
+    as_dataset(batch_size, n_classes=None, shuffle=False, seed=None)
+        Tensorflow dataset of the batches of patches
+    """
+
+    def __init__(self, store_path):
+        "Class constructor"
+
+        super().__init__()
+        self.store_path = store_path
+
+        with open(store_path + '/header.json') as js:
+            self.header = json.load(js)
+
+        n_patches = self.header['n_patches']
+        self.features = np.load(
+            store_path + '/features.npy', mmap_mode='r')[:n_patches]
+        self.labels = None
+        if self.header['class_label'] is not None:
+            self.labels = np.load(
+                store_path + '/labels.npy', mmap_mode='r')[:n_patches]
+
+    def __len__(self):
+        return self.header['n_patches']
+
+    def get_batch(self, start, end):
+        """
+        Function that returns the patches between start and end as views of
+        the memory-mapped arrays.
+
+        Parameters
+        ----------
+        start : int
+            Index of the first patch
+        end : int
+            Index after the last patch
+
+        Returns
+        -------
+        numpy arrays
+            The features (and the labels, if in the store) of the patches
+        """
+
+        if self.labels is None:
+            return self.features[start:end]
+
+        return self.features[start:end], self.labels[start:end]
+
+    def batches(self, batch_size, shuffle=False, seed=None):
+        """
+        Generator of the batches of the store in order. If shuffle is True,
+        the order of the batches is shuffled, whilst the patches within each
+        batch remain contiguous, so that the batches are still views.
+
+        Parameters
+        ----------
+        batch_size : int
+            Number of patches per batch
+        shuffle : bool, optional
+            Flag to shuffle the order of the batches (default False)
+        seed : int, optional
+            Seed of the shuffling (default None)
+
+        Yields
+        ------
+        numpy arrays
+            The features (and the labels, if in the store) of each batch
+        """
+
+        starts = np.arange(0, len(self), batch_size)
+        if shuffle:
+            np.random.default_rng(seed).shuffle(starts)
+
+        for start in starts:
+            yield self.get_batch(start, start + batch_size)
+
+    def as_dataset(self, batch_size, n_classes=None, shuffle=False,
+                   seed=None):
+        """
+        Function that wraps the batches of the store into a tensorflow
+        dataset, ready to be fed to Keras models. If n_classes is provided,
+        the labels are converted into one-hot tensors as in PrepareBatches.
+
+        Parameters
+        ----------
+        batch_size : int
+            Number of patches per batch
+        n_classes : int, optional
+            Number of classes for the one-hot labels (default None)
+        shuffle : bool, optional
+            Flag to shuffle the order of the batches (default False)
+        seed : int, optional
+            Seed of the shuffling (default None)
+
+        Returns
+        -------
+        tf.data.Dataset
+            Tensorflow dataset of the batches
+        """
+
+        shape = (None,) + self.features.shape[1:]
+        features_spec = tf.TensorSpec(shape, tf.float32)
+        if self.labels is None:
+            signature = features_spec
+        else:
+            signature = (features_spec, tf.TensorSpec(
+                (None,) + self.labels.shape[1:], tf.uint8))
+
+        dataset = tf.data.Dataset.from_generator(
+            lambda: self.batches(batch_size, shuffle, seed),
+            output_signature=signature)
+
+        if (self.labels is not None) & (n_classes is not None):
+            dataset = dataset.map(
+                lambda x, y: (x, tf.one_hot(tf.cast(y, tf.int64), n_classes)))
+
+        return dataset.prefetch(tf.data.AUTOTUNE)
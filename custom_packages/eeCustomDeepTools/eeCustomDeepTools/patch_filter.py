@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script computes the fraction of valid pixels of the patches, used to
+# reject the patches that are mostly covered by clouds or that contain no
+# data. Earth Engine exports the pixels masked (e.g., by
+# mask_sentinel_clouds() or mask_landsat_clouds() of the eeCustomTools
+# package) or outside the image with the same fill value in all the bands
+# (0 by default), so a pixel is considered valid if at least one of its
+# bands differs from the fill value (and none of them is NaN or infinite).
+#
+# The fraction is computed for a single patch or for a whole batch of
+# patches in one vectorised pass, and it is used by:
+# - PrepareBatches, which drops the patches under a threshold before
+#   training
+# - prepare_prediction_dataset(), which flags the patches under a
+#   threshold, so that stream_predictions() does not run the model on them
+#   and returns placeholders in their place, keeping the order of the
+#   patches expected by the Earth Engine upload
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import tensorflow as tf
+
+__all__ = ['valid_fraction']
+
+
+def valid_fraction(features, fill_value=0):
+    """
+    Function that computes the fraction of valid pixels of a patch
+    (width, height, bands) or of each patch of a batch (batch, width,
+    height, bands). A pixel is valid if at least one of its bands differs
+    from the fill value and none of its bands is NaN or infinite.
+
+    Parameters
+    ----------
+    features : tensor
+        Stacked bands of a patch or of a batch of patches
+    fill_value : float, optional
+        Value written by Earth Engine in the masked pixels (default 0)
+
+    Returns
+    -------
+    tensor
+        The fraction of valid pixels, a scalar or one value per patch
+    """
+
+    features = tf.convert_to_tensor(features)
+    valid = tf.reduce_any(features != fill_value, axis=-1) & \
+        tf.reduce_all(tf.math.is_finite(features), axis=-1)
+
+    return tf.reduce_mean(tf.cast(valid, tf.float32), axis=[-2, -1])
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script writes the predictions of a Keras model into TFRecords that can
+# be uploaded to Earth Engine as an image asset (together with the mixer file
+# of the exported patches), e.g.:
+# earthengine upload image --asset_id=ID file-00000.tfrecord ... mixer.json
+#
+# The predictions are consumed batch by batch as they come out of the model.
+# The patches are converted into tf.train.Example on a pool of worker
+# threads, whilst a writer thread writes the serialised examples in the
+# export order, so that the writing overlaps with the inference instead of
+# running afterwards. The patches are divided into shards of contiguous
+# patches, named so that Earth Engine reads them in order. The number of
+# patches waiting to be written is bounded, so the memory used does not
+# depend on the number of patches. The patches that were not predicted
+# (returned as NaN probabilities by stream_predictions()) are written with
+# a fill value, so that they can be masked once uploaded.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import tensorflow as tf
+
+from .evaluate_predictions import stream_predictions
+
+__all__ = ['PredictionsWriter', 'write_predictions']
+
+
+class PredictionsWriter:
+    """
+    Class that serialises batches of predictions on a pool of workers and
+    writes them, in the order they are received, into the TFRecords shards
+    expected by the Earth Engine upload.
+
+    Parameters
+    ----------
+    mixer : dict
+        Mixer of the predicted patches (e.g., from GetFilesInfo.get_mixer)
+    output_prefix : str
+        Path and prefix of the TFRecords. The shards are named as the prefix
+        followed by '-00000.tfrecord', '-00001.tfrecord', etc.
+    num_shards : int, optional
+        Number of TFRecords the patches are divided into (default 1)
+    workers : int, optional
+        Number of threads serialising the patches (default 4)
+    kernel_size : list, optional
+        The kernelSize used in the export options, if any. The buffer is
+        cropped from the predictions, as Earth Engine expects the patches
+        of the size in the mixer
+    band_name : str, optional
+        Name of the band of the uploaded image (default 'prediction')
+    transpose : bool, optional
+        flag to transpose the predictions back to (height, width) before
+        writing them (default True), as the datasets prepared with this
+        package feed the models (width, height, bands) patches
+    max_pending : int, optional
+        Maximum number of patches waiting to be written (default 64)
+    fill_value : float, optional
+        Value written in the patches that were not predicted (default -1)
+
+    Functions
+    ---------
+    write(predictions)
+        queue a batch of predictions for serialisation and writing
+    close()
+        wait for all the patches to be written and close the TFRecords
+    abort()
+        stop writing after a failure, without raising the writer's errors
+    """
+
+    def __init__(self, mixer, output_prefix, num_shards=1, workers=4,
+                 kernel_size=None, band_name='prediction', transpose=True,
+                 max_pending=64, fill_value=-1):
+        "Class constructor"
+
+        super().__init__()
+        self.mixer = mixer
+        self.output_prefix = output_prefix
+        self.band_name = band_name
+        self.transpose = transpose
+        self.fill_value = fill_value
+        self.crop = 0 if kernel_size is None else kernel_size[0] // 2
+
+        total = mixer['totalPatches']
+        self.bounds = [total * s // num_shards for s in range(num_shards + 1)]
+        self.files = ['{}-{:05d}.tfrecord'.format(output_prefix, s)
+                      for s in range(num_shards)]
+        self.n_written = 0
+
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.writer_thread = threading.Thread(target=self.__write_records)
+        self.writer_thread.start()
+
+    def write(self, predictions):
+        """
+        Function that queues a batch of predictions. The patches are
+        serialised by the workers and written in the order they are queued.
+        The function blocks if too many patches are waiting to be written.
+
+        Parameters
+        ----------
+        predictions : array
+            batch of probabilities (B, W, H, n_classes) or classes (B, W, H)
+        """
+
+        if self.error is not None:
+            raise self.error
+
+        predictions = np.asarray(predictions)
+        if predictions.ndim == 4:
+            # The patches not predicted are filled with NaN probabilities
+            rejected = np.isnan(predictions[:, 0, 0, 0])
+            predictions = predictions.argmax(axis=-1)
+            predictions[rejected] = self.fill_value
+
+        for patch in predictions:
+            self.pending.put(self.executor.submit(self.__serialise, patch))
+
+    def close(self):
+        """
+        Function that waits for the queued patches to be written and closes
+        the TFRecords.
+
+        Returns
+        -------
+        list
+            The list of the TFRecords written
+        """
+
+        self.__stop()
+
+        if self.error is not None:
+            raise self.error
+
+        if self.n_written != self.mixer['totalPatches']:
+            print('WARNING: {} patches were written but the mixer reports {} '
+                  'patches'.format(self.n_written, self.mixer['totalPatches']))
+
+        return self.files
+
+    def abort(self):
+        """
+        Function that stops the writer thread and the workers after a
+        failure of the code feeding the predictions, without raising the
+        errors of the writer or checking the number of patches, so that
+        the original exception is not masked. The TFRecords written are
+        incomplete.
+        """
+
+        self.__stop()
+
+    def __stop(self):
+        "Function that waits for the writer thread and the workers to end"
+
+        self.pending.put(None)
+        self.writer_thread.join()
+        self.executor.shutdown()
+
+    def __serialise(self, patch):
+        "Function that converts a patch into a serialised tf.train.Example"
+
+        if self.transpose:
+            patch = patch.T
+        if self.crop > 0:
+            patch = patch[self.crop:-self.crop, self.crop:-self.crop]
+
+        example = tf.train.Example(features=tf.train.Features(feature={
+            self.band_name: tf.train.Feature(float_list=tf.train.FloatList(
+                value=patch.ravel().astype(np.float32)))
+        }))
+
+        return example.SerializeToString()
+
+    def __write_records(self):
+        """
+        Function run by the writer thread, which writes the serialised
+        patches in order, moving to the next shard once a shard is full.
+        """
+
+        shard = 0
+        writer = None
+        try:
+            while True:
+                future = self.pending.get()
+                if future is None:
+                    break
+
+                while (shard < len(self.files) - 1) & \
+                      (self.n_written >= self.bounds[shard + 1]):
+                    if writer is not None:
+                        writer.close()
+                        writer = None
+                    shard += 1
+                if writer is None:
+                    writer = tf.io.TFRecordWriter(self.files[shard])
+
+                writer.write(future.result())
+                self.n_written += 1
+        except Exception as e:
+            self.error = e
+
+            # Emptying the queue so that write() does not block
+            while self.pending.get() is not None:
+                pass
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+def write_predictions(model, dataset, mixer, output_prefix, num_shards=1,
+                      workers=4, kernel_size=None, band_name='prediction',
+                      fill_value=-1):
+    """
+    Function that runs the input model on the prediction dataset one batch
+    at a time and writes the predicted classes into TFRecords ready to be
+    uploaded to Earth Engine, using the PredictionsWriter class. The
+    serialisation and writing of each batch run whilst the next batches
+    are predicted.
+
+    Parameters
+    ----------
+    model : keras.model
+        Trained model
+    dataset : tf.data.Dataset
+        Batches of patches from prepare_prediction_dataset()
+    mixer : dict
+        Mixer of the predicted patches (e.g., from GetFilesInfo.get_mixer)
+    output_prefix : str
+        Path and prefix of the TFRecords (e.g., 'gs://bucket/folder/image')
+    num_shards : int, optional
+        Number of TFRecords the patches are divided into (default 1)
+    workers : int, optional
+        Number of threads serialising the patches (default 4)
+    kernel_size : list, optional
+        The kernelSize used in the export options, if any
+    band_name : str, optional
+        Name of the band of the uploaded image (default 'prediction')
+    fill_value : float, optional
+        Value written in the patches not predicted because rejected by
+        prepare_prediction_dataset() (default -1)
+
+    Returns
+    -------
+    list
+        The list of the TFRecords written
+    """
+
+    if (not isinstance(num_shards, int)) | (num_shards <= 0):
+        print('ERROR: the number of shards needs to be a positive integer')
+        return None
+    elif (not isinstance(workers, int)) | (workers <= 0):
+        print('ERROR: the number of workers needs to be a positive integer')
+        return None
+    elif num_shards > mixer['totalPatches']:
+        print('ERROR: there are fewer patches than shards')
+        return None
+
+    writer = PredictionsWriter(mixer, output_prefix, num_shards, workers,
+                               kernel_size, band_name,
+                               fill_value=fill_value)
+    try:
+        for predictions in stream_predictions(model, dataset):
+            writer.write(predictions)
+    except BaseException:
+        writer.abort()
+        raise
+
+    return writer.close()
@@ -12,14 +12,44 @@
 # hot encoded (this is beause keras expects a one-hot-encoded tensor when
 # dealing with multi-class, pixel-wise, classification).
 #
+# Optionally, the records can be batched before being parsed, so that whole
+# batches are parsed at once with tf.io.parse_example and the bands of all
+# the patches in the batch are stacked into channels-last tensors with a
+# single operation, instead of parsing and transposing one record at a time.
+#
+# With sparse_labels=True, the labels are kept as compact integer class maps
+# (uint8 for up to 256 classes) instead of one-hot tensors, so that each
+# pixel carries a single byte instead of n_classes float32 values. The
+# models need to be compiled with sparse losses and metrics (look at
+# sparse_labels.py in the CustomNeuralNetworks package).
+#
+# If a sensor is given as spectral_indices, the spectral indices are
+# computed from the raw bands of the parsed records and stacked with them
+# (look at the script in spectral_indices.py for details), so the exports
+# only need to include the raw bands.
+#
+# If given a minimum fraction of valid pixels, the patches mostly masked
+# by clouds, or without data, are dropped before batching (look at the
+# script in patch_filter.py for details).
+#
+# If a cache folder is provided, the TFRecords can be loaded through the
+# local cache of parsed records (look at the script in records_cache.py for
+# details). Datasets of already parsed records are detected automatically
+# and are not parsed again.
+#
 # Author: Davide Lomeo
 # Email: davide.lomeo20@imperial.ac.uk
 # GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
 # Date: 22 July 2021
 # Version: 0.1.0
 
+import numpy as np
 import tensorflow as tf
-__all__ = ['PrepareBatches']
+from .records_cache import load_cached_records
+from .records_shuffle import shuffle_buffer_size
+from .spectral_indices import add_spectral_indices, SENSOR_INDICES
+from .patch_filter import valid_fraction
+__all__ = ['PrepareBatches', 'sparse_labels_dtype']
 
 
 class PrepareBatches:
@@ -37,39 +67,108 @@ class PrepareBatches:
         number of classes to output in the last layer of the deep model used
     class_label : str
         name of the label assigbed to the classification column (array)
+    cache_dir : str, optional
+        local folder of the cache of parsed records (default None)
+    sparse_labels : bool, optional
+        flag to output integer class maps instead of one-hot labels
+    spectral_indices : str, optional
+        sensor of the raw bands ('sentinel2', 'landsat57' or 'landsat8')
+        to compute the spectral indices from (default None)
 
     Functions
     ---------
+    load_records(file_list)
+        load the TFRecords as a dataset, through the cache if available
     prepare_batches(train_batch_size, test_batch_size, train_batch,
-                        test_batch, val_batch=None, val_batch_size=None)
+                        test_batch, val_batch=None, val_batch_size=None,
+                        batch_parse=False, shuffle_bytes=None,
+                        min_valid_fraction=None)
         convert the input datases into tensorflow batches ready for training
     """
 
-    def __init__(self, features_dict, n_classes, class_label):
+    def __init__(self, features_dict, n_classes, class_label, cache_dir=None,
+                 sparse_labels=False, spectral_indices=None):
         "Class constructor"
 
         super().__init__()
         self.features_dict = features_dict
         self.n_classes = n_classes
         self.class_label = class_label
+        self.cache_dir = cache_dir
+        self.sparse_labels = sparse_labels
+        self.spectral_indices = spectral_indices
+
+    def load_records(self, file_list):
+        """
+        Function that loads the input TFRecords as a tensorflow dataset. If
+        the class was given a cache folder, the records are read from the
+        local cache of parsed records, which is created (or replaced, if
+        the TFRecords or the features dictionary changed) the first time.
+        Otherwise, the records are read from the GZIP TFRecords. Either
+        dataset can be split with dataset_split() and then passed to
+        prepare_batches(). This is not the case of the datasets of
+        interleave_records(), whose files are shuffled at every epoch:
+        split the files first with index_split(level='file',
+        return_files=True) and read each part with interleave_records().
+
+        Parameters
+        ----------
+        file_list : list
+            List of TFrecords file names (e.g., from GetFilesInfo.get_files)
+
+        Returns
+        -------
+        tensorflow dataset
+            dataset of the serialised records, or of the cached parsed records
+        """
+
+        if not isinstance(file_list, list):
+            print('ERROR: ensure that the file_list is a list')
+            return None
+
+        if self.cache_dir is None:
+            return tf.data.TFRecordDataset(file_list, compression_type='GZIP')
+
+        return load_cached_records(
+            file_list, self.features_dict, self.cache_dir)
 
     def prepare_batches(self,  train_batch_size, test_batch_size, train_batch,
-                        test_batch, val_batch=None, val_batch_size=None):
+                        test_batch, val_batch=None, val_batch_size=None,
+                        batch_parse=False, shuffle_bytes=None,
+                        min_valid_fraction=None):
         """
         Function that maps each TFRecord in the input datasets assigning them
         all the features in the features dictionary (i.e., expanding their
         dimensions, or channels, for how many bands have been inlcuded in the
         dictionary). Moreover, the feature containing the labels is separated
         and converted to a one-hot tensor, as needed by the keras deep models
-        when feeding in multi-class pixel-wise classes. The records are then
-        shuffled and split into batches as defined by the user. If the user
-        passes a validation dataset to the function but does not specifcy its
-        batch size, this will be assumed to be equal to the test batch size.
+        when feeding in multi-class pixel-wise classes (or to an integer class
+        map if the class was created with sparse_labels=True). The records are
+        then shuffled and split into batches as defined by the user. If the
+        user passes a validation dataset to the function but does not specifcy
+        its batch size, this will be assumed to be equal to the test batch
+        size.
         NOTE: The function requires at least 2 datasets, and optionally a third
         if validation is used. The datasets need to have been pre-processed and
         converted in tf.data.TFRecordDataset. In the case of a split, the
         tensorflow datatype name may differ (i.e., TakeDataset), but the
-        underlying structure is equivalent.
+        underlying structure is equivalent. Datasets loaded from the cache
+        with load_records() hold already parsed records, which are detected
+        and not parsed again.
+        If batch_parse is True, the records are shuffled and batched first
+        and each batch is then parsed in a single call. The output batches
+        have the same structure and layout of the default path, but the
+        parsing cost is paid once per batch rather than once per record.
+        By default the records are shuffled within a buffer of 10 records.
+        If shuffle_bytes is provided, the buffer of the training dataset
+        holds as many records as fit in that many bytes (look also at
+        two_level_shuffle() to shuffle the order of the files), while the
+        test and validation datasets keep the default buffer, so that the
+        budget is not taken once per dataset.
+        If min_valid_fraction is provided, the patches with a smaller
+        fraction of valid pixels (e.g., masked by clouds) are dropped. With
+        batch_parse, they are dropped from the parsed batches, which can
+        therefore be smaller than the batch size.
 
         Parameters
         ----------
@@ -85,6 +184,13 @@ class PrepareBatches:
             dataset of the test data (default None)
         val_batch_size : int, optional
             size of the batches of the validation dataset (default None)
+        batch_parse : bool, optional
+            flag to batch the records before parsing them (default False)
+        shuffle_bytes : int, optional
+            memory budget of the training shuffle buffer, in bytes (default
+            None)
+        min_valid_fraction : float, optional
+            minimum fraction of valid pixels of the patches (default None)
 
         Returns
         -------
@@ -92,37 +198,133 @@ class PrepareBatches:
             the BatchDatasets ready to be fed into deep models
         """
 
+        # Computing the number of training records that fit in the memory
+        # budget. The test and validation records are not shuffled further
+        buffer_size = 10
+        train_buffer_size = buffer_size
+        if shuffle_bytes is not None:
+            train_buffer_size = shuffle_buffer_size(shuffle_bytes,
+                                                    self.__record_bytes())
+            print('Shuffle buffer: {} records'.format(train_buffer_size))
+
         # Mapping training and test datasets
-        parsed_train = train_batch \
-            .map(self.__parse_tfrecord, num_parallel_calls=5) \
-            .map(self.__to_tuple) \
-            .shuffle(10) \
-            .batch(train_batch_size)
-
-        parsed_test = test_batch \
-            .map(self.__parse_tfrecord, num_parallel_calls=5) \
-            .map(self.__to_tuple) \
-            .shuffle(10) \
-            .batch(test_batch_size)
+        parsed_train = self.__map_dataset(
+            train_batch, train_batch_size, batch_parse, train_buffer_size,
+            min_valid_fraction)
+        parsed_test = self.__map_dataset(
+            test_batch, test_batch_size, batch_parse, buffer_size,
+            min_valid_fraction)
 
         # Mapping the validation datasets
         if val_batch:
-            parsed_valid = val_batch \
-                .map(self.__parse_tfrecord, num_parallel_calls=5) \
-                .map(self.__to_tuple) \
-                .shuffle(10)
 
             # Checking if the user has provided a size for the valid dataset.
             # If not, this is assumed to be the same as the test dataset
-            if val_batch_size:
-                parsed_valid = parsed_valid.batch(val_batch_size)
-            else:
-                parsed_valid = parsed_valid.batch(test_batch_size)
+            if not val_batch_size:
+                val_batch_size = test_batch_size
+
+            parsed_valid = self.__map_dataset(
+                val_batch, val_batch_size, batch_parse, buffer_size,
+                min_valid_fraction)
 
             return parsed_train, parsed_test, parsed_valid
 
         return parsed_train, parsed_test
 
+    def __map_dataset(self, dataset, batch_size, batch_parse, buffer_size,
+                      min_valid_fraction):
+        """
+        Function that shuffles, parses and batches the input dataset either
+        one record at a time or one batch at a time, dropping the patches
+        with too few valid pixels if needed.
+
+        Args
+        ----
+        dataset
+            the input tensorflow dataset of serialised records
+        batch_size
+            the size of the output batches
+        batch_parse
+            flag to batch the records before parsing them
+        buffer_size
+            the number of records in the shuffle buffer
+        min_valid_fraction
+            the minimum fraction of valid pixels of the patches, or None
+
+        Returns
+        -------
+        BatchDataset
+            the dataset of (features, labels) batches
+        """
+
+        # Records loaded from the cache are already parsed into dictionaries
+        parsed = isinstance(dataset.element_spec, dict)
+
+        if batch_parse:
+            dataset = dataset \
+                .shuffle(buffer_size) \
+                .batch(batch_size) \
+                .map(self.__stack_batch if parsed else self.__parse_batch,
+                     num_parallel_calls=tf.data.AUTOTUNE)
+
+            if min_valid_fraction is None:
+                return dataset
+
+            # Dropping the invalid patches of each batch at once, and the
+            # batches left empty
+            def drop_invalid(features, labels):
+                keep = valid_fraction(features) >= min_valid_fraction
+                return (tf.boolean_mask(features, keep),
+                        tf.boolean_mask(labels, keep))
+
+            return dataset \
+                .map(drop_invalid, num_parallel_calls=tf.data.AUTOTUNE) \
+                .filter(lambda features, labels: tf.shape(features)[0] > 0)
+
+        dataset = dataset \
+            .map(self.__split_label if parsed else self.__parse_tfrecord,
+                 num_parallel_calls=5) \
+            .map(self.__to_tuple)
+
+        if min_valid_fraction is not None:
+            dataset = dataset.filter(
+                lambda features, labels:
+                    valid_fraction(features) >= min_valid_fraction)
+
+        return dataset \
+            .shuffle(buffer_size) \
+            .batch(batch_size)
+
+    def __record_bytes(self):
+        """
+        Function that computes the size in bytes of a parsed record, i.e. of
+        its float32 bands and of its encoded labels.
+
+        Returns
+        -------
+        int
+            the size of a record in bytes
+        """
+
+        record_bytes = 0
+        for name, feature in self.features_dict.items():
+            n_values = int(np.prod(feature.shape))
+            if name != self.class_label:
+                record_bytes += n_values * feature.dtype.size
+            elif self.sparse_labels:
+                record_bytes += n_values * \
+                    sparse_labels_dtype(self.n_classes).size
+            else:
+                record_bytes += n_values * self.n_classes * 4
+
+        # Adding the float32 channels of the spectral indices
+        if self.spectral_indices is not None:
+            feature = self.features_dict[self.class_label]
+            record_bytes += int(np.prod(feature.shape)) * 4 * \
+                len(SENSOR_INDICES[self.spectral_indices])
+
+        return record_bytes
+
     def __parse_tfrecord(self, example_proto):
         """
         Parsing function that maps each record into the structure defined
@@ -143,9 +345,31 @@ class PrepareBatches:
         parsed_features = tf.io.parse_single_example(
             example_proto, self.features_dict)
 
+        return self.__split_label(parsed_features)
+
+    def __split_label(self, parsed_features):
+        """
+        Function that separates the label from the parsed features, and
+        adds the spectral indices to the features if needed.
+
+        Args
+        ----
+        parsed_features
+            the dictionary of the parsed record
+
+        Returns
+        -------
+        tuple
+            A tuple of the predictors dictionary and the label in int64 format.
+        """
+
         # pulling the feature of the label
         labels = parsed_features.pop(self.class_label)
 
+        if self.spectral_indices is not None:
+            parsed_features = add_spectral_indices(
+                parsed_features, self.spectral_indices)
+
         # returning the parsed record and it corresponding labels as a tuple
         return parsed_features, tf.cast(labels, tf.int64)
 
@@ -169,5 +393,108 @@ class PrepareBatches:
         tuple
             A tuple of the converted feature and label tensors.
         """
-        return (tf.transpose(list(inputs.values())),
-                tf.one_hot(indices=label, depth=self.n_classes))
+
+        # The bands are always stacked in alphabetical order, which is the
+        # order tensorflow gives to the keys of the parsed records
+        return (tf.transpose([inputs[k] for k in sorted(inputs)]),
+                self.__encode_labels(label))
+
+    def __parse_batch(self, example_protos):
+        """
+        Parsing function that maps a whole batch of records into the
+        structure defined by the dictionary of features and directly
+        returns the stacked features and the one-hot labels. The bands
+        are stacked and transposed once for the whole batch, giving
+        the same (width, height, channels) layout, and the same order
+        of the channels, that __to_tuple produces for each single record.
+
+        Args
+        ----
+        example_protos
+            the input batch of tensorflow records
+
+        Returns
+        -------
+        tuple
+            A tuple of the batched feature and label tensors.
+        """
+
+        # parsing the whole batch to the feature dictionary
+        parsed_features = tf.io.parse_example(
+            example_protos, self.features_dict)
+
+        return self.__stack_batch(parsed_features)
+
+    def __stack_batch(self, parsed_features):
+        """
+        Function that stacks the bands of a whole batch of parsed records
+        (and their spectral indices, if needed) and encodes their labels.
+
+        Args
+        ----
+        parsed_features
+            the dictionary of the parsed batch
+
+        Returns
+        -------
+        tuple
+            A tuple of the batched feature and label tensors.
+        """
+
+        # pulling the feature of the label
+        labels = tf.cast(parsed_features.pop(self.class_label), tf.int64)
+
+        if self.spectral_indices is not None:
+            parsed_features = add_spectral_indices(
+                parsed_features, self.spectral_indices)
+
+        # (batch, bands, height, width) -> (batch, width, height, bands)
+        features = tf.transpose(
+            tf.stack([parsed_features[k] for k in sorted(parsed_features)],
+                     axis=1),
+            perm=[0, 3, 2, 1])
+
+        return features, self.__encode_labels(labels)
+
+    def __encode_labels(self, labels):
+        """
+        Function that converts the labels into one-hot tensors or, if
+        sparse_labels is True, into compact integer class maps.
+
+        Args
+        ----
+        labels
+            the labels in int64 format
+
+        Returns
+        -------
+        tensor
+            the encoded labels
+        """
+
+        if self.sparse_labels:
+            return tf.cast(labels, sparse_labels_dtype(self.n_classes))
+
+        return tf.one_hot(indices=labels, depth=self.n_classes)
+
+
+def sparse_labels_dtype(n_classes):
+    """
+    Function that returns the smallest integer type that can hold the
+    input number of classes, used for the sparse labels.
+
+    Parameters
+    ----------
+    n_classes : int
+        number of classes of the classification
+
+    Returns
+    -------
+    tf.DType
+        tf.uint8 for up to 256 classes, tf.int32 otherwise
+    """
+
+    if n_classes <= 256:
+        return tf.uint8
+
+    return tf.int32
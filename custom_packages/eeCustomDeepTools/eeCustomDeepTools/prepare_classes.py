@@ -13,12 +13,14 @@
 
 import tensorflow as tf
 from pprint import pprint
+from .prepare_batches import sparse_labels_dtype
 
 __all__ = ['prepare_prediction_classes']
 
 
 def prepare_prediction_classes(file_list, dims, bands, one_hot=False,
-                               num_classes=None, verbose=True):
+                               num_classes=None, verbose=True,
+                               sparse_labels=False):
     """
     Function specifically designed to prepare a dataset containing
     the classification matrix obtained with the traditional classifier
@@ -42,6 +44,9 @@ def prepare_prediction_classes(file_list, dims, bands, one_hot=False,
         Number of classes of the classification. Only required if one_hot=True
     verbose : bool, optional
         Flag to output the content of the dictionary of features
+    sparse_labels : bool, optional
+        Flag to return compact integer class maps (uint8 for up to 256
+        classes) instead of int64. Requires num_classes and one_hot=False
 
     Returns
     -------
@@ -58,6 +63,9 @@ def prepare_prediction_classes(file_list, dims, bands, one_hot=False,
     elif not isinstance(bands, list):
         print('ERROR: ensure that the bands are input as a list')
         return None
+    elif sparse_labels & (one_hot | (num_classes is None)):
+        print('ERROR: sparse labels need num_classes and one_hot=False')
+        return None
 
     # Reading the TFRecords from the input file_list paths
     dataset = tf.data.TFRecordDataset(file_list, compression_type='GZIP')
@@ -92,4 +100,10 @@ def prepare_prediction_classes(file_list, dims, bands, one_hot=False,
     if one_hot:
         dataset = dataset.map(parse_one_hot, num_parallel_calls=5)
 
+    # or compact integer class maps
+    if sparse_labels:
+        labels_dtype = sparse_labels_dtype(num_classes)
+        dataset = dataset.map(lambda x: tf.cast(x, labels_dtype),
+                              num_parallel_calls=5)
+
     return dataset
@@ -7,6 +7,16 @@
 # in the records, and therefore, it does not split the records in
 # record/ hot-encoded class tuples.
 #
+# The patches are returned in the same order of the TFRecords (i.e., the
+# export order), as the predictions are written back to Earth Engine in
+# this order. The files can be read and decompressed in parallel, and the
+# patches are parsed with autotuned parallelism and prefetched in batches.
+# If a sensor is given as spectral_indices, the spectral indices are
+# computed from the raw bands and stacked with them. If given a minimum
+# fraction of valid pixels, each patch is returned with a flag that is
+# False if the patch is mostly masked (e.g., by clouds) or without data, so
+# that stream_predictions() does not run the model on it.
+#
 # Author: Davide Lomeo
 # Email: davide.lomeo20@imperial.ac.uk
 # GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
@@ -15,11 +25,19 @@
 
 import tensorflow as tf
 from pprint import pprint
+from .spectral_indices import add_spectral_indices, index_bands
+from .patch_filter import valid_fraction
 
 __all__ = ['prepare_prediction_dataset']
 
+# Upper bound of the records in a file, used to read a file as one batch
+MAX_RECORDS = 2 ** 31 - 1
+
 
-def prepare_prediction_dataset(file_list, dims, bands, verbose=True):
+def prepare_prediction_dataset(file_list, dims, bands, verbose=True,
+                               batch_size=1, num_parallel_reads=1,
+                               spectral_indices=None,
+                               min_valid_fraction=None):
     """
     Function specifically designed to prepare a dataset destined
     for predictions. Given that this dataset does not need to be
@@ -30,6 +48,10 @@ def prepare_prediction_dataset(file_list, dims, bands, verbose=True):
     -> model.predict(function_output_dataset).
     NOTE: This function is specifically designed to map pacthes of
     known dimensions (height and width).
+    NOTE: when num_parallel_reads is larger than 1, the files are read
+    whole, so that they can be decompressed in parallel whilst keeping
+    the order of the patches. Up to num_parallel_reads files are therefore
+    held in memory at once.
 
     Parameters
     ----------
@@ -41,6 +63,17 @@ def prepare_prediction_dataset(file_list, dims, bands, verbose=True):
         List of bands names to inlcude in the predictions dataset
     verbose : bool, optional
         Flag to output the content of the dictionary of features
+    batch_size : int, optional
+        Number of patches in each batch (default 1)
+    num_parallel_reads : int, optional
+        Number of files read in parallel (default 1)
+    spectral_indices : str, optional
+        Sensor of the raw bands ('sentinel2', 'landsat57' or 'landsat8') to
+        compute the spectral indices from (default None)
+    min_valid_fraction : float, optional
+        Minimum fraction of valid pixels of the patches to predict. If
+        provided, the dataset returns (patches, flags) tuples, where the
+        flags are False for the patches under the threshold (default None)
 
     Returns
     -------
@@ -57,9 +90,39 @@ def prepare_prediction_dataset(file_list, dims, bands, verbose=True):
     elif not isinstance(bands, list):
         print('ERROR: ensure that the bands are input as a list')
         return None
+    elif (not isinstance(batch_size, int)) | (batch_size <= 0):
+        print('ERROR: the batch size needs to be a positive integer')
+        return None
+    elif (not isinstance(num_parallel_reads, int)) | \
+         (num_parallel_reads <= 0):
+        print('ERROR: the number of parallel reads needs to be a positive '
+              'integer')
+        return None
+
+    # Checking that the raw bands of the spectral indices are available
+    if spectral_indices is not None:
+        needed = index_bands(spectral_indices)
+        if needed is None:
+            return None
+        elif not set(needed).issubset(bands):
+            print('ERROR: the bands {} are needed to compute the spectral '
+                  'indices'.format(needed))
+            return None
 
     # Reading the TFRecords from the input file_list paths
-    dataset = tf.data.TFRecordDataset(file_list, compression_type='GZIP')
+    if num_parallel_reads == 1:
+        dataset = tf.data.TFRecordDataset(file_list, compression_type='GZIP')
+    else:
+        # Each file is read as a single batch of records, so the interleave
+        # returns the files in order whilst reading the next ones
+        dataset = tf.data.Dataset.from_tensor_slices(file_list) \
+            .interleave(
+                lambda f: tf.data.TFRecordDataset(
+                    f, compression_type='GZIP').batch(MAX_RECORDS),
+                cycle_length=num_parallel_reads,
+                num_parallel_calls=num_parallel_reads,
+                deterministic=True) \
+            .unbatch()
 
     # Generating a dictionary of features for each input band. This is
     # necessary to map and create multi-channel tensors
@@ -73,6 +136,9 @@ def prepare_prediction_dataset(file_list, dims, bands, verbose=True):
         "Function that parses each input feature to the feature_dict"
         parsed_features = tf.io.parse_single_example(
             example_proto, features_dict)
+        if spectral_indices is not None:
+            parsed_features = add_spectral_indices(
+                parsed_features, spectral_indices)
         return parsed_features
 
     def stack_images(features):
@@ -85,10 +151,22 @@ def prepare_prediction_dataset(file_list, dims, bands, verbose=True):
     # Parsing each TFrecords to the feature dictionary in order to
     # obtain multi-channel tensors and stacking the images to get
     # long tensors for each band and feature. This is required when
-    # making prediction using TFRecords in Keras
+    # making prediction using TFRecords in Keras. The parallel maps are
+    # deterministic, so the patches remain in order
+    dataset = dataset \
+        .map(parse_image, num_parallel_calls=tf.data.AUTOTUNE) \
+        .map(stack_images, num_parallel_calls=tf.data.AUTOTUNE)
+
+    # Flagging the patches with too few valid pixels, which are kept so
+    # that the order of the patches does not change
+    if min_valid_fraction is not None:
+        dataset = dataset.map(
+            lambda features:
+                (features, valid_fraction(features) >= min_valid_fraction),
+            num_parallel_calls=tf.data.AUTOTUNE)
+
     dataset = dataset \
-        .map(parse_image, num_parallel_calls=5) \
-        .map(stack_images, num_parallel_calls=5) \
-        .batch(1)
+        .batch(batch_size) \
+        .prefetch(tf.data.AUTOTUNE)
 
     return dataset
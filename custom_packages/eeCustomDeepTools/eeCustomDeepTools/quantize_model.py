@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script converts the trained Keras models into quantized TensorFlow
+# Lite models, which are faster and smaller on CPU-only machines. Two kinds
+# of post-training quantization are available:
+# - 'dynamic': the weights are stored as int8 and the activations are
+#   quantized on the fly, with no calibration needed. This halves the size
+#   of the model but it is not necessarily faster than float32 on CPU
+# - 'int8': full-integer quantization of the weights and of the activations,
+#   calibrated on a representative sample of the patches to classify (e.g.,
+#   drawn from prepare_prediction_dataset()). The inputs and outputs remain
+#   float32, so the quantized model is fed the same patches as the original
+# https://www.tensorflow.org/lite/performance/post_training_quantization
+#
+# The quantized models are run with the TFLitePredictor class, which has the
+# same predict_on_batch() method of the Keras models, so that it can be used
+# with stream_predictions(), TiledPredictor and write_predictions(). The
+# compare_quantized_model() function reports the change of latency, memory
+# and per-class accuracy of the quantized model with respect to the original.
+# The memory of the process is sampled in a thread while each model runs,
+# with psutil if installed (or else from /proc on Linux), and the sizes of
+# the models are compared as files (the Keras model is saved as .h5).
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import os
+import time
+import tempfile
+import threading
+
+import numpy as np
+import tensorflow as tf
+
+from .evaluate_predictions import StreamingEvaluator
+
+# tf.lite.Interpreter is being moved to the LiteRT package
+try:
+    from ai_edge_litert.interpreter import Interpreter
+except ImportError:
+    Interpreter = tf.lite.Interpreter
+
+# psutil is only needed to measure the memory on every platform
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+__all__ = ['quantize_model', 'TFLitePredictor', 'compare_quantized_model']
+
+
+def quantize_model(model, output_path, representative_dataset=None,
+                   mode='int8', n_samples=100):
+    """
+    Function that converts the input Keras model into a quantized TensorFlow
+    Lite model and saves it to the output path.
+
+    Parameters
+    ----------
+    model : keras.model or str
+        Trained model, or path to a saved model (e.g., models/*.h5)
+    output_path : str
+        Path to the .tflite file of the quantized model
+    representative_dataset : tf.data.Dataset, optional
+        Patches used to calibrate the 'int8' quantization, batched or not
+        (e.g., from prepare_prediction_dataset())
+    mode : str, optional
+        Either 'int8' (full-integer) or 'dynamic' (default 'int8')
+    n_samples : int, optional
+        Number of patches used for the calibration (default 100)
+
+    Returns
+    -------
+    str
+        The path to the quantized model
+    """
+
+    if mode not in ['int8', 'dynamic']:
+        print("ERROR: the mode needs to be either 'int8' or 'dynamic'")
+        return None
+    elif (mode == 'int8') & (representative_dataset is None):
+        print('ERROR: the int8 quantization needs a representative dataset')
+        return None
+
+    if isinstance(model, str):
+        model = tf.keras.models.load_model(model)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if mode == 'int8':
+        if len(representative_dataset.element_spec.shape) == 4:
+            representative_dataset = representative_dataset.unbatch()
+
+        def calibration_samples():
+            "Generator of the patches used to calibrate the activations"
+            for patch in representative_dataset.take(n_samples):
+                yield [tf.cast(patch[tf.newaxis], tf.float32)]
+
+        converter.representative_dataset = calibration_samples
+        converter.target_spec.supported_ops = [
+            tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+
+    return output_path
+
+
+class TFLitePredictor:
+    """
+    Class that runs a TensorFlow Lite model on batches of patches, with the
+    same interface as the Keras models used in this package.
+
+    Parameters
+    ----------
+    model_path : str
+        Path to the .tflite file (e.g., from quantize_model())
+    num_threads : int, optional
+        Number of CPU threads used by the interpreter (default all)
+
+    Functions
+    ---------
+    predict_on_batch(batch)
+        run the model on a batch of patches and return the probabilities
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        "Class constructor"
+
+        super().__init__()
+        self.model_path = model_path
+        self.interpreter = Interpreter(model_path=model_path,
+                                       num_threads=num_threads)
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.batch_shape = None
+
+    def predict_on_batch(self, batch):
+        """
+        Function that runs the model on the input batch. The interpreter is
+        only resized when the shape of the batch changes.
+
+        Parameters
+        ----------
+        batch : array
+            Batch of patches of the shape expected by the model
+
+        Returns
+        -------
+        numpy array
+            The probabilities predicted for the batch
+        """
+
+        batch = np.asarray(batch, dtype=np.float32)
+        if batch.shape != self.batch_shape:
+            self.interpreter.resize_tensor_input(self.input_index,
+                                                 batch.shape)
+            self.interpreter.allocate_tensors()
+            self.batch_shape = batch.shape
+
+        self.interpreter.set_tensor(self.input_index, batch)
+        self.interpreter.invoke()
+
+        return self.interpreter.get_tensor(self.output_index)
+
+
+def compare_quantized_model(model, tflite_path, dataset, n_classes,
+                            classes_dataset=None, num_threads=None,
+                            decimal=4):
+    """
+    Function that runs both the original and the quantized models on the
+    input dataset and reports the latency per patch, the size of the
+    model files, the increase of the memory of the process (peak sampled
+    while running each model, with respect to before running it), and the
+    per-class accuracies of both models. The accuracies are computed
+    against the classes in classes_dataset if provided (e.g., from
+    prepare_prediction_classes()), or else against the predictions of the
+    original model (i.e., how much the quantized model agrees with it).
+    NOTE: the memory increase is None if the memory of the process cannot
+    be measured (i.e., without psutil outside of Linux).
+
+    Parameters
+    ----------
+    model : keras.model or str
+        Trained model, or path to a saved model
+    tflite_path : str
+        Path to the quantized model (e.g., from quantize_model())
+    dataset : tf.data.Dataset
+        Batches of patches, e.g. from prepare_prediction_dataset()
+    n_classes : int
+        Number of classes of the classification
+    classes_dataset : tf.data.Dataset, optional
+        Reference classes from prepare_prediction_classes()
+    num_threads : int, optional
+        Number of CPU threads used by the interpreter (default all)
+    decimal : int, optional
+        Number of decimals for each figure
+
+    Returns
+    -------
+    dictionary
+        A dictionary with the 'original' and 'quantized' reports and the
+        change of latency and accuracies of the quantized model
+    """
+
+    if isinstance(model, str):
+        keras_size = _path_size(model)
+        model = tf.keras.models.load_model(model)
+    else:
+        with tempfile.TemporaryDirectory() as folder:
+            model.save(os.path.join(folder, 'model.h5'))
+            keras_size = _path_size(os.path.join(folder, 'model.h5'))
+
+    models = [('original', model, keras_size),
+              ('quantized', TFLitePredictor(tflite_path, num_threads),
+               _path_size(tflite_path))]
+
+    # Only the predicted classes are kept, to compare the models afterwards
+    reports = {}
+    predicted = {}
+    for name, predictor, size in models:
+        predicted[name] = []
+        elapsed = 0
+        n_patches = 0
+        with _PeakMemory() as memory:
+            for batch in dataset:
+                start = time.perf_counter()
+                probabilities = predictor.predict_on_batch(batch)
+                elapsed += time.perf_counter() - start
+                n_patches += len(probabilities)
+                predicted[name].append(np.argmax(probabilities, axis=-1))
+
+        reports[name] = {
+            'latency_ms_per_patch': round(
+                1000 * elapsed / max(n_patches, 1), decimal),
+            'model_size_bytes': int(size),
+            'peak_memory_increase_bytes': memory.increase
+        }
+
+    for name in reports:
+        # The original predictions are in the same layout of the others
+        evaluator = StreamingEvaluator(
+            n_classes, transpose=classes_dataset is not None)
+        if classes_dataset is None:
+            for batch, reference in zip(predicted[name],
+                                        predicted['original']):
+                evaluator.update(batch, reference)
+        elif evaluator.evaluate(predicted[name], classes_dataset) is None:
+            return None
+        reports[name].update(evaluator.get_metrics(decimal))
+
+    original = reports['original']
+    quantized = reports['quantized']
+    with np.errstate(invalid='ignore'):
+        reports['change'] = {
+            'speedup': round(original['latency_ms_per_patch'] /
+                             max(quantized['latency_ms_per_patch'],
+                                 10 ** -decimal), decimal),
+            'size_ratio': round(quantized['model_size_bytes'] /
+                                original['model_size_bytes'], decimal),
+            'overall_accuracy': round(quantized['overall_accuracy'] -
+                                      original['overall_accuracy'], decimal),
+            'producers_accuracy': np.round(
+                np.subtract(quantized['producers_accuracy'],
+                            original['producers_accuracy']), decimal).tolist(),
+            'users_accuracy': np.round(
+                np.subtract(quantized['users_accuracy'],
+                            original['users_accuracy']), decimal).tolist()
+        }
+
+    return reports
+
+
+def _path_size(path):
+    """
+    Helper function that returns the size in bytes of a file, or of all the
+    files of a folder (e.g., a SavedModel)
+    """
+
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+
+    return sum(os.path.getsize(os.path.join(root, f))
+               for root, _, files in os.walk(path) for f in files)
+
+
+def _process_memory():
+    """
+    Helper function that returns the resident memory of the process in
+    bytes, or None if it cannot be measured
+    """
+
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _PeakMemory:
+    """
+    Helper class that samples the memory of the process in a thread while
+    the code in its with block runs, and returns the increase of the peak
+    with respect to the memory before the block
+    """
+
+    def __init__(self, interval=0.005):
+        "Class constructor"
+
+        super().__init__()
+        self.interval = interval
+        self.start = None
+        self.peak = None
+        self.increase = None
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.__sample, daemon=True)
+
+    def __enter__(self):
+        self.start = _process_memory()
+        self.peak = self.start
+        if self.start is not None:
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start is not None:
+            self.stop.set()
+            self.thread.join()
+            self.__update()
+            self.increase = int(self.peak - self.start)
+        return False
+
+    def __sample(self):
+        "Function that keeps the peak of the memory until stopped"
+
+        while not self.stop.wait(self.interval):
+            self.__update()
+
+    def __update(self):
+        "Function that updates the peak with the current memory"
+
+        self.peak = max(self.peak, _process_memory())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script transcodes the GZIP TFRecords exported from Earth Engine into
+# a local cache of already parsed, fixed-shape tensors. The transcoding
+# only runs once: the GZIP files are decompressed and the records are
+# parsed using the dictionary of features, and the resulting tensors are
+# saved uncompressed with tf.data.Dataset.save() into shards holding the
+# same number of records each (the shards exported by Earth Engine can
+# have very different sizes). The records are assigned to the shards in
+# turn and read back from the shards in turn, so the cached records keep
+# the order of the TFRecords whatever the number of CPUs.
+#
+# The cache of each export is saved in a folder named after the export
+# folder and prefix of the TFRecords, followed by a key computed from the
+# names, sizes and modification times of the TFRecords and from the
+# dictionary of features. If any of these change, the key changes and the
+# old cache is deleted and transcoded again.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import os
+import json
+import hashlib
+
+import tensorflow as tf
+
+__all__ = ['get_cache_path', 'transcode_records', 'load_cached_records']
+
+# Name of the file written in the cache folder once the cache is complete
+CACHE_INFO = 'cache_info.json'
+
+
+def get_cache_path(file_list, features_dict, cache_dir):
+    """
+    Function that returns the folder of the cache of the input TFRecords.
+    The name of the folder is made of the export folder and prefix of the
+    TFRecords and of a key that changes whenever the TFRecords or the
+    dictionary of features change.
+
+    Parameters
+    ----------
+    file_list : list
+        List of TFrecords file names (e.g., from GetFilesInfo.get_files)
+    features_dict : dict
+        dictionary containing Fixed Lenght Features
+    cache_dir : str
+        Local folder where the caches are saved
+
+    Returns
+    -------
+    str
+        The path to the cache folder
+    """
+
+    if not isinstance(file_list, list):
+        print('ERROR: ensure that the file_list is a list')
+        return None
+    elif not isinstance(features_dict, dict):
+        print('ERROR: ensure that the features_dict is a dictionary')
+        return None
+
+    return '{}/{}{}'.format(cache_dir.rstrip('/'), _export_name(file_list),
+                            _cache_key(file_list, features_dict))
+
+
+def transcode_records(file_list, features_dict, cache_dir, num_shards=None):
+    """
+    Function that parses the input GZIP TFRecords using the dictionary of
+    features and saves the parsed tensors into the cache folder, divided
+    into num_shards uncompressed shards of equal number of records. Any
+    cache previously saved for the same export but with a different key
+    (i.e., outdated) is deleted.
+
+    Parameters
+    ----------
+    file_list : list
+        List of TFrecords file names (e.g., from GetFilesInfo.get_files)
+    features_dict : dict
+        dictionary containing Fixed Lenght Features
+    cache_dir : str
+        Local folder where the caches are saved
+    num_shards : int, optional
+        Number of shards of the cache (default is the number of TFRecords)
+
+    Returns
+    -------
+    str
+        The path to the cache folder
+    """
+
+    cache_path = get_cache_path(file_list, features_dict, cache_dir)
+    if cache_path is None:
+        return None
+
+    if num_shards is None:
+        num_shards = max(len(file_list), 1)
+
+    # Deleting outdated caches of the same export
+    _remove_caches(cache_dir, _export_name(file_list), keep=cache_path)
+
+    dataset = tf.data.TFRecordDataset(file_list, compression_type='GZIP') \
+        .map(lambda x: tf.io.parse_single_example(x, features_dict),
+             num_parallel_calls=tf.data.AUTOTUNE)
+
+    # The records are assigned to the shards in turn, so that all the
+    # shards hold the same number of records (plus or minus one)
+    dataset.enumerate().save(
+        cache_path, shard_func=lambda i, features: i % num_shards)
+
+    # Writing the info file last, as its presence marks a complete cache
+    with tf.io.gfile.GFile(cache_path + '/' + CACHE_INFO, 'w') as js:
+        json.dump({'files': sorted(file_list),
+                   'features': _features_spec(features_dict),
+                   'shards': num_shards}, js)
+
+    return cache_path
+
+
+def load_cached_records(file_list, features_dict, cache_dir, num_shards=None):
+    """
+    Function that returns the dataset of parsed records stored in the cache
+    of the input TFRecords, transcoding the TFRecords first if the cache is
+    missing or outdated. The elements of the dataset are dictionaries of
+    tensors, as returned by tf.io.parse_single_example, and the dataset can
+    be split with dataset_split() and passed to PrepareBatches like a
+    tf.data.TFRecordDataset.
+
+    Parameters
+    ----------
+    file_list : list
+        List of TFrecords file names (e.g., from GetFilesInfo.get_files)
+    features_dict : dict
+        dictionary containing Fixed Lenght Features
+    cache_dir : str
+        Local folder where the caches are saved
+    num_shards : int, optional
+        Number of shards of the cache if it needs transcoding
+
+    Returns
+    -------
+    tf.data.Dataset
+        Tensorflow dataset of the parsed records
+    """
+
+    cache_path = get_cache_path(file_list, features_dict, cache_dir)
+    if cache_path is None:
+        return None
+
+    if not tf.io.gfile.exists(cache_path + '/' + CACHE_INFO):
+        print('Transcoding {} TFRecords into {}'.format(
+            len(file_list), cache_path))
+        transcode_records(file_list, features_dict, cache_dir, num_shards)
+
+    with tf.io.gfile.GFile(cache_path + '/' + CACHE_INFO, 'r') as js:
+        cached_shards = json.load(js)['shards']
+
+    # Reading one record from each shard in turn, in the order they were
+    # assigned (the default reader interleaves as many shards as CPUs)
+    def reader_func(shards):
+        return shards.interleave(lambda shard: shard,
+                                 cycle_length=cached_shards, block_length=1)
+
+    return tf.data.Dataset.load(cache_path, reader_func=reader_func) \
+        .map(lambda i, features: features)
+
+
+def _export_name(file_list):
+    "Helper function that returns the export folder and prefix of the files"
+
+    folder = os.path.basename(os.path.dirname(file_list[0]))
+
+    # Earth Engine names the files as the prefix followed by their number
+    prefix = os.path.commonprefix(
+        [os.path.basename(f).split('.')[0] for f in file_list])
+    prefix = prefix.rstrip('0123456789')
+
+    return '{}_{}'.format(folder, prefix)
+
+
+def _features_spec(features_dict):
+    "Helper function that converts the features dictionary into a json list"
+
+    return [[k, list(v.shape), v.dtype.name]
+            for k, v in sorted(features_dict.items())]
+
+
+def _cache_key(file_list, features_dict):
+    """
+    Helper function that hashes the names, sizes and modification times
+    of the input files together with the dictionary of features
+    """
+
+    files = []
+    for f in sorted(file_list):
+        stat = tf.io.gfile.stat(f)
+        files.append([f, stat.length, stat.mtime_nsec])
+
+    content = json.dumps([files, _features_spec(features_dict)])
+
+    return hashlib.md5(content.encode()).hexdigest()[:16]
+
+
+def _remove_caches(cache_dir, export_name, keep):
+    "Helper function that deletes the caches of the export except keep"
+
+    if not tf.io.gfile.isdir(cache_dir):
+        return
+
+    for folder in tf.io.gfile.listdir(cache_dir):
+        path = '{}/{}'.format(cache_dir.rstrip('/'), folder.rstrip('/'))
+        if (folder.rstrip('/')[:-16] == export_name) & (path != keep):
+            print('Deleting outdated cache {}'.format(path))
+            tf.io.gfile.rmtree(path)
+
+    # Deleting the cache to keep too if it was left incomplete
+    if tf.io.gfile.exists(keep) & \
+       (not tf.io.gfile.exists(keep + '/' + CACHE_INFO)):
+        tf.io.gfile.rmtree(keep)
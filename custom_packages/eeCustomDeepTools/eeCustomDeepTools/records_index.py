@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script builds an index of the TFRecords exported from Earth Engine.
+# Each .tfrecord.gz file is scanned only once (the files are scanned in
+# parallel) and, for each record, the offset and the length of its data in
+# the uncompressed stream are stored, together with the number of records
+# in the file, the md5 checksum, the size and the modification time of the
+# compressed file. The index of each file is saved as a .json sidecar file,
+# so that the number of patches can be checked against the mixer file, the
+# records can be read directly from their position and the records can be
+# shared among workers by ranges.
+#
+# The structure of a TFRecord is:
+# uint64 length | uint32 masked crc of length | data | uint32 masked crc of data
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import gzip
+import json
+import struct
+import hashlib
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import tensorflow as tf
+
+__all__ = ['build_records_index', 'read_records_index', 'read_record',
+           'check_patches_count', 'split_record_ranges']
+
+# Size of the chunks of compressed data read at a time
+CHUNK_SIZE = 1 << 22
+
+
+def build_records_index(file_list, workers=4, index_dir=None,
+                        overwrite=False):
+    """
+    Function that scans each input TFRecord once, in parallel across
+    files, and saves the index of its records as a .json sidecar file
+    named as the TFRecord followed by '.index.json'. The sidecar files
+    are saved next to the TFRecords, or in index_dir if provided (e.g.,
+    if the TFRecords are stored in a read-only bucket). The index of a
+    file is not built again if its sidecar file already exists and the
+    size and the modification time of the file have not changed, unless
+    overwrite is True.
+
+    Parameters
+    ----------
+    file_list : list
+        List of TFrecords file names (e.g., from GetFilesInfo.get_files)
+    workers : int, optional
+        Number of files to scan in parallel (default 4)
+    index_dir : str, optional
+        Folder where to save the sidecar files (default None)
+    overwrite : bool, optional
+        Flag to build the index again even if already available
+
+    Returns
+    -------
+    dictionary
+        A dictionary with the file names as keys and their index as values
+    """
+
+    if not isinstance(file_list, list):
+        print('ERROR: ensure that the file_list is a list')
+        return None
+    elif (not isinstance(workers, int)) | (workers <= 0):
+        print('ERROR: the number of workers needs to be a positive integer')
+        return None
+
+    def index_file(file_name):
+        "Function that loads the index of the file or builds it"
+        sidecar = _sidecar_path(file_name, index_dir)
+        stat = tf.io.gfile.stat(file_name)
+
+        if (not overwrite) & tf.io.gfile.exists(sidecar):
+            index = _load_json(sidecar)
+            if (index['size'] == stat.length) & \
+               (index.get('mtime') == stat.mtime_nsec):
+                return index
+
+        index = _scan_file(file_name)
+        index['mtime'] = stat.mtime_nsec
+        with tf.io.gfile.GFile(sidecar, 'w') as js:
+            json.dump(index, js)
+
+        return index
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        indices = list(executor.map(index_file, file_list))
+
+    return dict(zip(file_list, indices))
+
+
+def read_records_index(file_list, index_dir=None):
+    """
+    Function that loads the .json sidecar files previously saved by
+    build_records_index().
+
+    Parameters
+    ----------
+    file_list : list
+        List of TFrecords file names
+    index_dir : str, optional
+        Folder where the sidecar files were saved (default None)
+
+    Returns
+    -------
+    dictionary
+        A dictionary with the file names as keys and their index as values
+    """
+
+    if not isinstance(file_list, list):
+        print('ERROR: ensure that the file_list is a list')
+        return None
+
+    missing = [f for f in file_list
+               if not tf.io.gfile.exists(_sidecar_path(f, index_dir))]
+    if missing != []:
+        print('ERROR: the index of {} was not found. Please build it with '
+              'build_records_index()'.format(missing))
+        return None
+
+    return {f: _load_json(_sidecar_path(f, index_dir)) for f in file_list}
+
+
+def read_record(file_name, index, record):
+    """
+    Function that reads a single serialised record using its offset and
+    length in the index, without parsing the records that come before it.
+    NOTE: GZIP streams cannot be accessed randomly, so for .gz files the
+    data before the record still needs decompressing (but not parsing).
+    Uncompressed TFRecords are accessed directly.
+
+    Parameters
+    ----------
+    file_name : str
+        Path to the TFRecord
+    index : dictionary
+        Index of the TFRecord as returned by build_records_index()
+    record : int
+        Position of the record in the TFRecord
+
+    Returns
+    -------
+    bytes
+        The serialised record, ready to be parsed with tf.io.parse_example
+    """
+
+    if (record < 0) | (record >= index['records']):
+        print('ERROR: the file only has {} records'.format(index['records']))
+        return None
+
+    with tf.io.gfile.GFile(file_name, 'rb') as f:
+        stream = gzip.GzipFile(fileobj=f) if file_name.endswith('.gz') else f
+        stream.seek(index['offsets'][record])
+        return stream.read(index['lengths'][record])
+
+
+def check_patches_count(indices, mixer):
+    """
+    Function that checks that the number of records in the index matches
+    the total number of patches reported in the mixer file.
+
+    Parameters
+    ----------
+    indices : dictionary
+        Indices of the TFRecords as returned by build_records_index()
+    mixer : dictionary
+        Mixer of the TFRecords (e.g., from GetFilesInfo.get_mixer)
+
+    Returns
+    -------
+    bool
+        True if the number of records matches the number of patches
+    """
+
+    tot_records = sum(index['records'] for index in indices.values())
+
+    if tot_records != mixer['totalPatches']:
+        print('WARNING: the TFRecords contain {} records but the mixer '
+              'reports {} patches'.format(tot_records, mixer['totalPatches']))
+        return False
+
+    return True
+
+
+def split_record_ranges(indices, num_workers):
+    """
+    Function that divides the records listed in the indices into contiguous
+    ranges of (almost) equal number of records, one for each worker. The
+    order of the records is the order of the files in the indices.
+
+    Parameters
+    ----------
+    indices : dictionary
+        Indices of the TFRecords as returned by build_records_index()
+    num_workers : int
+        Number of workers sharing the records
+
+    Returns
+    -------
+    list
+        For each worker, a list of (file name, first record, end record)
+    """
+
+    if (not isinstance(num_workers, int)) | (num_workers <= 0):
+        print('ERROR: the number of workers needs to be a positive integer')
+        return None
+
+    tot_records = sum(index['records'] for index in indices.values())
+    bounds = [tot_records * w // num_workers for w in range(num_workers + 1)]
+
+    ranges = [[] for _ in range(num_workers)]
+    first = 0
+    for file_name, index in indices.items():
+        last = first + index['records']
+        for w in range(num_workers):
+            start = max(first, bounds[w])
+            end = min(last, bounds[w + 1])
+            if start < end:
+                ranges[w].append((file_name, start - first, end - first))
+        first = last
+
+    return ranges
+
+
+def _sidecar_path(file_name, index_dir):
+    "Helper function that returns the path of the sidecar file"
+
+    if index_dir is None:
+        return file_name + '.index.json'
+
+    return '{}/{}.index.json'.format(
+        index_dir.rstrip('/'), file_name.split('/')[-1])
+
+
+def _load_json(path):
+    "Helper function that loads a .json file from any storage"
+
+    with tf.io.gfile.GFile(path, 'r') as js:
+        return json.load(js)
+
+
+def _scan_file(file_name):
+    """
+    Helper function that reads the input TFRecord in chunks, computing the
+    checksum of the raw bytes and walking through the headers of the
+    records in the uncompressed stream, without parsing the records.
+    """
+
+    compressed = file_name.endswith('.gz')
+    md5 = hashlib.md5()
+    size = 0
+
+    # 16 + MAX_WBITS tells zlib to expect a GZIP header
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    offsets = []
+    lengths = []
+    buffer = b''
+    position = 0
+
+    with tf.io.gfile.GFile(file_name, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            md5.update(chunk)
+            size += len(chunk)
+
+            if compressed:
+                data = decompressor.decompress(chunk)
+
+                # Earth Engine may write several GZIP members in a file
+                while decompressor.unused_data:
+                    leftover = decompressor.unused_data
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                    data += decompressor.decompress(leftover)
+            else:
+                data = chunk
+
+            # Walking through the complete records available in the buffer
+            buffer += data
+            start = 0
+            while len(buffer) - start >= 12:
+                length = struct.unpack('<Q', buffer[start:start + 8])[0]
+                frame = 12 + length + 4
+                if len(buffer) - start < frame:
+                    break
+                offsets.append(position + start + 12)
+                lengths.append(length)
+                start += frame
+            buffer = buffer[start:]
+            position += start
+
+    if buffer:
+        print('WARNING: {} ends with an incomplete record'.format(file_name))
+
+    return {
+        'file': file_name,
+        'size': size,
+        'md5': md5.hexdigest(),
+        'records': len(offsets),
+        'offsets': offsets,
+        'lengths': lengths
+    }
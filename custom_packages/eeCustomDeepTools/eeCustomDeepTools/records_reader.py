@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script reads the TFRecords exported from Earth Engine for training,
+# interleaving several files at once, so that the GZIP files are
+# decompressed in parallel instead of one after the other on a single
+# thread. The order of the files is shuffled at every epoch and, when
+# training on several workers, each worker deterministically reads its own
+# subset of the files, so that no record is read twice in an epoch.
+#
+# The output dataset contains the serialised records, as a
+# tf.data.TFRecordDataset, so it can be passed to the PrepareBatches class.
+# As the order of the files changes at every epoch, the output must not be
+# split with dataset_split() (take/skip would pick different records at
+# every epoch, mixing the training and test records). Split the list of
+# files first, with index_split(level='file', return_files=True), and call
+# interleave_records() on each part.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import tensorflow as tf
+
+__all__ = ['interleave_records']
+
+
+def interleave_records(file_list, num_parallel_reads=4, shuffle_files=True,
+                       seed=None, worker_index=0, num_workers=1,
+                       block_length=1):
+    """
+    Function that reads the input TFRecords interleaving num_parallel_reads
+    files at a time. The files are first sorted and assigned to the workers
+    in turn (the worker i reads the files i, i + num_workers, etc.), so the
+    sharding does not depend on the order of the input list. The files of
+    the worker are then shuffled at every epoch if shuffle_files is True.
+    If a seed is provided the order of the records is reproducible,
+    otherwise the records are returned as soon as they are read. To get
+    training and test datasets, split the files first with
+    index_split(level='file', return_files=True) and call this function
+    on each part: do not split its output with dataset_split().
+
+    Parameters
+    ----------
+    file_list : list
+        List of TFrecords file names (e.g., from GetFilesInfo.get_files)
+    num_parallel_reads : int, optional
+        Number of files read and decompressed in parallel (default 4)
+    shuffle_files : bool, optional
+        Flag to shuffle the order of the files at every epoch (default True)
+    seed : int, optional
+        Seed of the shuffling, which also makes the output deterministic
+    worker_index : int, optional
+        Index of the current worker (default 0)
+    num_workers : int, optional
+        Number of workers sharing the files (default 1)
+    block_length : int, optional
+        Number of consecutive records taken from each file (default 1)
+
+    Returns
+    -------
+    tf.data.Dataset
+        Tensorflow dataset of the serialised records of the worker
+    """
+
+    worker_files = _worker_files(file_list, num_parallel_reads,
+                                 worker_index, num_workers)
+    if worker_files is None:
+        return None
+
+    files = tf.data.Dataset.from_tensor_slices(worker_files)
+
+    if shuffle_files:
+        files = files.shuffle(len(worker_files), seed=seed,
+                              reshuffle_each_iteration=True)
+
+    return files.interleave(
+        lambda f: tf.data.TFRecordDataset(f, compression_type='GZIP'),
+        cycle_length=num_parallel_reads, block_length=block_length,
+        num_parallel_calls=num_parallel_reads,
+        deterministic=seed is not None)
+
+
+def _worker_files(file_list, num_parallel_reads, worker_index, num_workers):
+    """
+    Helper function that checks the inputs and returns the files of the
+    worker, also used by the functions of the records_shuffle module
+    """
+
+    if not isinstance(file_list, list):
+        print('ERROR: ensure that the file_list is a list')
+        return None
+    elif (not isinstance(num_parallel_reads, int)) | \
+         (num_parallel_reads <= 0):
+        print('ERROR: the number of parallel reads needs to be a positive '
+              'integer')
+        return None
+    elif (not isinstance(num_workers, int)) | (num_workers <= 0):
+        print('ERROR: the number of workers needs to be a positive integer')
+        return None
+    elif (worker_index < 0) | (worker_index >= num_workers):
+        print('ERROR: the worker index needs to be between 0 and {}'.format(
+            num_workers - 1))
+        return None
+    elif len(file_list) < num_workers:
+        print('ERROR: there are fewer files ({}) than workers ({})'.format(
+            len(file_list), num_workers))
+        return None
+
+    return sorted(file_list)[worker_index::num_workers]
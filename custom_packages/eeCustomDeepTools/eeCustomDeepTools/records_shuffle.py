@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script shuffles the TFRecords exported from Earth Engine in two
+# levels. Earth Engine writes neighbouring patches one after the other, so
+# a small shuffle buffer (e.g., shuffle(10)) only swaps patches of the same
+# area, and the batches hardly mix different areas:
+# - level 1: the order of the files (shards) is shuffled at every epoch and
+#   several files are interleaved, so consecutive records come from
+#   different files, as done by interleave_records()
+# - level 2: the records are shuffled within a buffer whose size is
+#   computed from a memory budget in bytes, rather than from a number of
+#   records, so the buffer is as large as the memory allows whatever the
+#   number of bands and the size of the patches
+#
+# The measure_mixing() function runs the same two levels on the positions
+# of the records (without reading them) and reports how well the records
+# are mixed, so that the memory budget can be chosen with numbers.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import numpy as np
+import tensorflow as tf
+from .records_reader import interleave_records, _worker_files
+
+__all__ = ['shuffle_buffer_size', 'two_level_shuffle', 'measure_mixing']
+
+
+def shuffle_buffer_size(memory_budget, record_bytes):
+    """
+    Function that returns the number of records that fit in the memory
+    budget (at least 1).
+
+    Parameters
+    ----------
+    memory_budget : int
+        Memory available for the shuffle buffer, in bytes
+    record_bytes : int
+        Size of a record, in bytes
+
+    Returns
+    -------
+    int
+        The size of the shuffle buffer, in records
+    """
+
+    return max(int(memory_budget // max(record_bytes, 1)), 1)
+
+
+def two_level_shuffle(file_list, memory_budget, seed=None,
+                      num_parallel_reads=4, worker_index=0, num_workers=1,
+                      verbose=True):
+    """
+    Function that reads the input TFRecords shuffling the order of the
+    files at every epoch, interleaving num_parallel_reads files at a time,
+    and shuffling the records within a buffer that fits in the memory
+    budget. The size of the records is taken from the first record of the
+    first file. The files are shared among the workers as in
+    interleave_records(). The output dataset contains the serialised
+    records, so it can be passed to the PrepareBatches class.
+
+    Parameters
+    ----------
+    file_list : list
+        List of TFrecords file names (e.g., from GetFilesInfo.get_files)
+    memory_budget : int
+        Memory available for the shuffle buffer, in bytes
+    seed : int, optional
+        Seed of both shuffles, which also makes the output deterministic
+    num_parallel_reads : int, optional
+        Number of files interleaved (default 4)
+    worker_index : int, optional
+        Index of the current worker (default 0)
+    num_workers : int, optional
+        Number of workers sharing the files (default 1)
+    verbose : bool, optional
+        Flag to print the size of the shuffle buffer
+
+    Returns
+    -------
+    tf.data.Dataset
+        Tensorflow dataset of the shuffled serialised records
+    """
+
+    if memory_budget <= 0:
+        print('ERROR: the memory budget needs to be a positive number')
+        return None
+
+    worker_files = _worker_files(file_list, num_parallel_reads,
+                                 worker_index, num_workers)
+    if worker_files is None:
+        return None
+
+    first_record = next(iter(tf.data.TFRecordDataset(
+        worker_files[0], compression_type='GZIP')))
+    buffer_size = shuffle_buffer_size(memory_budget, len(first_record.numpy()))
+
+    if verbose:
+        print('Shuffle buffer: {} records'.format(buffer_size))
+
+    return interleave_records(
+        file_list, num_parallel_reads, shuffle_files=True, seed=seed,
+        worker_index=worker_index, num_workers=num_workers) \
+        .shuffle(buffer_size, seed=seed, reshuffle_each_iteration=True)
+
+
+def measure_mixing(file_list, memory_budget, record_bytes,
+                   records_per_file=None, batch_size=32, seed=0,
+                   num_parallel_reads=4):
+    """
+    Function that measures how well the two-level shuffle mixes the records
+    over one epoch. The shuffle is run on the positions of the records
+    rather than on the records, and the function reports:
+    - buffer_size: the size of the shuffle buffer in records
+    - buffer_fraction: the fraction of the records held in the buffer
+    - rank_correlation: the Spearman correlation between the original and
+      the shuffled positions (1 means unshuffled, 0 means fully mixed)
+    - files_per_batch: the average number of different files in a batch,
+      divided by the largest possible number (1 means fully mixed)
+
+    Parameters
+    ----------
+    file_list : list
+        List of TFrecords file names
+    memory_budget : int
+        Memory available for the shuffle buffer, in bytes
+    record_bytes : int
+        Size of a record, in bytes
+    records_per_file : list, optional
+        Number of records of each file (e.g., from build_records_index()).
+        If not provided, the records of the files are counted
+    batch_size : int, optional
+        Size of the training batches (default 32)
+    seed : int, optional
+        Seed of the shuffles (default 0)
+    num_parallel_reads : int, optional
+        Number of files interleaved (default 4)
+
+    Returns
+    -------
+    dictionary
+        A dictionary containing the mixing metrics
+    """
+
+    if memory_budget <= 0:
+        print('ERROR: the memory budget needs to be a positive number')
+        return None
+
+    worker_files = _worker_files(file_list, num_parallel_reads, 0, 1)
+    if worker_files is None:
+        return None
+
+    if records_per_file is None:
+        records_per_file = [
+            int(tf.data.TFRecordDataset(f, compression_type='GZIP').reduce(
+                0, lambda count, _: count + 1)) for f in worker_files]
+
+    # Position of the first record of each file in the original order
+    starts = tf.constant(np.cumsum([0] + list(records_per_file[:-1])),
+                         tf.int64)
+    counts = tf.constant(records_per_file, tf.int64)
+    buffer_size = shuffle_buffer_size(memory_budget, record_bytes)
+
+    positions = np.array(list(_two_level(
+        len(worker_files),
+        lambda i: tf.data.Dataset.range(counts[i]).map(
+            lambda r: (i, starts[i] + r)),
+        buffer_size, num_parallel_reads, seed).as_numpy_iterator()))
+
+    n_records = len(positions)
+    file_ids, original = positions[:, 0], positions[:, 1]
+
+    # Spearman correlation: original positions against output positions
+    rank_correlation = np.corrcoef(original, np.arange(n_records))[0, 1]
+
+    n_batches = int(np.ceil(n_records / batch_size))
+    files_per_batch = np.mean([
+        len(np.unique(file_ids[b * batch_size:(b + 1) * batch_size]))
+        for b in range(n_batches)])
+
+    return {
+        'buffer_size': buffer_size,
+        'buffer_fraction': round(min(buffer_size / n_records, 1.0), 4),
+        'rank_correlation': round(float(rank_correlation), 4),
+        'files_per_batch': round(
+            float(files_per_batch) / min(batch_size, len(worker_files)), 4)
+    }
+
+
+def _two_level(n_files, read_file, buffer_size, num_parallel_reads, seed):
+    """
+    Helper function that shuffles the indices of the files, interleaves the
+    datasets returned by read_file for each index and shuffles the records
+    within the buffer, in the same order as two_level_shuffle() does with
+    the records.
+    """
+
+    return tf.data.Dataset.range(n_files) \
+        .shuffle(n_files, seed=seed, reshuffle_each_iteration=True) \
+        .interleave(read_file, cycle_length=num_parallel_reads,
+                    num_parallel_calls=num_parallel_reads,
+                    deterministic=seed is not None) \
+        .shuffle(buffer_size, seed=seed, reshuffle_each_iteration=True)
@@ -6,13 +6,22 @@
 # Optionally, the user can request to get a validation dataset
 # by passing a float value to the variable `valid_chunk`.
 #
+# The script also allows to split the list of TFRecords directly, assigning
+# each record (or each file) to a partition only once using a stable hash
+# of its index (or name). The partitions are therefore always the same and
+# never overlap across epochs, and the test and validation datasets do not
+# need to stream through the training records first.
+#
 # Author: Davide Lomeo
 # Email: davide.lomeo20@imperial.ac.uk
 # GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
 # Date: 22 July 2021
 # Version: 0.1.0
 
-__all__ = ['dataset_split']
+import hashlib
+import tensorflow as tf
+
+__all__ = ['dataset_split', 'index_split']
 
 
 def dataset_split(dataset, tot_patches, training_chunk,
@@ -48,20 +57,9 @@ def dataset_split(dataset, tot_patches, training_chunk,
     if (tot_patches < 0) | (not isinstance(tot_patches, int)):
         error_messages.append(
             'ERROR: the number of patches needs to be a positive number')
-    elif (training_chunk < 0.0) | (training_chunk > 1.0) | \
-         (test_chunk < 0.0) | (test_chunk > 1.0):
-        error_messages.append(
-            'ERROR: the proportions need to be between 0.0 and 1.0')
-    elif (training_chunk + test_chunk != 1.0) & (not valid_chunk):
-        error_messages.append(
-            'ERROR: the proportions need to add up to exactly 1.0')
-    if valid_chunk:
-        if (valid_chunk < 0.0) | (valid_chunk > 1.0):
-            error_messages.append(
-                'ERROR: the proportions need to be between 0.0 and 1.0')
-        elif (training_chunk + test_chunk + valid_chunk) != 1.0:
-            error_messages.append(
-                'ERROR: the proportions need to add up to exactly 1.0')
+    else:
+        error_messages = _check_proportions(
+            training_chunk, test_chunk, valid_chunk)
     if error_messages != []:
         print(*error_messages, sep='\n')
         if valid_chunk:
@@ -107,3 +105,181 @@ def dataset_split(dataset, tot_patches, training_chunk,
           train_size, test_size))
 
     return training_ds, test_ds
+
+
+def index_split(file_list, training_chunk, test_chunk, valid_chunk=None,
+                level='record', seed=0, return_files=False):
+    """
+    Function that splits the input TFRecords into training and test
+    (and optionally validation) datasets without shuffling. Each record
+    is assigned to a partition once and for all using a stable hash of
+    its position in the input files (level='record'), or each file is
+    assigned to a partition using a stable hash of its name
+    (level='file'). The same inputs and seed always give the same
+    partitions, which never overlap. With level='file' each partition
+    only reads its own files, whilst with level='record' the records of
+    the other partitions are skipped before being parsed. With
+    level='file' and return_files=True, the lists of files of the
+    partitions are returned instead of the datasets, e.g., to read each
+    partition with interleave_records().
+
+    Parameters
+    ----------
+    file_list : list
+        List of TFrecords file names (e.g., from GetFilesInfo.get_files)
+    training_chunk : float
+        The proportion of records to use as training dataset
+    test_chunk : float
+        The proportion of records to use as test dataset
+    valid_chunk : float, optional
+        The proportion of records to use as validation dataset
+    level : str, optional
+        The unit assigned to the partitions: 'record' or 'file'
+    seed : int, optional
+        Seed of the hash used to assign the records (or files)
+    return_files : bool, optional
+        Flag to return the lists of files of the partitions instead of the
+        datasets (only with level='file')
+
+    Returns
+    -------
+    training_dataset, test dataset, (optional, validation dataset)
+        The datasets (or lists of files) obtained with the split
+        (speficically in this order)
+    """
+
+    # Series of check to ensure that all the parameters are valid
+    error_messages = []
+    if not isinstance(file_list, list):
+        error_messages.append('ERROR: ensure that the file_list is a list')
+    elif level not in ['record', 'file']:
+        error_messages.append("ERROR: the level needs to be 'record' or 'file'")
+    elif return_files & (level != 'file'):
+        error_messages.append(
+            "ERROR: the files can only be returned with level='file'")
+    else:
+        error_messages = _check_proportions(
+            training_chunk, test_chunk, valid_chunk)
+    if error_messages != []:
+        print(*error_messages, sep='\n')
+        if valid_chunk:
+            return None, None, None
+        else:
+            return None, None
+
+    chunks = [training_chunk, test_chunk]
+    if valid_chunk:
+        chunks.append(valid_chunk)
+
+    if level == 'file':
+        datasets = _split_files(file_list, chunks, seed, return_files)
+    else:
+        datasets = _split_records(file_list, chunks, seed)
+
+    if (test_chunk >= training_chunk):
+        print('''WARNING: the script executed succesfully, but note that the
+        test set was set to be larger than the training dataset.\n''')
+
+    return tuple(datasets)
+
+
+def _check_proportions(training_chunk, test_chunk, valid_chunk):
+    "Helper function that returns the errors found in the split proportions"
+
+    error_messages = []
+    if (training_chunk < 0.0) | (training_chunk > 1.0) | \
+       (test_chunk < 0.0) | (test_chunk > 1.0):
+        error_messages.append(
+            'ERROR: the proportions need to be between 0.0 and 1.0')
+    elif (training_chunk + test_chunk != 1.0) & (not valid_chunk):
+        error_messages.append(
+            'ERROR: the proportions need to add up to exactly 1.0')
+    if valid_chunk:
+        if (valid_chunk < 0.0) | (valid_chunk > 1.0):
+            error_messages.append(
+                'ERROR: the proportions need to be between 0.0 and 1.0')
+        elif (training_chunk + test_chunk + valid_chunk) != 1.0:
+            error_messages.append(
+                'ERROR: the proportions need to add up to exactly 1.0')
+
+    return error_messages
+
+
+def _split_files(file_list, chunks, seed, return_files=False):
+    """
+    Helper function that sorts the files by a seeded hash of their names
+    and assigns consecutive groups of files to each partition
+    """
+
+    def file_hash(file_name):
+        "Function that hashes the name of the file (without its folder)"
+        name = '{}/{}'.format(seed, file_name.split('/')[-1])
+        return hashlib.md5(name.encode()).hexdigest()
+
+    sorted_files = sorted(file_list, key=file_hash)
+
+    datasets = []
+    sizes = []
+    start = 0
+    cumulative = 0.0
+    for i, chunk in enumerate(chunks):
+        cumulative += chunk
+        if i == len(chunks) - 1:
+            end = len(sorted_files)
+        else:
+            end = int(round(cumulative * len(sorted_files)))
+        partition = sorted_files[start:end]
+        start = end
+
+        if partition == []:
+            print('''WARNING: one of the partitions did not get any file.
+            Use more files or split at record level.\n''')
+
+        sizes.append(len(partition))
+        if return_files:
+            datasets.append(partition)
+        else:
+            datasets.append(tf.data.TFRecordDataset(
+                partition, compression_type='GZIP'))
+
+    print('Files per partition: {}'.format(sizes))
+
+    return datasets
+
+
+def _split_records(file_list, chunks, seed):
+    """
+    Helper function that assigns each record to a partition comparing
+    a seeded hash of its index with the cumulative split proportions
+    """
+
+    # Sorting the files, as the order of the listed files depends on the
+    # storage, and the index of each record needs to be always the same
+    dataset = tf.data.TFRecordDataset(
+        sorted(file_list), compression_type='GZIP')
+
+    def record_bucket(index):
+        "Function that maps the record index to a stable value in [0, 1)"
+        key = tf.strings.join([str(seed), tf.strings.as_string(index)], '/')
+        return tf.cast(tf.strings.to_hash_bucket_fast(key, 1000000),
+                       tf.float64) / 1000000.0
+
+    datasets = []
+    lower = 0.0
+    for i, chunk in enumerate(chunks):
+        upper = 1.0 if i == len(chunks) - 1 else lower + chunk
+
+        def in_partition(index, record, lower=lower, upper=upper):
+            "Function that checks if the record belongs to the partition"
+            bucket = record_bucket(index)
+            return (bucket >= lower) & (bucket < upper)
+
+        datasets.append(dataset
+                        .enumerate()
+                        .filter(in_partition)
+                        .map(lambda index, record: record))
+        lower = upper
+
+    print('Proportions per partition: {}'.format(chunks))
+
+    return datasets
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script keeps a local copy of the TFRecords and mixer files stored in
+# Google Cloud Storage (or in any other storage handled by the backends of
+# storage_backends.py, e.g. a mounted Google Drive). Without a local copy,
+# TensorFlow streams the TFRecords from the bucket at every epoch and of
+# every training run.
+#
+# The files are downloaded the first time they are requested (in parallel
+# across files) and their md5 checksum is verified against the checksum
+# stored in the bucket (or, if the bucket has none, in the .index.json
+# sidecar built by build_records_index(), if any). The cache has a maximum
+# size: when a new file does not fit, the files that were used the longest
+# time ago are deleted first (least recently used). A file is downloaded
+# again if its size or modification time in the bucket change.
+#
+# The state of the cache is saved in a .json manifest inside the cache
+# folder, so the cache is reused by the following training runs. A cache
+# folder is meant to be used by one process at a time.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .storage_backends import LocalStorage
+
+__all__ = ['ShardCache']
+
+# Name of the manifest file saved in the cache folder
+MANIFEST = 'shard_cache.json'
+
+# Size of the chunks of data copied at a time
+CHUNK_SIZE = 1 << 22
+
+
+class ShardCache:
+    """
+    Class that keeps a size-capped local copy of remote files, evicting the
+    least recently used files when full.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Local folder where the files are saved
+    max_bytes : int, optional
+        Maximum size of the cache in bytes (default 50 GiB)
+    workers : int, optional
+        Number of files downloaded in parallel (default 4)
+    backend : LocalStorage or CloudStorage, optional
+        Storage backend of the remote files (default LocalStorage)
+
+    Functions
+    ---------
+    fetch(file_list)
+        Return the local paths of the files, downloading the missing ones
+    cached_bytes()
+        Return the size of the files in the cache
+    clear()
+        Delete all the files in the cache
+    """
+
+    def __init__(self, cache_dir, max_bytes=50 * 2**30, workers=4,
+                 backend=None):
+        "Class constructor"
+
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.backend = LocalStorage() if backend is None else backend
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.__manifest = self.__load_manifest()
+
+    def fetch(self, file_list):
+        """
+        Function that returns the local paths of the input files, in the
+        same order. The files missing from the cache, or changed in the
+        bucket, are downloaded and verified first, making room by deleting
+        the least recently used files. If the files do not all fit in the
+        cache, or a file fails the checksum, its remote path is returned
+        instead, so that TensorFlow can still read it from the bucket.
+
+        Parameters
+        ----------
+        file_list : list
+            List of remote file names (e.g., from GetFilesInfo.get_files)
+
+        Returns
+        -------
+        list
+            A list of the local paths of the files
+        """
+
+        if not isinstance(file_list, list):
+            print('ERROR: ensure that the file_list is a list')
+            return None
+
+        entries = self.__manifest['files']
+        unique = sorted(set(file_list))
+        stats = dict(zip(unique, self.backend.stat_many(unique)))
+
+        missing = [f for f in stats if not self.__is_cached(f, stats[f])]
+        for f in missing:
+            self.__remove(f)
+
+        # Making room for the missing files without deleting the requested
+        # files. The files that still do not fit are read from the bucket
+        room = self.__make_room(
+            sum(stats[f]['size'] for f in missing), keep=set(file_list))
+        to_fetch = []
+        for f in sorted(missing, key=lambda f: file_list.index(f)):
+            if stats[f]['size'] <= room:
+                to_fetch.append(f)
+                room -= stats[f]['size']
+
+        if len(to_fetch) < len(missing):
+            print('WARNING: {} files do not fit in the cache and will be '
+                  'read from the bucket'.format(len(missing) - len(to_fetch)))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            downloaded = list(executor.map(
+                lambda f: self.__download(f, stats[f]), to_fetch))
+
+        for f, entry in zip(to_fetch, downloaded):
+            if entry is not None:
+                entries[f] = entry
+
+        # Marking the requested files as used, in the order of the list
+        for f in file_list:
+            if f in entries:
+                self.__manifest['clock'] += 1
+                entries[f]['used'] = self.__manifest['clock']
+
+        self.__save_manifest()
+
+        return [self.__local_path(f) if f in entries else f
+                for f in file_list]
+
+    def cached_bytes(self):
+        """
+        Function that returns the size of the files in the cache.
+
+        Returns
+        -------
+        int
+            The size of the cached files in bytes
+        """
+
+        return sum(e['size'] for e in self.__manifest['files'].values())
+
+    def clear(self):
+        "Function that deletes all the files in the cache"
+
+        for f in list(self.__manifest['files']):
+            self.__remove(f)
+
+        self.__save_manifest()
+
+    def __is_cached(self, file_name, stat):
+        "Function that checks that the cached copy of a file is up to date"
+
+        entry = self.__manifest['files'].get(file_name)
+        if entry is None:
+            return False
+
+        local = self.__local_path(file_name)
+        if (entry['size'] != stat['size']) | \
+           (entry['mtime'] != stat['mtime']) | \
+           (not os.path.exists(local)):
+            return False
+
+        return os.path.getsize(local) == stat['size']
+
+    def __make_room(self, n_bytes, keep):
+        """
+        Function that deletes the least recently used files not in keep
+        until n_bytes fit in the cache, and returns the space available
+        """
+
+        entries = self.__manifest['files']
+        for f in sorted(entries, key=lambda f: entries[f]['used']):
+            if self.max_bytes - self.cached_bytes() >= n_bytes:
+                break
+            if f not in keep:
+                self.__remove(f)
+
+        return self.max_bytes - self.cached_bytes()
+
+    def __download(self, file_name, stat):
+        """
+        Function that copies a file into the cache and verifies the md5
+        checksum of the copy against the checksum of the remote file.
+        Returns the entry of the manifest, or None if the copy failed the
+        verification.
+        """
+
+        local = self.__local_path(file_name)
+        expected = self.__remote_md5(file_name, stat)
+        md5 = self.backend.download(file_name, local + '.part')
+
+        # The backends return the checksum computed while downloading. The
+        # copy is only read again for custom backends that do not
+        if md5 is None:
+            md5 = _file_md5(local + '.part')
+
+        size = os.path.getsize(local + '.part')
+        if (size != stat['size']) | \
+           ((expected is not None) and (md5 != expected)):
+            print('ERROR: the copy of {} does not match its checksum. The '
+                  'file will be read from the bucket'.format(file_name))
+            os.remove(local + '.part')
+            return None
+
+        # Renaming the copy only once complete, so no partial file is used
+        os.replace(local + '.part', local)
+
+        return {'size': size, 'mtime': stat['mtime'], 'md5': md5,
+                'used': 0}
+
+    def __remote_md5(self, file_name, stat):
+        """
+        Function that returns the md5 checksum of a remote file, taken from
+        its stat if the bucket stores it, otherwise from its .index.json
+        sidecar if available and of the same size of the file. Returns None
+        if no checksum is available (e.g., for composite objects), in which
+        case only the size is verified
+        """
+
+        if stat['md5'] is not None:
+            return stat['md5']
+
+        sidecar = file_name + '.index.json'
+        if self.backend.exists(sidecar):
+            index = json.loads(self.backend.read(sidecar))
+            if index['size'] == stat['size']:
+                return index['md5']
+
+        return None
+
+    def __remove(self, file_name):
+        "Function that deletes a file from the cache"
+
+        local = self.__local_path(file_name)
+        if os.path.exists(local):
+            os.remove(local)
+
+        self.__manifest['files'].pop(file_name, None)
+
+    def __local_path(self, file_name):
+        """
+        Function that returns the local path of a file. The name of the
+        file is kept (after a hash of the full path) so that the local
+        path still ends with .tfrecord.gz or .json
+        """
+
+        return '{}/{}_{}'.format(
+            self.cache_dir.rstrip('/'),
+            hashlib.md5(file_name.encode()).hexdigest()[:16],
+            os.path.basename(file_name))
+
+    def __load_manifest(self):
+        "Function that loads the manifest of the cache, if any"
+
+        path = self.cache_dir.rstrip('/') + '/' + MANIFEST
+        if not os.path.exists(path):
+            return {'clock': 0, 'files': {}}
+
+        with open(path) as js:
+            return json.load(js)
+
+    def __save_manifest(self):
+        "Function that saves the manifest of the cache"
+
+        path = self.cache_dir.rstrip('/') + '/' + MANIFEST
+        with open(path + '.part', 'w') as js:
+            json.dump(self.__manifest, js)
+
+        os.replace(path + '.part', path)
+
+
+def _file_md5(path):
+    "Helper function that computes the md5 checksum of a local file"
+
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        chunk = f.read(CHUNK_SIZE)
+        while chunk:
+            md5.update(chunk)
+            chunk = f.read(CHUNK_SIZE)
+
+    return md5.hexdigest()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script computes the spectral indices of the eeCustomTools package
+# (NDVI, NDWI, MNDWI, NDSI, NDMI, EVI, EVI2, GOSAVI, SAVI) inside the input
+# pipeline, from the raw bands of the parsed records. The exports therefore
+# only need to carry the raw bands (e.g., 12 bands instead of 21 for
+# Sentinel-2), which reduces the size of the TFRecords and the data read
+# at every epoch by about 40%.
+#
+# The indices are computed with the same formulas and bands used on the
+# Earth Engine side by sentinel2_spectral_indices(),
+# landsat57_spectral_indices() and landsat8_spectral_indices(), so the
+# models trained on exports including the indices can be fed the indices
+# computed locally. The bands of each index are derived, as on the Earth
+# Engine side, from the roles of its bands and the band of each role for
+# each sensor, which mirror the tables of index_tables.py of the
+# eeCustomTools package (this package does not depend on it, and the tests
+# check that the two agree). As in Earth Engine, a division by zero gives
+# 0, and the normalised differences are 0 where one of the bands is
+# negative (Earth Engine masks these pixels and the export writes 0 in
+# their place). The indices are added to the dictionary of the parsed bands,
+# which is kept in alphabetical order, so the channels are stacked in the
+# same order as for an export including the indices.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import tensorflow as tf
+
+__all__ = ['SENSOR_INDICES', 'add_spectral_indices', 'index_bands']
+
+
+# Indices computed for the Landsat sensors
+_LANDSAT_INDICES = {
+    'NDVI': ('nd', ['NIR', 'RED']),
+    'NDWI': ('nd', ['SWIR', 'NIR']),
+    'MNDWI': ('nd', ['SWIR', 'RED']),
+    'NDSI': ('nd', ['MIR', 'YELLOW']),
+    'NDMI': ('nd', ['SWIR', 'NIR']),
+    'EVI': ('evi', ['NIR', 'RED', 'BLUE']),
+    'EVI2': ('evi2', ['NIR', 'RED']),
+    'GOSAVI': ('gosavi', ['NIR', 'YELLOW']),
+    'SAVI': ('savi', ['NIR', 'RED'])
+}
+
+# Formula and roles of the bands of each index, for each sensor, as in
+# INDEX_DEFINITIONS of the eeCustomTools package
+_INDEX_DEFINITIONS = {
+    'sentinel2': {
+        'NDVI': ('nd', ['NIR', 'RED']),
+        'NDWI': ('nd', ['NIR', 'GREEN']),
+        'MNDWI': ('nd', ['SWIR1', 'GREEN']),
+        'NDSI': ('nd', ['SWIR2', 'SWIR1']),
+        'NDMI': ('nd', ['SWIR1', 'NIR']),
+        'EVI': ('evi', ['NIR', 'RED', 'BLUE']),
+        'EVI2': ('evi2', ['NIR', 'RED']),
+        'GOSAVI': ('gosavi', ['NIR', 'GREEN']),
+        'SAVI': ('savi', ['NIR', 'RED'])
+    },
+    'landsat57': _LANDSAT_INDICES,
+    'landsat8': _LANDSAT_INDICES
+}
+
+# Band of each role, for each sensor, as in SENSOR_BANDS of the
+# eeCustomTools package
+_SENSOR_BANDS = {
+    'sentinel2': {'BLUE': 'B2', 'GREEN': 'B3', 'RED': 'B4', 'NIR': 'B8',
+                  'SWIR1': 'B11', 'SWIR2': 'B12'},
+    'landsat57': {'BLUE': 'B1', 'YELLOW': 'B2', 'RED': 'B3', 'NIR': 'B4',
+                  'SWIR': 'B5', 'MIR': 'B7'},
+    'landsat8': {'BLUE': 'B2', 'YELLOW': 'B3', 'RED': 'B4', 'NIR': 'B5',
+                 'SWIR': 'B7', 'MIR': 'B8'}
+}
+
+# Formula and bands of each index, for each sensor
+SENSOR_INDICES = {
+    sensor: {name: (formula, [_SENSOR_BANDS[sensor][role]
+                              for role in roles])
+             for name, (formula, roles) in definitions.items()}
+    for sensor, definitions in _INDEX_DEFINITIONS.items()
+}
+
+
+def index_bands(sensor, indices=None):
+    """
+    Function that returns the raw bands needed to compute the indices, so
+    that the export (and the dictionary of features) can include just them.
+
+    Parameters
+    ----------
+    sensor : str
+        'sentinel2', 'landsat57' or 'landsat8'
+    indices : list, optional
+        List of indices to compute (default all the indices)
+
+    Returns
+    -------
+    list
+        The sorted list of the bands needed
+    """
+
+    definitions = _get_definitions(sensor, indices)
+    if definitions is None:
+        return None
+
+    return sorted({b for _, bands in definitions.values() for b in bands})
+
+
+def add_spectral_indices(features, sensor, indices=None):
+    """
+    Function that computes the indices from the raw bands of the parsed
+    records and adds them to the dictionary of the bands. The bands can be
+    the tensors of a single record or of a batch of records, so the
+    function can be used in a tf.data map before or after batching.
+
+    Parameters
+    ----------
+    features : dict
+        Dictionary of the parsed bands (e.g., from tf.io.parse_example)
+    sensor : str
+        'sentinel2', 'landsat57' or 'landsat8'
+    indices : list, optional
+        List of indices to compute (default all the indices)
+
+    Returns
+    -------
+    dict
+        The dictionary of the bands and indices, in alphabetical order
+    """
+
+    definitions = _get_definitions(sensor, indices)
+    if definitions is None:
+        return None
+
+    missing = [b for b in index_bands(sensor, indices) if b not in features]
+    if missing != []:
+        print('ERROR: the bands {} are needed to compute the indices'.format(
+            missing))
+        return None
+
+    features = dict(features)
+    for name, (formula, bands) in definitions.items():
+        features[name] = _FORMULAS[formula](
+            *[tf.cast(features[b], tf.float32) for b in bands])
+
+    return {k: features[k] for k in sorted(features)}
+
+
+def _get_definitions(sensor, indices):
+    "Helper function that checks the inputs and returns the indices"
+
+    if sensor not in SENSOR_INDICES:
+        print('ERROR: the sensor needs to be one of {}'.format(
+            list(SENSOR_INDICES)))
+        return None
+
+    if indices is None:
+        return SENSOR_INDICES[sensor]
+
+    unknown = [i for i in indices if i not in SENSOR_INDICES[sensor]]
+    if unknown != []:
+        print('ERROR: {} are not valid indices'.format(unknown))
+        return None
+
+    return {i: SENSOR_INDICES[sensor][i] for i in indices}
+
+
+def _nd(first, second):
+    "Normalised difference, as computed by ee.Image.normalizedDifference"
+
+    nd = tf.math.divide_no_nan(first - second, first + second)
+    return tf.where((first < 0) | (second < 0), tf.zeros_like(nd), nd)
+
+
+def _evi(nir, red, blue):
+    "Enhanced Vegetation Index"
+    return 2.5 * tf.math.divide_no_nan(nir - red,
+                                       nir + 6 * red - 7.5 * blue + 1)
+
+
+def _evi2(nir, red):
+    "Enhanced Vegetation Index 2"
+    return 2.4 * tf.math.divide_no_nan(nir - red, nir + red + 1)
+
+
+def _gosavi(nir, green):
+    "Green Optimized Soil Adjusted Vegetation Index"
+    return tf.math.divide_no_nan(nir - green, nir + green + 0.16)
+
+
+def _savi(nir, red):
+    "Soil Adjusted Vegetation Index"
+    return tf.math.divide_no_nan(1.5 * (nir - red), nir + red + 0.5)
+
+
+_FORMULAS = {'nd': _nd, 'evi': _evi, 'evi2': _evi2, 'gosavi': _gosavi,
+             'savi': _savi}
@@ -0,0 +1,372 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script contains the storage backends used by the GetFilesInfo and
+# ShardCache classes to list, check and read the files exported from Earth
+# Engine, without starting a gsutil subprocess for each file. All the
+# backends offer the same functions, so any of them (or a custom one) can
+# be passed to GetFilesInfo:
+# - LocalStorage: local or mounted folders (e.g., Google Drive) and any
+#   other path readable by tf.io.gfile
+# - CloudStorage: Google Cloud Storage buckets, through a single client of
+#   the google-cloud-storage library whose pool of connections is reused by
+#   all the requests. The metadata of the files (size, update time and md5
+#   checksum) comes with the listing of a folder, so the files listed need
+#   no further request to be checked. The metadata is replaced at every
+#   listing of the folder and requested again once older than stats_ttl
+#   seconds. If the library is not installed, the buckets are read through
+#   tf.io.gfile as in LocalStorage.
+#
+# The files are downloaded in chunks, computing their md5 checksum while
+# they are written, so the copies can be verified without reading them
+# again.
+#
+# The functions ending with _many run the requests of several files (or
+# folders) concurrently on a pool of threads.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import time
+import base64
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import tensorflow as tf
+
+try:
+    from google.cloud import storage
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    storage = None
+
+__all__ = ['LocalStorage', 'CloudStorage']
+
+# Size of the chunks of data copied at a time
+CHUNK_SIZE = 1 << 22
+
+
+class LocalStorage:
+    """
+    Class that lists, checks and reads files through tf.io.gfile.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of files (or folders) handled concurrently (default 8)
+
+    Functions
+    ---------
+    list_files(folder, prefix)
+        Return the paths of the files in the folder starting with prefix
+    exists(path)
+        Return True if the file exists
+    stat(path)
+        Return the size, update time and md5 checksum of the file
+    read(path)
+        Return the content of the file
+    download(path, local_path)
+        Copy the file into a local file and return its md5 checksum
+    list_many(folders, prefix)
+        Return the files of several folders in a single list
+    stat_many(paths)
+        Return the stat of several files
+    read_many(paths)
+        Return the content of several files
+    """
+
+    def __init__(self, workers=8):
+        "Class constructor"
+
+        super().__init__()
+        self.workers = workers
+
+    def list_files(self, folder, prefix=''):
+        """
+        Function that returns the sorted paths of the files in the folder
+        (not in its sub-folders) whose name starts with prefix.
+
+        Parameters
+        ----------
+        folder : str
+            Path to the folder
+        prefix : str, optional
+            Prefix of the files (default is all the files)
+
+        Returns
+        -------
+        list
+            A list of the paths of the files
+        """
+
+        return ['{}/{}'.format(folder.rstrip('/'), f)
+                for f in sorted(tf.io.gfile.listdir(folder))
+                if f.startswith(prefix) & (not f.endswith('/'))]
+
+    def exists(self, path):
+        "Function that returns True if the file exists"
+        return tf.io.gfile.exists(path)
+
+    def stat(self, path):
+        """
+        Function that returns the size (in bytes), the update time (in
+        nanoseconds) and the md5 checksum (in hexadecimal format, or None
+        if not available) of the file.
+
+        Parameters
+        ----------
+        path : str
+            Path to the file
+
+        Returns
+        -------
+        dictionary
+            A dictionary with the keys 'size', 'mtime' and 'md5'
+        """
+
+        stat = tf.io.gfile.stat(path)
+        return {'size': stat.length, 'mtime': stat.mtime_nsec, 'md5': None}
+
+    def read(self, path):
+        "Function that returns the content of the file in bytes"
+
+        with tf.io.gfile.GFile(path, 'rb') as f:
+            return f.read()
+
+    def download(self, path, local_path):
+        """
+        Function that copies the file into local_path and returns the md5
+        checksum (in hexadecimal format) of the data copied.
+
+        Parameters
+        ----------
+        path : str
+            Path to the file
+        local_path : str
+            Path to the local copy
+
+        Returns
+        -------
+        str
+            The md5 checksum of the copy
+        """
+
+        with tf.io.gfile.GFile(path, 'rb') as f:
+            return _copy_stream(f, local_path)
+
+    def list_many(self, folders, prefix=''):
+        "Function that lists several folders concurrently"
+
+        lists = self._map(lambda folder: self.list_files(folder, prefix),
+                          folders)
+        return [f for files in lists for f in files]
+
+    def stat_many(self, paths):
+        "Function that returns the stat of several files concurrently"
+        return self._map(self.stat, paths)
+
+    def read_many(self, paths):
+        "Function that reads several files concurrently"
+        return self._map(self.read, paths)
+
+    def _map(self, function, items):
+        "Function that applies function to the items on a pool of threads"
+
+        items = list(items)
+        if len(items) <= 1:
+            return [function(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(function, items))
+
+
+class CloudStorage(LocalStorage):
+    """
+    Class that lists, checks and reads files stored in Google Cloud Storage
+    buckets (gs:// paths) through a single pooled client. The paths that
+    are not in a bucket are handled as in LocalStorage.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of files (or folders) handled concurrently, which is also
+        the size of the pool of connections (default 16)
+    client : google.cloud.storage.Client, optional
+        Client used for the requests (default is a new client created at
+        the first request with the default credentials)
+    stats_ttl : float, optional
+        Seconds after which the metadata of a file is requested again
+        (default 300)
+
+    Functions
+    ---------
+    The same functions of the LocalStorage class, and
+    refresh()
+        Forget the metadata of the files
+    """
+
+    def __init__(self, workers=16, client=None, stats_ttl=300):
+        "Class constructor"
+
+        super().__init__(workers)
+        self.__client = client
+        self.stats_ttl = stats_ttl
+
+        # Time of the request and metadata of the files seen, by path. The
+        # folders and files are handled by several threads at once
+        self.__stats = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def client(self):
+        "Client of the bucket, or None if google-cloud-storage is missing"
+
+        with self.__lock:
+            if (self.__client is None) & (storage is not None):
+                self.__client = storage.Client()
+
+                # Allowing a connection for each thread instead of the
+                # default 10, so the concurrent requests do not wait for a
+                # connection
+                adapter = HTTPAdapter(pool_connections=self.workers,
+                                      pool_maxsize=self.workers)
+                self.__client._http.mount('https://', adapter)
+
+        return self.__client
+
+    def list_files(self, folder, prefix=''):
+        "Function that returns the files of a folder and keeps their stat"
+
+        if (self.client is None) | (not folder.startswith('gs://')):
+            return super().list_files(folder, prefix)
+
+        bucket, name = _split_path(folder.rstrip('/') + '/' + prefix)
+        blobs = self.client.list_blobs(bucket, prefix=name, delimiter='/')
+
+        stats = {}
+        for blob in blobs:
+            path = 'gs://{}/{}'.format(bucket, blob.name)
+            stats[path] = (time.monotonic(), _blob_stat(blob))
+
+        # Replacing the metadata of the folder, so deleted files are dropped
+        listed = 'gs://{}/{}'.format(bucket, name)
+        with self.__lock:
+            for path in [p for p in self.__stats if p.startswith(listed)]:
+                self.__stats.pop(path, None)
+            self.__stats.update(stats)
+
+        return sorted(stats)
+
+    def refresh(self):
+        "Function that forgets the metadata of the files seen so far"
+
+        with self.__lock:
+            self.__stats = {}
+
+    def exists(self, path):
+        "Function that returns True if the file exists"
+
+        if (self.client is None) | (not path.startswith('gs://')):
+            return super().exists(path)
+
+        return (self.__cached_stat(path) is not None) or \
+            self.__blob(path).exists()
+
+    def stat(self, path):
+        "Function that returns the stat of the file from the bucket"
+
+        if (self.client is None) | (not path.startswith('gs://')):
+            return super().stat(path)
+
+        stat = self.__cached_stat(path)
+        if stat is None:
+            bucket, name = _split_path(path)
+            blob = self.client.bucket(bucket).get_blob(name)
+            if blob is None:
+                raise FileNotFoundError(path)
+            stat = _blob_stat(blob)
+            with self.__lock:
+                self.__stats[path] = (time.monotonic(), stat)
+
+        return stat
+
+    def read(self, path):
+        "Function that returns the content of the file in bytes"
+
+        if (self.client is None) | (not path.startswith('gs://')):
+            return super().read(path)
+
+        return self.__blob(path).download_as_bytes()
+
+    def download(self, path, local_path):
+        """
+        Function that copies the file into local_path and returns the md5
+        checksum of the data copied
+        """
+
+        if (self.client is None) | (not path.startswith('gs://')):
+            return super().download(path, local_path)
+
+        with self.__blob(path).open('rb') as f:
+            return _copy_stream(f, local_path)
+
+    def __cached_stat(self, path):
+        "Function that returns the stat of a file if seen recently, or None"
+
+        with self.__lock:
+            seen, stat = self.__stats.get(path, (None, None))
+
+        if (seen is None) or (time.monotonic() - seen > self.stats_ttl):
+            return None
+
+        return stat
+
+    def __blob(self, path):
+        "Function that returns the blob of the bucket of the input path"
+
+        bucket, name = _split_path(path)
+        return self.client.bucket(bucket).blob(name)
+
+
+def _split_path(path):
+    "Helper function that splits a gs:// path into bucket and object name"
+
+    bucket, _, name = path[len('gs://'):].partition('/')
+    return bucket, name
+
+
+def _copy_stream(source, local_path):
+    """
+    Helper function that copies an open file into local_path in chunks and
+    returns the md5 checksum of the data copied
+    """
+
+    md5 = hashlib.md5()
+    with open(local_path, 'wb') as f:
+        chunk = source.read(CHUNK_SIZE)
+        while chunk:
+            md5.update(chunk)
+            f.write(chunk)
+            chunk = source.read(CHUNK_SIZE)
+
+    return md5.hexdigest()
+
+
+def _blob_stat(blob):
+    "Helper function that converts the metadata of a blob into a stat"
+
+    # The bucket stores the md5 checksum in base64 format. Composite
+    # objects have no md5 checksum
+    md5 = None
+    if blob.md5_hash is not None:
+        md5 = base64.b64decode(blob.md5_hash).hex()
+
+    mtime = 0
+    if blob.updated is not None:
+        mtime = int(blob.updated.timestamp() * 1e9)
+
+    return {'size': blob.size, 'mtime': mtime, 'md5': md5}
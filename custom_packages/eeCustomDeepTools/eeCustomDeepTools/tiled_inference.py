@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script implements a sliding-window (tiled) inference engine that
+# classifies scenes of any size with a Keras model trained on fixed-size
+# patches. The scene is covered by overlapping tiles, which are predicted
+# in batches, and the overlapping probabilities are blended with a weight
+# window that decreases towards the borders of the tiles, so that the seams
+# between patches do not show as hard edges in the output.
+#
+# The tiles are processed one row at a time. Once a row of tiles has been
+# predicted, the rows of the output that no other tile can cover are
+# finished and are written to disk, in a memory-mapped .npy file. The memory
+# used therefore depends on the width of the rows of tiles, not on the size
+# of the scene.
+#
+# The engine can also stitch the patches exported by Earth Engine with a
+# kernelSize buffer (patches overlapping by the kernel size), reading them
+# in the export order described by the mixer file.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import math
+
+import numpy as np
+
+__all__ = ['TiledPredictor']
+
+
+class TiledPredictor:
+    """
+    Class that runs a trained Keras model on overlapping tiles of a scene,
+    blending the overlaps and streaming the finished rows of the classified
+    scene to disk.
+
+    Parameters
+    ----------
+    model : keras.model
+        Trained model taking (tile_size, tile_size, bands) patches
+    tile_size : int
+        Size of the tiles (height and width) fed to the model
+    overlap : int, optional
+        Number of pixels shared by neighbouring tiles (default 0)
+    batch_size : int, optional
+        Number of tiles predicted with each forward pass (default 8)
+    transpose : bool, optional
+        flag to feed the model (width, height, bands) tiles (default True).
+        The models trained on the datasets prepared with this package
+        expect the patches in this layout
+
+    Functions
+    ---------
+    predict_scene(scene, output_path)
+        classify a (height, width, bands) scene using overlapping tiles
+    predict_patches(dataset, mixer, kernel_size, output_path)
+        classify and stitch the patches exported by Earth Engine
+    """
+
+    def __init__(self, model, tile_size, overlap=0, batch_size=8,
+                 transpose=True):
+        "Class constructor"
+
+        super().__init__()
+        self.model = model
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.batch_size = batch_size
+        self.transpose = transpose
+
+    def predict_scene(self, scene, output_path):
+        """
+        Function that classifies the input scene tile by tile. The tiles
+        are placed every (tile_size - overlap) pixels, and the tiles that
+        exceed the borders of the scene are padded with zeros. Only one row
+        of tiles is read from the scene at a time, so the scene can be a
+        memory-mapped array (e.g., np.load(path, mmap_mode='r')).
+
+        Parameters
+        ----------
+        scene : array
+            Scene of shape (height, width, bands)
+        output_path : str
+            Path to the .npy file of the classified scene
+
+        Returns
+        -------
+        numpy memmap
+            The classified scene of shape (height, width)
+        """
+
+        if len(scene.shape) != 3:
+            print('ERROR: the scene needs to have (height, width, bands) shape')
+            return None
+        elif (self.overlap < 0) | (self.overlap >= self.tile_size):
+            print('ERROR: the overlap needs to be smaller than the tile size')
+            return None
+
+        height, width, bands = scene.shape
+        stride = self.tile_size - self.overlap
+        n_rows = _count_tiles(height, self.tile_size, stride)
+        n_cols = _count_tiles(width, self.tile_size, stride)
+
+        blender = _RowBlender(self, output_path, height, width, stride,
+                              n_cols, offset=0, blend=self.overlap > 0)
+
+        for r in range(n_rows):
+            y0 = r * stride
+
+            # Reading the row of the scene and padding it with zeros
+            row = np.zeros(
+                (self.tile_size, (n_cols - 1) * stride + self.tile_size,
+                 bands), np.float32)
+            band = np.asarray(scene[y0:y0 + self.tile_size])
+            row[:band.shape[0], :width] = band
+
+            tiles = np.stack([row[:, c * stride:c * stride + self.tile_size]
+                              for c in range(n_cols)])
+            if self.transpose:
+                tiles = np.transpose(tiles, (0, 2, 1, 3))
+
+            blender.add_row(self.__predict(tiles), last=(r == n_rows - 1))
+
+        return blender.close()
+
+    def predict_patches(self, dataset, mixer, kernel_size, output_path):
+        """
+        Function that classifies the patches exported by Earth Engine with
+        a kernelSize buffer and stitches them into a single classified image.
+        The patches need to be in the export order and in the layout fed to
+        the model, e.g. as prepared by prepare_prediction_dataset(). The
+        overlap between neighbouring patches is the kernel size.
+
+        Parameters
+        ----------
+        dataset : tf.data.Dataset
+            Patches of shape (height + kernel, width + kernel, bands),
+            batched or not
+        mixer : dict
+            Mixer of the TFRecords (e.g., from GetFilesInfo.get_mixer)
+        kernel_size : list
+            The kernelSize used in the export options. E.g. [32, 32]
+        output_path : str
+            Path to the .npy file of the classified image
+
+        Returns
+        -------
+        numpy memmap
+            The classified image of shape (rows * height, columns * width)
+        """
+
+        patch_size = mixer['patchDimensions'][0]
+        n_cols = mixer['patchesPerRow']
+        n_rows = math.ceil(mixer['totalPatches'] / n_cols)
+
+        if self.tile_size != patch_size + kernel_size[0]:
+            print('ERROR: the tile size needs to be the patch size plus the '
+                  'kernel size ({})'.format(patch_size + kernel_size[0]))
+            return None
+
+        # The first patch starts half a kernel before the image
+        blender = _RowBlender(self, output_path, n_rows * patch_size,
+                              n_cols * patch_size, patch_size, n_cols,
+                              offset=kernel_size[0] // 2,
+                              blend=kernel_size[0] > 0)
+
+        if len(dataset.element_spec.shape) == 4:
+            dataset = dataset.unbatch()
+
+        r = 0
+        for tiles in dataset.batch(n_cols):
+            blender.add_row(self.__predict(tiles.numpy()),
+                            last=(r == n_rows - 1))
+            r += 1
+
+        return blender.close()
+
+    def __predict(self, tiles):
+        """
+        Function that runs the model on the input tiles in batches and
+        returns the probabilities in (height, width, classes) layout.
+        """
+
+        probabilities = np.concatenate([
+            self.model.predict_on_batch(tiles[i:i + self.batch_size])
+            for i in range(0, len(tiles), self.batch_size)])
+
+        if self.transpose:
+            probabilities = np.transpose(probabilities, (0, 2, 1, 3))
+
+        return probabilities
+
+
+class _RowBlender:
+    """
+    Helper class that accumulates the weighted probabilities of the rows of
+    tiles into a buffer as tall as a tile, and writes the rows of the output
+    that are finished after each row of tiles. The output coordinates are
+    shifted by offset with respect to the tiles (i.e., the first tile starts
+    offset pixels before the output).
+    """
+
+    def __init__(self, predictor, output_path, height, width, stride,
+                 n_cols, offset, blend):
+
+        self.tile_size = predictor.tile_size
+        self.height = height
+        self.width = width
+        self.stride = stride
+        self.n_cols = n_cols
+        self.offset = offset
+        self.weights = _weight_window(self.tile_size, blend)
+
+        self.output = np.lib.format.open_memmap(
+            output_path, mode='w+', dtype=np.uint8, shape=(height, width))
+
+        self.buffer = None
+        self.weights_sum = None
+        self.row = 0
+
+    def add_row(self, probabilities, last):
+        "Function that adds a row of tiles and writes the finished rows"
+
+        tile = self.tile_size
+        row_width = (self.n_cols - 1) * self.stride + tile
+        if self.buffer is None:
+            n_classes = probabilities.shape[-1]
+            self.buffer = np.zeros((tile, row_width, n_classes), np.float32)
+            self.weights_sum = np.zeros((tile, row_width), np.float32)
+
+        for c in range(len(probabilities)):
+            x0 = c * self.stride
+            self.buffer[:, x0:x0 + tile] += \
+                probabilities[c] * self.weights[:, :, None]
+            self.weights_sum[:, x0:x0 + tile] += self.weights
+
+        # Rows not reached by the next row of tiles are finished
+        finished = tile if last else self.stride
+        y0 = self.row * self.stride
+        classes = np.argmax(self.buffer[:finished] /
+                            self.weights_sum[:finished, :, None], axis=-1)
+
+        # Cropping the finished rows to the output image
+        top = max(self.offset - y0, 0)
+        start = y0 + top - self.offset
+        end = min(y0 + finished - self.offset, self.height)
+        if end > start:
+            self.output[start:end] = classes[
+                top:top + end - start,
+                self.offset:self.offset + self.width]
+
+        # Shifting the buffer by one stride
+        self.buffer[:tile - self.stride] = self.buffer[self.stride:]
+        self.buffer[tile - self.stride:] = 0
+        self.weights_sum[:tile - self.stride] = self.weights_sum[self.stride:]
+        self.weights_sum[tile - self.stride:] = 0
+        self.row += 1
+
+    def close(self):
+        "Function that flushes the output to disk and returns it"
+
+        self.output.flush()
+        return self.output
+
+
+def _count_tiles(size, tile_size, stride):
+    "Helper function that returns the number of tiles covering the size"
+
+    return max(math.ceil((size - tile_size) / stride), 0) + 1
+
+
+def _weight_window(tile_size, blend):
+    """
+    Helper function that returns the weights of the pixels of a tile: a
+    squared sine window that decreases towards the borders if the tiles
+    overlap (never reaching 0, so that the borders of the scene are still
+    weighted), or uniform weights otherwise.
+    """
+
+    if not blend:
+        return np.ones((tile_size, tile_size), np.float32)
+
+    window = np.sin(np.pi * (np.arange(tile_size) + 0.5) / tile_size) ** 2
+    window = np.maximum(window, 1e-3).astype(np.float32)
+
+    return np.outer(window, window)
@@ -11,7 +11,7 @@ setup(
     author_email='davide.lomeo20@imperial.ac.uk',
     url='https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3/tree/main/custom_packages/eeCustomDeepTools',
     license='MIT',
-    install_requires=['tensorflow'],
+    install_requires=['tensorflow', 'numpy'],
     setup_requires=['pytest-runner'],
     tests_require=['pytest==4.4.1'],
     test_suite='test_eeCustomDeepTools',
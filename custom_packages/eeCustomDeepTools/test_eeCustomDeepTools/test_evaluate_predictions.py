@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the class and functions that evaluate the predictions
+# against the classification of the traditional classifier.
+#
+# The tests generate random predictions and classes and check that the
+# confusion matrices computed batch by batch match those computed patch
+# by patch with tf.math.confusion_matrix, and that the metrics match the
+# values computed by hand from the global confusion matrix.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import numpy as np
+import tensorflow as tf
+from eeCustomDeepTools import StreamingEvaluator, evaluate_predictions
+
+
+def test_streaming_evaluator():
+    "Testing the StreamingEvaluator class and evaluate_predictions()"
+
+    rng = np.random.default_rng(0)
+    n_classes = 4
+    probabilities = rng.random((10, 8, 8, n_classes)).astype(np.float32)
+    classes = rng.integers(0, n_classes, (10, 8, 8))
+
+    # Streams of batches of 3 predictions and of single classes patches
+    predictions = [probabilities[i:i + 3] for i in range(0, 10, 3)]
+    classes_dataset = tf.data.Dataset.from_tensor_slices(classes)
+
+    function_output_1 = evaluate_predictions(
+        predictions, classes_dataset, n_classes, per_patch=True)
+    function_output_2 = evaluate_predictions(
+        predictions, classes_dataset, -1)
+    function_output_3 = evaluate_predictions(
+        predictions, classes_dataset.take(8), n_classes)
+
+    # Reference confusion matrices computed patch by patch
+    predicted = np.transpose(np.argmax(probabilities, axis=-1), (0, 2, 1))
+    matrices = [tf.math.confusion_matrix(
+        classes[i].flatten(), predicted[i].flatten(), n_classes).numpy()
+        for i in range(10)]
+    matrix = np.sum(matrices, axis=0)
+
+    assert function_output_1['confusion_matrix'] == matrix.tolist()
+    assert function_output_2 is None
+    assert function_output_3 is None
+    assert len(function_output_1['patches']) == 10
+
+    overall = np.trace(matrix) / matrix.sum()
+    expected = np.sum(matrix.sum(0) * matrix.sum(1)) / matrix.sum() ** 2
+    assert function_output_1['overall_accuracy'] == round(overall, 4)
+    assert function_output_1['kappa_coefficient'] == round(
+        (overall - expected) / (1 - expected), 4)
+    assert function_output_1['producers_accuracy'] == np.round(
+        np.diag(matrix) / matrix.sum(1), 4).tolist()
+    assert function_output_1['users_accuracy'] == np.round(
+        np.diag(matrix) / matrix.sum(0), 4).tolist()
+    assert function_output_1['patches'][3]['overall_accuracy'] == round(
+        np.trace(matrices[3]) / matrices[3].sum(), 4)
+
+    # Reference classes outside the classes range are ignored
+    evaluator = StreamingEvaluator(n_classes, transpose=False)
+    evaluator.update(np.zeros((1, 2, 2), np.int64), [[[0, 1], [9, -1]]])
+    assert evaluator.confusion_matrix.sum() == 2
+
+    return
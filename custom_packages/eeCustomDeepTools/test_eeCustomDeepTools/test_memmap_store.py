@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the function that converts the TFRecords into a store
+# of memory-mapped arrays and the class that reads the store.
+#
+# The tests write a few synthetic TFRecords in a temporary folder, convert
+# them into a store and check that the batches read from the store are
+# views of the memory-mapped arrays and contain the same values of the
+# batches prepared by the PrepareBatches class.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import json
+import numpy as np
+import tensorflow as tf
+from eeCustomDeepTools import records_to_memmap, MemmapPatches, \
+                              PrepareBatches, get_features_dict
+from benchmarks.synthetic_records import write_synthetic_records
+
+
+def test_records_to_memmap(tmp_path):
+    "Testing the records_to_memmap() function and the MemmapPatches class"
+
+    bands = ['B2', 'B11', 'B3']
+    dims = [8, 8]
+    file_list, json_file = write_synthetic_records(
+        str(tmp_path), 'record-', bands, dims, 10, n_files=2)
+    with open(json_file) as js:
+        mixer = json.load(js)
+    features_dict = get_features_dict(
+        list(bands), 'classes', list(bands), dims)
+    store_path = str(tmp_path / 'store')
+
+    function_output_1 = records_to_memmap(
+        file_list, features_dict, store_path, 'classes', mixer, batch_size=4)
+    function_output_2 = MemmapPatches(store_path)
+    function_output_3 = records_to_memmap(
+        file_list[0], features_dict, store_path, 'classes')
+    function_output_4 = records_to_memmap(
+        file_list, features_dict, store_path, 'labels')
+
+    assert len(function_output_1) == len(function_output_2) == 10
+    assert function_output_2.header['mixer'] == mixer
+    assert function_output_2.labels.dtype == np.uint8
+    assert function_output_3 is None
+    assert function_output_4 is None
+
+    # The batches need to be views of the memory-mapped arrays
+    features, labels = function_output_2.get_batch(0, 4)
+    assert isinstance(features, np.memmap)
+    assert isinstance(labels, np.memmap)
+    assert sum(len(f) for f, _ in function_output_2.batches(3, True)) == 10
+
+    # The store needs to contain the same data of PrepareBatches' batches
+    prepare = PrepareBatches(features_dict, 7, 'classes')
+    dataset = tf.data.TFRecordDataset(file_list, compression_type='GZIP')
+    train, _ = prepare.prepare_batches(10, 10, dataset, dataset)
+    batches = [next(iter(train)),
+               next(iter(function_output_2.as_dataset(10, n_classes=7)))]
+
+    sorted_batches = []
+    for batch_features, batch_labels in batches:
+        order = np.argsort(np.sum(batch_features.numpy(), axis=(1, 2, 3)))
+        sorted_batches.append((batch_features.numpy()[order],
+                               batch_labels.numpy()[order]))
+    np.testing.assert_array_equal(sorted_batches[0][0], sorted_batches[1][0])
+    np.testing.assert_array_equal(sorted_batches[0][1], sorted_batches[1][1])
+
+    return
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the rejection of the patches mostly masked or without
+# data, in the training and in the prediction pipelines.
+#
+# The tests write synthetic TFRecords in which some patches are entirely
+# masked (all the bands are 0, as exported by Earth Engine), check that
+# PrepareBatches drops them and that the model does not run on them when
+# predicting, whilst the predictions written for the upload keep all the
+# patches in their order, with a fill value in the rejected patches.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import json
+import numpy as np
+import tensorflow as tf
+from eeCustomDeepTools import valid_fraction, PrepareBatches, \
+                              get_features_dict, prepare_prediction_dataset, \
+                              stream_predictions, write_predictions, \
+                              StreamingEvaluator
+from benchmarks.synthetic_records import write_synthetic_records
+
+
+class CountingModel:
+    "Model predicting class 2 everywhere, counting the patches predicted"
+
+    def __init__(self):
+        self.n_predicted = 0
+
+    def predict_on_batch(self, batch):
+        self.n_predicted += len(batch)
+        probabilities = np.zeros(tuple(batch.shape[:3]) + (3,), np.float32)
+        probabilities[..., 2] = 1
+        return probabilities
+
+
+def test_valid_fraction():
+    "Testing the valid_fraction() function"
+
+    patch = np.ones((4, 4, 2), np.float32)
+    patch[:2] = 0
+    patch[3, 3, 0] = np.nan
+    batch = np.stack([patch, np.zeros_like(patch)])
+
+    function_output_1 = valid_fraction(patch)
+    function_output_2 = valid_fraction(batch)
+    function_output_3 = valid_fraction(batch, fill_value=1)
+
+    np.testing.assert_allclose(function_output_1, 7 / 16)
+    np.testing.assert_allclose(function_output_2, [7 / 16, 0])
+    np.testing.assert_allclose(function_output_3, [8 / 16, 1])
+
+    return
+
+
+def test_patch_filter(tmp_path):
+    "Testing the rejection of the masked patches"
+
+    bands = ['B2', 'B3']
+    dims = [8, 8]
+    masked = [1, 3, 4, 5, 8]
+
+    # Order of the patches in the TFRecords (the second batch of 4 patches
+    # of the prediction dataset is entirely masked)
+    order = list(range(0, 10, 2)) + list(range(1, 10, 2))
+    file_list, json_file = write_synthetic_records(
+        str(tmp_path), 'record-', bands, dims, 10, n_files=2,
+        masked_patches=masked)
+    features_dict = get_features_dict(list(bands), 'classes', list(bands),
+                                      dims)
+
+    # Training: the masked patches are dropped
+    prepare = PrepareBatches(features_dict, 7, 'classes')
+    for batch_parse in [False, True]:
+        dataset = prepare.load_records(file_list)
+        train, _ = prepare.prepare_batches(
+            3, 3, dataset, dataset, batch_parse=batch_parse,
+            min_valid_fraction=0.5)
+        features = np.concatenate([f for f, _ in train])
+
+        assert features.shape[0] == 5
+        assert (valid_fraction(features).numpy() == 1).all()
+
+    # Predictions: the masked patches are flagged and not predicted
+    dataset = prepare_prediction_dataset(
+        file_list, dims, bands, False, 4, min_valid_fraction=0.5)
+    flags = np.concatenate([v for _, v in dataset])
+
+    model = CountingModel()
+    predictions = np.concatenate(list(stream_predictions(model, dataset)))
+    rejected = np.isnan(predictions).all(axis=(1, 2, 3))
+
+    assert flags.tolist() == [p not in masked for p in order]
+    assert rejected.tolist() == [p in masked for p in order]
+    assert model.n_predicted == 5
+
+    # The rejected patches are written with the fill value, in order
+    with open(json_file) as js:
+        mixer = json.load(js)
+    output_files = write_predictions(
+        CountingModel(), dataset, mixer, str(tmp_path / 'prediction'))
+    features = {'prediction': tf.io.FixedLenFeature(dims, tf.float32)}
+    written = [tf.io.parse_single_example(r, features)['prediction']
+               for r in tf.data.TFRecordDataset(output_files)]
+
+    assert [float(w[0, 0]) for w in written] == [
+        -1 if p in masked else 2 for p in order]
+
+    # The rejected patches are not evaluated
+    evaluator = StreamingEvaluator(3)
+    evaluator.update(predictions, np.full((10, 8, 8), 2))
+
+    assert evaluator.confusion_matrix[2, 2] == 5 * 64
+
+    return
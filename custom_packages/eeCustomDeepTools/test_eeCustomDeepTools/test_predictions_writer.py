@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the class and function that write the predictions into
+# TFRecords ready to be uploaded to Earth Engine.
+#
+# The tests write random predictions into several shards and read them back,
+# checking that the patches are in the export order, transposed back to
+# (height, width) and cropped of the kernel buffer, as in Notebook 3.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers
+from tensorflow.keras.models import Model
+from eeCustomDeepTools import PredictionsWriter, write_predictions
+
+
+def read_predictions(file_list, patch_size):
+    "Function that reads back the predicted patches of the TFRecords"
+
+    features = {'prediction': tf.io.FixedLenFeature(
+        [patch_size, patch_size], tf.float32)}
+
+    return np.stack([
+        tf.io.parse_single_example(x, features)['prediction'].numpy()
+        for x in tf.data.TFRecordDataset(file_list)])
+
+
+def test_predictions_writer(tmp_path):
+    "Testing the PredictionsWriter class and write_predictions()"
+
+    rng = np.random.default_rng(0)
+    probabilities = rng.random((10, 8, 8, 4)).astype(np.float32)
+    mixer = {'patchDimensions': [8, 8], 'patchesPerRow': 5,
+             'totalPatches': 10}
+
+    # Same conversion as the loop in Notebook 3
+    expected = np.stack([p.T.argmax(0) for p in probabilities])
+
+    writer = PredictionsWriter(mixer, str(tmp_path / 'image'), num_shards=3,
+                               workers=2, max_pending=2)
+    for i in range(0, 10, 3):
+        writer.write(probabilities[i:i + 3])
+    function_output_1 = writer.close()
+
+    assert function_output_1 == [
+        str(tmp_path / 'image-{:05d}.tfrecord'.format(s)) for s in range(3)]
+    assert [len(read_predictions([f], 8)) for f in function_output_1] == \
+        [3, 3, 4]
+    np.testing.assert_array_equal(read_predictions(function_output_1, 8),
+                                  expected)
+
+    # Predictions of patches exported with a kernel buffer of 4 pixels
+    input_img = layers.Input((12, 12, 3))
+    output_img = layers.Conv2D(4, (1, 1), activation=tf.nn.softmax)(input_img)
+    model = Model(input_img, output_img)
+    patches = rng.normal(size=(10, 12, 12, 3)).astype(np.float32)
+    dataset = tf.data.Dataset.from_tensor_slices(patches).batch(4)
+
+    function_output_2 = write_predictions(
+        model, dataset, mixer, str(tmp_path / 'kernel'), num_shards=2,
+        kernel_size=[4, 4])
+    function_output_3 = write_predictions(
+        model, dataset, mixer, str(tmp_path / 'wrong'), num_shards=0)
+    function_output_4 = write_predictions(
+        model, dataset, mixer, str(tmp_path / 'wrong'), num_shards=11)
+
+    expected = np.stack([p.T.argmax(0)[2:-2, 2:-2]
+                         for p in model.predict_on_batch(patches)])
+
+    assert len(function_output_2) == 2
+    np.testing.assert_array_equal(read_predictions(function_output_2, 8),
+                                  expected)
+    assert function_output_3 is None
+    assert function_output_4 is None
+
+    # The error of the model is raised, not the error of the writer (the
+    # output folder does not exist)
+    predict_on_batch = model.predict_on_batch
+    batches = []
+
+    def failing_model(batch):
+        batches.append(batch)
+        if len(batches) > 1:
+            raise ValueError('model failure')
+        return predict_on_batch(batch)
+
+    model.predict_on_batch = failing_model
+    try:
+        write_predictions(model, dataset, mixer,
+                          str(tmp_path / 'missing' / 'failed'))
+        raised = None
+    except ValueError as e:
+        raised = str(e)
+
+    assert raised == 'model failure'
+
+    return
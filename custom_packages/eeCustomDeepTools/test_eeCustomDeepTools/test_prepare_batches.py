@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the class that prepares the batches for training.
+#
+# The tests write a few synthetic TFRecords in a temporary folder and
+# check that the batches obtained by parsing the records one at a time
+# and by parsing whole batches at once have the same shapes and contain
+# exactly the same values, in the same channel order and layout.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import numpy as np
+import tensorflow as tf
+from eeCustomDeepTools import PrepareBatches, get_features_dict
+from benchmarks.synthetic_records import write_synthetic_records
+
+
+def test_prepare_batches(tmp_path):
+    "Testing the PrepareBatches class with and without batch parsing"
+
+    bands = ['B2', 'B11', 'B3']
+    dims = [16, 16]
+    file_list, _ = write_synthetic_records(
+        str(tmp_path), 'record-', bands, dims, 6, n_classes=4)
+
+    features_dict = get_features_dict(
+        list(bands), 'classes', list(bands), dims)
+    prepare = PrepareBatches(features_dict, 4, 'classes')
+    dataset = tf.data.TFRecordDataset(file_list, compression_type='GZIP')
+
+    train_1, test_1 = prepare.prepare_batches(6, 6, dataset, dataset)
+    train_2, test_2, valid_2 = prepare.prepare_batches(
+        6, 6, dataset, dataset, dataset, batch_parse=True)
+
+    features_1, labels_1 = next(iter(train_1))
+    features_2, labels_2 = next(iter(train_2))
+
+    assert features_1.shape == features_2.shape == (6, 16, 16, 3)
+    assert labels_1.shape == labels_2.shape == (6, 16, 16, 4)
+
+    # The records are shuffled, so they are sorted before comparing them
+    order_1 = np.argsort(np.sum(features_1.numpy(), axis=(1, 2, 3)))
+    order_2 = np.argsort(np.sum(features_2.numpy(), axis=(1, 2, 3)))
+    np.testing.assert_array_equal(features_1.numpy()[order_1],
+                                  features_2.numpy()[order_2])
+    np.testing.assert_array_equal(labels_1.numpy()[order_1],
+                                  labels_2.numpy()[order_2])
+
+    assert test_1.element_spec == test_2.element_spec
+    assert valid_2.element_spec == train_2.element_spec
+
+    return
+
+
+def test_prepare_batches_sparse_labels(tmp_path):
+    "Testing the sparse labels of the PrepareBatches class"
+
+    bands = ['B2', 'B3']
+    dims = [8, 8]
+    file_list, _ = write_synthetic_records(
+        str(tmp_path), 'record-', bands, dims, 4, n_classes=4)
+
+    features_dict = get_features_dict(
+        list(bands), 'classes', list(bands), dims)
+    dataset = tf.data.TFRecordDataset(file_list, compression_type='GZIP')
+
+    one_hot = PrepareBatches(features_dict, 4, 'classes')
+    sparse = PrepareBatches(features_dict, 4, 'classes', sparse_labels=True)
+
+    # Batches of all the records, so that the shuffling does not matter
+    for batch_parse in [False, True]:
+        _, labels_1 = next(iter(one_hot.prepare_batches(
+            4, 4, dataset, dataset, batch_parse=batch_parse)[0]))
+        features_2, labels_2 = next(iter(sparse.prepare_batches(
+            4, 4, dataset, dataset, batch_parse=batch_parse)[0]))
+
+        assert labels_2.dtype == tf.uint8
+        assert labels_2.shape == (4, 8, 8)
+        assert features_2.shape == (4, 8, 8, 2)
+        np.testing.assert_array_equal(
+            np.sort(labels_1.numpy().argmax(-1).reshape(4, -1), axis=0),
+            np.sort(labels_2.numpy().reshape(4, -1), axis=0))
+
+    return
@@ -16,7 +16,10 @@
 # Date: 12 Aug 2021
 # Version: 1.0
 
+import numpy as np
+import tensorflow as tf
 from eeCustomDeepTools import prepare_prediction_classes
+from benchmarks.synthetic_records import write_synthetic_records
 
 
 def test_prepare_prediction_classes():
@@ -38,3 +41,30 @@ def test_prepare_prediction_classes():
     assert function_output_4 is None
 
     return
+
+
+def test_prepare_prediction_classes_sparse(tmp_path):
+    "Testing the sparse labels of prepare_prediction_classes()"
+
+    file_list, _ = write_synthetic_records(
+        str(tmp_path), 'classes_', ['B2'], [8, 8], n_patches=3, n_classes=5)
+
+    function_output_1 = prepare_prediction_classes(
+        file_list, [8, 8], ['classes'], num_classes=5, verbose=False,
+        sparse_labels=True)
+    function_output_2 = prepare_prediction_classes(
+        file_list, [8, 8], ['classes'], verbose=False, sparse_labels=True)
+    function_output_3 = prepare_prediction_classes(
+        file_list, [8, 8], ['classes'], one_hot=True, num_classes=5,
+        verbose=False, sparse_labels=True)
+
+    expected = prepare_prediction_classes(
+        file_list, [8, 8], ['classes'], verbose=False)
+
+    assert function_output_1.element_spec.dtype == tf.uint8
+    for labels, reference in zip(function_output_1, expected):
+        np.testing.assert_array_equal(labels.numpy(), reference.numpy())
+    assert function_output_2 is None
+    assert function_output_3 is None
+
+    return
@@ -15,7 +15,9 @@
 # Date: 24 July 2021
 # Version: 1.0
 
+import numpy as np
 from eeCustomDeepTools import prepare_prediction_dataset
+from benchmarks.synthetic_records import write_synthetic_records
 
 
 def test_prepare_prediction_dataset():
@@ -37,3 +39,31 @@ def test_prepare_prediction_dataset():
     assert function_output_4 is None
 
     return
+
+
+def test_prepare_prediction_dataset_batches(tmp_path):
+    "Testing the batches and parallel reads of prepare_prediction_dataset()"
+
+    bands = ['B2', 'B3', 'B4']
+    file_list, _ = write_synthetic_records(
+        str(tmp_path), 'img_', bands, [8, 8], n_patches=23, n_files=4)
+
+    function_output_1 = prepare_prediction_dataset(
+        file_list, [8, 8], bands, verbose=False)
+    function_output_2 = prepare_prediction_dataset(
+        file_list, [8, 8], bands, verbose=False, batch_size=5,
+        num_parallel_reads=3)
+    function_output_3 = prepare_prediction_dataset(
+        file_list, [8, 8], bands, verbose=False, batch_size=0)
+    function_output_4 = prepare_prediction_dataset(
+        file_list, [8, 8], bands, verbose=False, num_parallel_reads=-1)
+
+    patches_1 = np.concatenate(list(function_output_1.as_numpy_iterator()))
+    batches_2 = list(function_output_2.as_numpy_iterator())
+
+    assert [len(b) for b in batches_2] == [5, 5, 5, 5, 3]
+    np.testing.assert_array_equal(np.concatenate(batches_2), patches_1)
+    assert function_output_3 is None
+    assert function_output_4 is None
+
+    return
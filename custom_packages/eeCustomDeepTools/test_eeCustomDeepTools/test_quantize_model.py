@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the functions and class that quantize a Keras model and
+# run it with TensorFlow Lite. The tests calibrate a small model on
+# synthetic patches prepared with prepare_prediction_dataset() and check
+# that the quantized model mostly agrees with the original.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers
+from tensorflow.keras.models import Model
+from eeCustomDeepTools import prepare_prediction_dataset, quantize_model, \
+    TFLitePredictor, compare_quantized_model
+from benchmarks.synthetic_records import write_synthetic_records
+
+
+def test_quantize_model(tmp_path):
+    "Testing quantize_model(), TFLitePredictor and compare_quantized_model()"
+
+    bands = ['B2', 'B3', 'B4']
+    file_list, _ = write_synthetic_records(
+        str(tmp_path), 'img_', bands, [16, 16], n_patches=8)
+    dataset = prepare_prediction_dataset(file_list, [16, 16], bands,
+                                         verbose=False)
+
+    input_img = layers.Input((16, 16, 3))
+    x = layers.Conv2D(8, (3, 3), padding='same', activation='relu')(input_img)
+    output_img = layers.Conv2D(4, (1, 1), activation=tf.nn.softmax)(x)
+    model = Model(input_img, output_img)
+
+    function_output_1 = quantize_model(
+        model, str(tmp_path / 'int8.tflite'), dataset, n_samples=4)
+    function_output_2 = quantize_model(
+        model, str(tmp_path / 'dynamic.tflite'), mode='dynamic')
+    function_output_3 = quantize_model(
+        model, str(tmp_path / 'wrong.tflite'), dataset, mode='int4')
+    function_output_4 = quantize_model(
+        model, str(tmp_path / 'wrong.tflite'), mode='int8')
+
+    assert function_output_3 is None
+    assert function_output_4 is None
+
+    batch = next(iter(dataset.unbatch().batch(8)))
+    expected = model.predict_on_batch(batch)
+    for model_path in [function_output_1, function_output_2]:
+        probabilities = TFLitePredictor(model_path).predict_on_batch(batch)
+        assert probabilities.shape == expected.shape
+        assert np.mean(probabilities.argmax(-1) == expected.argmax(-1)) > 0.8
+
+    function_output_5 = compare_quantized_model(
+        model, function_output_1, dataset, 4)
+
+    assert function_output_5['original']['overall_accuracy'] == 1
+    assert function_output_5['quantized']['overall_accuracy'] > 0.8
+    assert function_output_5['quantized']['model_size_bytes'] > 0
+    assert function_output_5['original']['model_size_bytes'] > 0
+    assert function_output_5['quantized']['peak_memory_increase_bytes'] >= 0
+    assert len(function_output_5['change']['producers_accuracy']) == 4
+    assert function_output_5['change']['speedup'] > 0
+
+    return
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the functions that transcode the TFRecords into a
+# local cache of parsed records.
+#
+# The tests write a few synthetic TFRecords in a temporary folder, load
+# them through the cache twice (the second time the cache needs to be
+# reused) and check that changing the dictionary of features replaces the
+# cache and that the cached records keep the order of the TFRecords. The
+# cached records are then passed to PrepareBatches, to check that they
+# give the same batches of the TFRecords.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import os
+import numpy as np
+import tensorflow as tf
+from eeCustomDeepTools import get_cache_path, load_cached_records, \
+                              PrepareBatches, get_features_dict
+from benchmarks.synthetic_records import write_synthetic_records
+
+
+def test_load_cached_records(tmp_path):
+    "Testing the load_cached_records() function"
+
+    bands = ['B2', 'B3']
+    dims = [8, 8]
+    records_dir = tmp_path / 'export'
+    cache_dir = str(tmp_path / 'cache')
+    records_dir.mkdir()
+    file_list, _ = write_synthetic_records(
+        str(records_dir), 'record-', bands, dims, 7, n_files=2)
+
+    features_dict_1 = get_features_dict(
+        list(bands), 'classes', list(bands), dims)
+    features_dict_2 = get_features_dict(
+        list(bands), 'classes', ['B2'], dims)
+
+    function_output_1 = load_cached_records(
+        file_list, features_dict_1, cache_dir, num_shards=3)
+    cache_path_1 = get_cache_path(file_list, features_dict_1, cache_dir)
+    mtime_1 = os.path.getmtime(cache_path_1 + '/cache_info.json')
+
+    function_output_2 = load_cached_records(
+        file_list, features_dict_1, cache_dir)
+    mtime_2 = os.path.getmtime(cache_path_1 + '/cache_info.json')
+
+    assert len(list(function_output_1)) == 7
+    assert len(list(function_output_2)) == 7
+    assert mtime_1 == mtime_2
+
+    function_output_3 = load_cached_records(
+        file_list, features_dict_2, cache_dir)
+    cache_path_3 = get_cache_path(file_list, features_dict_2, cache_dir)
+
+    function_output_4 = load_cached_records(
+        file_list[0], features_dict_1, cache_dir)
+
+    assert sorted(next(iter(function_output_3)).keys()) == ['B2', 'classes']
+    assert os.listdir(cache_dir) == [os.path.basename(cache_path_3)]
+    assert function_output_4 is None
+
+    # The cached records keep the order of the TFRecords, also with more
+    # shards than CPUs
+    dataset = tf.data.TFRecordDataset(file_list, compression_type='GZIP') \
+        .map(lambda x: tf.io.parse_single_example(x, features_dict_1))
+    function_output_5 = load_cached_records(
+        file_list, features_dict_1, str(tmp_path / 'shards'),
+        num_shards=(os.cpu_count() or 1) + 2)
+
+    for cached, record in zip(function_output_5, dataset):
+        np.testing.assert_array_equal(cached['B2'], record['B2'])
+    assert len(list(function_output_5)) == 7
+
+    # The cached records need to give the same batches of the TFRecords
+    prepare_1 = PrepareBatches(features_dict_1, 7, 'classes')
+    prepare_2 = PrepareBatches(features_dict_1, 7, 'classes', cache_dir)
+    for batch_parse in [False, True]:
+        batches = []
+        for prepare in [prepare_1, prepare_2]:
+            dataset = prepare.load_records(file_list)
+            train, _ = prepare.prepare_batches(
+                7, 7, dataset, dataset, batch_parse=batch_parse)
+            features, labels = next(iter(train))
+            order = np.argsort(np.sum(features.numpy(), axis=(1, 2, 3)))
+            batches.append((features.numpy()[order], labels.numpy()[order]))
+
+        np.testing.assert_array_equal(batches[0][0], batches[1][0])
+        np.testing.assert_array_equal(batches[0][1], batches[1][1])
+
+    return
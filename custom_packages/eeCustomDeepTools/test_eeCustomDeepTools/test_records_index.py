@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the functions that build and use the index of the
+# TFRecords.
+#
+# The tests write a few synthetic TFRecords in a temporary folder and check
+# that the number of records matches the mixer file, that each record read
+# through the index is identical to the one read by TensorFlow, and that the
+# ranges assigned to the workers cover all the records only once.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import os
+import json
+import tensorflow as tf
+from eeCustomDeepTools import build_records_index, read_records_index, \
+                              read_record, check_patches_count, \
+                              split_record_ranges
+from benchmarks.synthetic_records import write_synthetic_records
+
+
+def test_records_index(tmp_path):
+    "Testing the functions that build and read the index of the TFRecords"
+
+    file_list, json_file = write_synthetic_records(
+        str(tmp_path), 'record-', ['B2', 'B3'], [8, 8], 10, n_files=3)
+    with open(json_file) as js:
+        mixer = json.load(js)
+
+    function_output_1 = build_records_index(file_list, workers=2)
+    function_output_2 = read_records_index(file_list)
+    function_output_3 = build_records_index(file_list[0])
+    function_output_4 = read_records_index([file_list[0] + '.missing'])
+
+    assert function_output_1 == function_output_2
+    assert function_output_3 is None
+    assert function_output_4 is None
+    assert check_patches_count(function_output_1, mixer) is True
+    assert check_patches_count(
+        function_output_1, {'totalPatches': 11}) is False
+
+    # Each record read through the index needs to match TensorFlow's
+    for file_name in file_list:
+        index = function_output_1[file_name]
+        records = list(tf.data.TFRecordDataset(
+            file_name, compression_type='GZIP').as_numpy_iterator())
+        assert index['records'] == len(records)
+        for i, record in enumerate(records):
+            assert read_record(file_name, index, i) == record
+
+    # The index is built again if the file changes with the same size
+    with open(file_list[0] + '.index.json') as js:
+        index = json.load(js)
+    index['records'] = 0
+    with open(file_list[0] + '.index.json', 'w') as js:
+        json.dump(index, js)
+    function_output_5 = build_records_index(file_list)
+    os.utime(file_list[0], ns=(0, index['mtime'] + 10 ** 9))
+    function_output_6 = build_records_index(file_list)
+
+    assert function_output_5[file_list[0]]['records'] == 0
+    assert function_output_6[file_list[0]]['records'] == \
+        function_output_1[file_list[0]]['records']
+    assert function_output_6[file_list[0]]['mtime'] == \
+        index['mtime'] + 10 ** 9
+
+    # The workers need to share all the records exactly once
+    ranges = split_record_ranges(function_output_1, 4)
+    assert sum(end - start for r in ranges for _, start, end in r) == 10
+    assert [sum(end - start for _, start, end in r)
+            for r in ranges] == [2, 3, 2, 3]
+
+    return
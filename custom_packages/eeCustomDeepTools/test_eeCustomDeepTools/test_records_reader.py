@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the function that reads the TFRecords interleaving
+# several files. The tests write synthetic TFRecords to a temporary folder
+# and check that every record is read exactly once, that the workers read
+# disjoint sets of files and that the order is reproducible with a seed.
+# They also check that splitting the files before interleaving them gives
+# training and test records that do not overlap across epochs.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import tensorflow as tf
+from eeCustomDeepTools import interleave_records, index_split
+from benchmarks.synthetic_records import write_synthetic_records
+
+
+def test_interleave_records(tmp_path):
+    "Testing the interleave_records() function"
+
+    file_list, _ = write_synthetic_records(
+        str(tmp_path), 'img_', ['B2'], [4, 4], n_patches=30, n_files=5)
+    all_records = sorted(tf.data.TFRecordDataset(
+        file_list, compression_type='GZIP').as_numpy_iterator())
+
+    function_output_1 = interleave_records(file_list, 3, seed=1)
+    function_output_2 = interleave_records(file_list[::-1], 3, seed=1)
+    function_output_3 = [
+        interleave_records(file_list, 2, worker_index=w, num_workers=2)
+        for w in range(2)]
+    function_output_4 = interleave_records(file_list, 0)
+    function_output_5 = interleave_records(file_list, worker_index=2,
+                                           num_workers=2)
+    function_output_6 = interleave_records(file_list, num_workers=6)
+
+    records_1 = list(function_output_1.as_numpy_iterator())
+    workers = [list(d.as_numpy_iterator()) for d in function_output_3]
+
+    assert sorted(records_1) == all_records
+    assert records_1 == list(function_output_2.as_numpy_iterator())
+    assert [len(w) for w in workers] == [18, 12]
+    assert sorted(workers[0] + workers[1]) == all_records
+    assert function_output_4 is None
+    assert function_output_5 is None
+    assert function_output_6 is None
+
+    return
+
+
+def test_interleave_split_files(tmp_path):
+    "Testing interleave_records() on the files split with index_split()"
+
+    file_list, _ = write_synthetic_records(
+        str(tmp_path), 'img_', ['B2'], [4, 4], n_patches=40, n_files=8)
+
+    train_files, test_files = index_split(file_list, 0.5, 0.5, level='file',
+                                          return_files=True)
+    train = interleave_records(train_files, 2)
+    test = interleave_records(test_files, 2)
+
+    epochs = [(set(train.as_numpy_iterator()), set(test.as_numpy_iterator()))
+              for _ in range(2)]
+
+    assert len(epochs[0][0] | epochs[0][1]) == 40
+    assert epochs[0][0].isdisjoint(epochs[1][1])
+    assert epochs[0][1].isdisjoint(epochs[1][0])
+
+    return
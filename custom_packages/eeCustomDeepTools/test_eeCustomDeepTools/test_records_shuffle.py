@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the functions that shuffle the TFRecords in two levels.
+# The tests write synthetic TFRecords to a temporary folder and check that
+# every record is read once, that the buffer follows the memory budget and
+# that a larger budget mixes the records better.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import tensorflow as tf
+from eeCustomDeepTools import shuffle_buffer_size, two_level_shuffle, \
+    measure_mixing, PrepareBatches, get_features_dict, interleave_records
+from benchmarks.synthetic_records import write_synthetic_records
+
+
+def test_two_level_shuffle(tmp_path, capsys):
+    "Testing the two_level_shuffle() and measure_mixing() functions"
+
+    file_list, _ = write_synthetic_records(
+        str(tmp_path), 'img_', ['B2'], [4, 4], n_patches=60, n_files=6)
+    all_records = sorted(tf.data.TFRecordDataset(
+        file_list, compression_type='GZIP').as_numpy_iterator())
+    record_bytes = len(all_records[0])
+
+    function_output_1 = shuffle_buffer_size(1000, 300)
+    function_output_2 = two_level_shuffle(file_list, 20 * record_bytes,
+                                          seed=0, num_parallel_reads=2)
+    function_output_3 = two_level_shuffle(file_list, 0)
+    function_output_6 = two_level_shuffle(file_list, record_bytes, seed=0,
+                                          worker_index=1, num_workers=2)
+    function_output_4 = measure_mixing(file_list, 1, record_bytes,
+                                       batch_size=6, num_parallel_reads=1)
+    function_output_5 = measure_mixing(file_list, 60 * record_bytes,
+                                       record_bytes, batch_size=6)
+
+    assert function_output_1 == 3
+    assert 'Shuffle buffer: 20 records' in capsys.readouterr().out
+    assert sorted(function_output_2.as_numpy_iterator()) == all_records
+    assert function_output_3 is None
+
+    # The files are shared among the workers as in interleave_records()
+    assert sorted(function_output_6.as_numpy_iterator()) == sorted(
+        interleave_records(file_list, worker_index=1,
+                           num_workers=2).as_numpy_iterator())
+
+    # With a buffer of 1 record and 1 file read at a time, only the order
+    # of the files is shuffled
+    assert function_output_4['buffer_size'] == 1
+    assert function_output_4['files_per_batch'] < 0.5
+    assert function_output_5['buffer_fraction'] == 1
+    assert function_output_5['files_per_batch'] > \
+        function_output_4['files_per_batch']
+    assert abs(function_output_5['rank_correlation']) < 0.5
+
+    # Memory budget of the training shuffle buffer of PrepareBatches
+    features_dict = get_features_dict(['B2'], 'classes', ['B2'], [4, 4])
+    prepare = PrepareBatches(features_dict, 7, 'classes')
+    prepare.prepare_batches(4, 4, function_output_2, function_output_2,
+                            shuffle_bytes=10 * (16 * 4 + 16 * 7 * 4))
+
+    assert 'Shuffle buffer: 10 records' in capsys.readouterr().out
+
+    return
@@ -10,6 +10,8 @@
 # to numpy arrays is that the method is really time consuming, especially
 # if using large datasets. It is therefore adviced to avoid it unless
 # absolutely necessary.
+# The index_split() function is tested on a few synthetic TFRecords, which
+# are small enough to be read and compared partition by partition.
 #
 # Author: Davide Lomeo
 # Email: davide.lomeo20@imperial.ac.uk
@@ -18,7 +20,8 @@
 # Version: 1.0
 
 import tensorflow as tf
-from eeCustomDeepTools import dataset_split
+from eeCustomDeepTools import dataset_split, index_split
+from benchmarks.synthetic_records import write_synthetic_records
 
 
 def test_dataset_split():
@@ -53,3 +56,38 @@ def test_dataset_split():
     assert function_output_5[1] is None
 
     return
+
+
+def test_index_split(tmp_path):
+    "Testing the index_split() function"
+
+    file_list, _ = write_synthetic_records(
+        str(tmp_path), 'record-', ['B2'], [4, 4], 40, n_files=4)
+
+    function_output_1 = index_split(file_list, 0.8, 0.1, 0.1)
+    function_output_2 = index_split(file_list, 0.5, 0.5, level='file')
+    function_output_3 = index_split(file_list, 0.8, 0.1, 0.2)
+    function_output_4 = index_split(file_list, 0.8, 0.2, level='patch')
+    function_output_5 = index_split(file_list[0], 0.8, 0.2)
+    function_output_6 = index_split(file_list, 0.5, 0.5, level='file',
+                                    return_files=True)
+    function_output_7 = index_split(file_list, 0.5, 0.5, return_files=True)
+
+    assert len(function_output_1) == 3
+    assert len(function_output_2) == 2
+    assert function_output_3[0] is None
+    assert function_output_4[0] is None
+    assert function_output_5[0] is None
+    assert sorted(function_output_6[0] + function_output_6[1]) == \
+        sorted(file_list)
+    assert function_output_7[0] is None
+
+    # The partitions need to be disjoint, cover all the records and
+    # be the same every time they are read
+    for output in [function_output_1, function_output_2]:
+        partitions = [list(d.as_numpy_iterator()) for d in output]
+        records = [r for p in partitions for r in p]
+        assert len(records) == len(set(records)) == 40
+        assert partitions == [list(d.as_numpy_iterator()) for d in output]
+
+    return
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the ShardCache class and its use by the GetFilesInfo
+# class.
+#
+# The tests use a temporary local folder in place of the cloud storage
+# bucket. The synthetic TFRecords are fetched twice (the second time they
+# need to be read from the cache), then the cache is filled beyond its size
+# to check that the least recently used files are deleted first, and a
+# wrong checksum is used to check that a corrupted copy is never used.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import os
+import json
+import hashlib
+from eeCustomDeepTools import ShardCache, GetFilesInfo, LocalStorage, \
+                              build_records_index
+from benchmarks.synthetic_records import write_synthetic_records
+
+
+class ChecksumStorage(LocalStorage):
+    "Local storage reporting the md5 checksum of the files, as a bucket"
+
+    def stat(self, path):
+        stat = super().stat(path)
+        stat['md5'] = hashlib.md5(self.read(path)).hexdigest()
+        return stat
+
+
+def test_shard_cache(tmp_path):
+    "Testing the ShardCache class"
+
+    bucket = tmp_path / 'bucket'
+    cache_dir = str(tmp_path / 'cache')
+    bucket.mkdir()
+    file_list, json_file = write_synthetic_records(
+        str(bucket), 'record-', ['B2'], [8, 8], 8, n_files=4)
+    file_size = max(os.path.getsize(f) for f in file_list)
+
+    # The files are listed as a bucket, without reading them
+    get_info = GetFilesInfo('gstorage', cache_dir)
+    function_output_1, json_output = get_info.get_files(
+        sorted(file_list + [json_file]), 'record-')
+    mtimes_1 = [os.path.getmtime(f) for f in function_output_1]
+
+    function_output_2 = ShardCache(cache_dir).fetch(file_list)
+    mtimes_2 = [os.path.getmtime(f) for f in function_output_2]
+
+    assert function_output_1 == function_output_2
+    assert all(f.startswith(cache_dir) for f in function_output_1)
+    assert mtimes_1 == mtimes_2
+    assert json_output == json_file
+    assert get_info.get_mixer(json_file)['totalPatches'] == 8
+
+    for remote, local in zip(file_list, function_output_1):
+        with open(remote, 'rb') as f1, open(local, 'rb') as f2:
+            assert f1.read() == f2.read()
+
+    # File 3 is the least recently used when file 1 needs room
+    cache = ShardCache(cache_dir, max_bytes=int(3.5 * file_size))
+    cache.clear()
+    cache.fetch(file_list[2:])
+    cache.fetch(file_list[:1])
+    function_output_3 = cache.fetch(file_list[2:3])
+    function_output_4 = cache.fetch(file_list[1:2])
+
+    assert function_output_3[0] == function_output_1[2]
+    assert function_output_4[0] == function_output_1[1]
+    assert cache.cached_bytes() <= 3.5 * file_size
+    assert not os.path.exists(function_output_1[3])
+    assert all(os.path.exists(f) for f in function_output_1[:3])
+
+    # A copy that does not match the checksum is not used
+    build_records_index(file_list[:1])
+    with open(file_list[0] + '.index.json') as js:
+        index = json.load(js)
+    index['md5'] = '0' * 32
+    with open(file_list[0] + '.index.json', 'w') as js:
+        json.dump(index, js)
+
+    cache.clear()
+    function_output_5 = cache.fetch(file_list[:2])
+    function_output_6 = cache.fetch(file_list[0])
+
+    assert function_output_5[0] == file_list[0]
+    assert function_output_5[1] == function_output_1[1]
+    assert cache.cached_bytes() == os.path.getsize(file_list[1])
+    assert function_output_6 is None
+
+    # The checksum of the bucket is used before the one of the sidecar
+    checked_cache = ShardCache(cache_dir, backend=ChecksumStorage())
+    function_output_7 = checked_cache.fetch(file_list[:1])
+
+    assert function_output_7[0] == function_output_1[0]
+
+    return
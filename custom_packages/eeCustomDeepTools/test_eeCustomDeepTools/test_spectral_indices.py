@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the functions that compute the spectral indices in the
+# input pipeline.
+#
+# The indices are checked against a NumPy version of the formulas and
+# bands used by the eeCustomTools package on the Earth Engine side, for
+# all the sensors, including pixels with zero and negative values, and
+# SENSOR_INDICES and the formulas are checked against the tables of the
+# indices of the eeCustomTools package (INDEX_DEFINITIONS, SENSOR_BANDS and
+# INDEX_FORMULAS). The
+# indices are then computed by PrepareBatches and by
+# prepare_prediction_dataset() on synthetic TFRecords holding only the raw
+# bands, to check that they are stacked in alphabetical order with them.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import os
+import importlib.util
+import numpy as np
+from eeCustomDeepTools import add_spectral_indices, index_bands, \
+                              SENSOR_INDICES, \
+                              PrepareBatches, prepare_prediction_dataset, \
+                              get_features_dict
+from benchmarks.synthetic_records import write_synthetic_records
+
+# Tables of the indices of the eeCustomTools package, loaded from their
+# source file, which does not import ee
+TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                           '..', 'eeCustomTools', 'eeCustomTools',
+                           'index_tables.py')
+_spec = importlib.util.spec_from_file_location('index_tables', TABLES_PATH)
+index_tables = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(index_tables)
+SENSOR_BANDS = index_tables.SENSOR_BANDS
+
+
+def server_indices(img, sensor):
+    "NumPy version of the formulas used in Earth Engine"
+
+    def nd(a, b):
+        # normalizedDifference masks negative values (exported as 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out = np.where(a + b == 0, 0, (a - b) / (a + b))
+        return np.where((a < 0) | (b < 0), 0, out)
+
+    def divide(a, b):
+        # Earth Engine returns 0 for a division by 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(b == 0, 0, a / b)
+
+    b = {k: img[v] for k, v in SENSOR_BANDS[sensor].items()}
+    if sensor == 'sentinel2':
+        green = b['GREEN']
+        indices = {'NDVI': nd(b['NIR'], b['RED']),
+                   'NDWI': nd(b['NIR'], green),
+                   'MNDWI': nd(b['SWIR1'], green),
+                   'NDSI': nd(b['SWIR2'], b['SWIR1']),
+                   'NDMI': nd(b['SWIR1'], b['NIR'])}
+    else:
+        green = b['YELLOW']
+        indices = {'NDVI': nd(b['NIR'], b['RED']),
+                   'NDWI': nd(b['SWIR'], b['NIR']),
+                   'MNDWI': nd(b['SWIR'], b['RED']),
+                   'NDSI': nd(b['MIR'], b['YELLOW']),
+                   'NDMI': nd(b['SWIR'], b['NIR'])}
+
+    indices['EVI'] = 2.5 * divide(
+        b['NIR'] - b['RED'], b['NIR'] + 6 * b['RED'] - 7.5 * b['BLUE'] + 1)
+    indices['EVI2'] = 2.4 * divide(b['NIR'] - b['RED'],
+                                   b['NIR'] + b['RED'] + 1)
+    indices['GOSAVI'] = divide(b['NIR'] - green, b['NIR'] + green + 0.16)
+    indices['SAVI'] = divide(1.5 * (b['NIR'] - b['RED']),
+                             b['NIR'] + b['RED'] + 0.5)
+
+    return indices
+
+
+def test_add_spectral_indices():
+    "Testing the add_spectral_indices() function"
+
+    rng = np.random.default_rng(0)
+
+    for sensor in SENSOR_BANDS:
+        bands = index_bands(sensor)
+        img = {k: rng.random((4, 8, 8), dtype=np.float32) for k in bands}
+
+        # Pixels with zero and negative values
+        for k in bands:
+            img[k][0, 0, 0] = 0
+        img[bands[0]][0, 0, 1] = -0.1
+
+        function_output_1 = add_spectral_indices(img, sensor)
+        expected = server_indices(img, sensor)
+
+        assert list(function_output_1) == sorted(bands + list(expected))
+        for k, v in expected.items():
+            np.testing.assert_allclose(function_output_1[k].numpy(), v,
+                                       rtol=1e-5, atol=1e-6)
+
+    function_output_2 = add_spectral_indices(img, 'landsat9')
+    function_output_3 = add_spectral_indices(img, 'sentinel2', ['NDSI'])
+    function_output_4 = add_spectral_indices(img, 'landsat8', ['NDBI'])
+
+    assert function_output_2 is None
+    assert function_output_3 is None
+    assert function_output_4 is None
+    assert index_bands('sentinel2', ['NDVI', 'EVI']) == ['B2', 'B4', 'B8']
+
+    return
+
+
+def test_sensor_indices_tables():
+    "Testing SENSOR_INDICES and the formulas against the eeCustomTools tables"
+
+    definitions = index_tables.INDEX_DEFINITIONS
+    rng = np.random.default_rng(1)
+
+    assert list(SENSOR_INDICES) == list(definitions)
+    for sensor, indices in definitions.items():
+        bands = SENSOR_BANDS[sensor]
+        expected = {name: (formula, [bands[role] for role in roles])
+                    for name, (formula, roles) in indices.items()}
+
+        assert SENSOR_INDICES[sensor] == expected
+
+        img = {k: rng.random((4, 8), dtype=np.float32) + 0.1
+               for k in index_bands(sensor)}
+        function_output_1 = add_spectral_indices(img, sensor)
+        for name, (formula, names) in expected.items():
+            scale, a, b, c = index_tables.INDEX_FORMULAS[formula]
+            p, q = img[names[0]], img[names[1]]
+            r = img[names[-1]]
+            np.testing.assert_allclose(
+                function_output_1[name].numpy(),
+                scale * (p - q) / (p + a * q + b * r + c),
+                rtol=1e-5, atol=1e-6)
+
+    return
+
+
+def test_pipeline_spectral_indices(tmp_path):
+    "Testing the spectral indices in PrepareBatches and predictions"
+
+    bands = ['B1', 'B11', 'B12', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7', 'B8',
+             'B8A', 'B9']
+    dims = [8, 8]
+    file_list, _ = write_synthetic_records(
+        str(tmp_path), 'record-', bands, dims, 6, n_files=2)
+    features_dict = get_features_dict(
+        list(bands), 'classes', list(bands), dims)
+
+    # The channels of the indices follow the alphabetical order
+    channels = sorted(bands + ['NDVI', 'NDWI', 'MNDWI', 'NDSI', 'NDMI',
+                               'EVI', 'EVI2', 'GOSAVI', 'SAVI'])
+
+    def check_indices(features):
+        raw = {b: features[..., channels.index(b)].numpy() for b in bands}
+        for k, v in server_indices(raw, 'sentinel2').items():
+            np.testing.assert_allclose(
+                features[..., channels.index(k)].numpy(), v,
+                rtol=1e-5, atol=1e-6)
+
+    for batch_parse in [False, True]:
+        prepare = PrepareBatches(features_dict, 7, 'classes',
+                                 spectral_indices='sentinel2')
+        dataset = prepare.load_records(file_list)
+        train, _ = prepare.prepare_batches(
+            6, 6, dataset, dataset, batch_parse=batch_parse)
+        features, labels = next(iter(train))
+
+        assert features.shape == (6, 8, 8, 21)
+        assert labels.shape == (6, 8, 8, 7)
+        check_indices(features)
+
+    function_output_1 = prepare_prediction_dataset(
+        file_list, dims, bands, False, 6, spectral_indices='sentinel2')
+    function_output_2 = prepare_prediction_dataset(
+        file_list, dims, bands[:4], False, spectral_indices='sentinel2')
+
+    features = next(iter(function_output_1))
+    assert features.shape == (6, 8, 8, 21)
+    check_indices(features)
+    assert function_output_2 is None
+
+    return
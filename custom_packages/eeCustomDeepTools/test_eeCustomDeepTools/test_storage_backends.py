@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the storage backends and their use by the GetFilesInfo
+# class.
+#
+# The CloudStorage class is tested with a fake client that serves the
+# objects of a temporary local folder, counting the requests, so that the
+# tests do not need a user-specific bucket. The tests check that the files
+# of two exports are listed with their metadata in one request per folder,
+# that the mixers of both exports are read in a single call, that the
+# TFRecords are downloaded into the cache through the backend and that the
+# metadata of the files is requested again once out of date.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import os
+import sys
+import base64
+import hashlib
+import datetime
+from eeCustomDeepTools import LocalStorage, CloudStorage, GetFilesInfo
+from benchmarks.synthetic_records import write_synthetic_records
+
+
+class FakeBlob:
+    "Object of the fake bucket, stored as a local file"
+
+    def __init__(self, client, path, name):
+        self.client = client
+        self.path = path
+        self.name = name
+        self.size = None
+        self.updated = None
+        self.md5_hash = None
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                self.md5_hash = base64.b64encode(
+                    hashlib.md5(f.read()).digest()).decode()
+            self.size = os.path.getsize(path)
+            self.updated = datetime.datetime.fromtimestamp(
+                os.path.getmtime(path), datetime.timezone.utc)
+
+    def exists(self):
+        self.client.requests += 1
+        return os.path.exists(self.path)
+
+    def download_as_bytes(self):
+        self.client.requests += 1
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def download_to_filename(self, local_path):
+        with open(local_path, 'wb') as f:
+            f.write(self.download_as_bytes())
+
+    def open(self, mode='rb'):
+        self.client.requests += 1
+        return open(self.path, mode)
+
+
+class FakeBucket:
+    "Bucket of the fake client, stored as a local folder"
+
+    def __init__(self, client, folder):
+        self.client = client
+        self.folder = folder
+
+    def blob(self, name):
+        return FakeBlob(self.client, self.folder + '/' + name, name)
+
+    def get_blob(self, name):
+        self.client.requests += 1
+        blob = self.blob(name)
+        return blob if blob.size is not None else None
+
+
+class FakeClient:
+    "Client with the same functions of google.cloud.storage.Client"
+
+    def __init__(self, root):
+        self.root = root
+        self.requests = 0
+
+    def bucket(self, name):
+        return FakeBucket(self, self.root + '/' + name)
+
+    def list_blobs(self, bucket, prefix='', delimiter=None):
+        self.requests += 1
+        folder, _, start = prefix.rpartition('/')
+        path = '{}/{}/{}'.format(self.root, bucket, folder)
+        return [self.bucket(bucket).blob(folder + '/' + f)
+                for f in sorted(os.listdir(path)) if f.startswith(start)]
+
+
+def test_storage_backends(tmp_path):
+    "Testing the LocalStorage and CloudStorage classes"
+
+    exports = ['export_2020', 'export_2021']
+    file_lists = []
+    for e in exports:
+        (tmp_path / 'bucket' / e).mkdir(parents=True)
+        file_lists.append(write_synthetic_records(
+            str(tmp_path / 'bucket' / e), 'record-', ['B2'], [8, 8], 6,
+            n_files=2))
+
+    client = FakeClient(str(tmp_path))
+    backend = CloudStorage(client=client)
+    folders = ['gs://bucket/' + e for e in exports]
+
+    function_output_1 = backend.list_many(folders)
+    requests_1 = client.requests
+    function_output_2 = backend.stat_many(function_output_1)
+
+    function_output_3 = LocalStorage().list_many(
+        [str(tmp_path / 'bucket' / e) for e in exports])
+
+    assert len(function_output_1) == 6
+    assert [f.replace('gs://', str(tmp_path) + '/')
+            for f in function_output_1] == function_output_3
+    assert requests_1 == 2
+    assert client.requests == requests_1
+
+    for f, stat in zip(function_output_3, function_output_2):
+        with open(f, 'rb') as local:
+            assert stat['md5'] == hashlib.md5(local.read()).hexdigest()
+        assert stat['size'] == os.path.getsize(f)
+
+    # Listing the bucket folders and reading the mixers of both exports
+    get_info = GetFilesInfo('gstorage', backend=backend)
+    outputs = [get_info.get_files(folder, 'record-') for folder in folders]
+    function_output_4 = get_info.get_mixers([o[1] for o in outputs])
+
+    assert outputs[0][0] == function_output_1[:2]
+    assert outputs[1][1] == function_output_1[5]
+    assert [m['totalPatches'] for m in function_output_4.values()] == [6, 6]
+
+    # Reading the TFRecords through the cache
+    get_info = GetFilesInfo('gstorage', str(tmp_path / 'cache'),
+                            backend=backend)
+    function_output_5, _ = get_info.get_files(folders[1], 'record-')
+    function_output_6 = get_info.get_mixers('gs://bucket/export_2020')
+
+    for remote, local in zip(file_lists[1][0], function_output_5):
+        with open(remote, 'rb') as f1, open(local, 'rb') as f2:
+            assert f1.read() == f2.read()
+    assert function_output_6 is None
+
+    # The metadata is replaced by a new listing and expires after the TTL
+    os.remove(function_output_3[0])
+    function_output_7 = backend.list_files(folders[0], 'record-')
+    requests_2 = client.requests
+    function_output_8 = backend.exists(function_output_1[0])
+    backend.stats_ttl = 0
+    function_output_9 = backend.stat(function_output_1[1])
+
+    assert function_output_7 == function_output_1[1:3]
+    assert function_output_8 is False
+    assert function_output_9 == function_output_2[1]
+    assert client.requests == requests_2 + 2
+
+    return
+
+
+def test_concurrent_listing(tmp_path):
+    "Testing that CloudStorage lists many folders at once on its threads"
+
+    folders = []
+    for i in range(32):
+        folder = tmp_path / 'bucket' / 'export_{:02d}'.format(i)
+        folder.mkdir(parents=True)
+        for j in range(20):
+            (folder / 'record-{}.tfrecord.gz'.format(j)).write_bytes(
+                bytes([i, j]))
+        folders.append('gs://bucket/export_{:02d}'.format(i))
+
+    backend = CloudStorage(client=FakeClient(str(tmp_path)))
+
+    # Each folder is listed twice at the same time, switching between the
+    # threads as often as possible
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(5):
+            function_output_1 = backend.list_many(folders + folders)
+            assert len(function_output_1) == 2 * 32 * 20
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    function_output_2 = backend.stat_many(function_output_1[:640])
+
+    assert [stat['size'] for stat in function_output_2] == [2] * 640
+    assert function_output_2[21]['md5'] == hashlib.md5(
+        bytes([1, 1])).hexdigest()
+
+    return
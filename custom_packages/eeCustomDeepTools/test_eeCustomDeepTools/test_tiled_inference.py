@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the class that runs the tiled inference.
+#
+# The tests use a small pixel-wise model (a 1x1 convolution), whose
+# prediction of a pixel does not depend on its neighbours. The scene
+# classified tile by tile, with or without overlaps, and the stitched
+# Earth Engine patches with a kernel buffer therefore need to match
+# exactly the scene classified in one go.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers
+from tensorflow.keras.models import Model
+from eeCustomDeepTools import TiledPredictor
+
+
+def test_tiled_predictor(tmp_path):
+    "Testing the TiledPredictor class"
+
+    input_img = layers.Input((None, None, 3))
+    output_img = layers.Conv2D(5, (1, 1), activation=tf.nn.softmax)(input_img)
+    model = Model(input_img, output_img)
+
+    rng = np.random.default_rng(0)
+    scene = rng.normal(size=(37, 45, 3)).astype(np.float32)
+    expected = np.argmax(model.predict_on_batch(scene[None])[0], axis=-1)
+
+    function_output_1 = TiledPredictor(model, 16, overlap=6).predict_scene(
+        scene, str(tmp_path / 'scene_1.npy'))
+    function_output_2 = TiledPredictor(model, 16).predict_scene(
+        scene, str(tmp_path / 'scene_2.npy'))
+    function_output_3 = TiledPredictor(model, 16, overlap=16).predict_scene(
+        scene, str(tmp_path / 'scene_3.npy'))
+    function_output_4 = TiledPredictor(model, 16).predict_scene(
+        scene[0], str(tmp_path / 'scene_4.npy'))
+
+    np.testing.assert_array_equal(function_output_1, expected)
+    np.testing.assert_array_equal(function_output_2, expected)
+    assert function_output_3 is None
+    assert function_output_4 is None
+
+    # Patches of 8x8 pixels exported with a kernel buffer of 4 pixels, in
+    # the (width, height, bands) layout of prepare_prediction_dataset()
+    image = scene[:32, :40]
+    padded = np.pad(image, ((2, 2), (2, 2), (0, 0)))
+    patches = np.stack([padded[r:r + 12, c:c + 12].transpose(1, 0, 2)
+                        for r in range(0, 32, 8) for c in range(0, 40, 8)])
+    mixer = {'patchDimensions': [8, 8], 'patchesPerRow': 5,
+             'totalPatches': 20}
+    dataset = tf.data.Dataset.from_tensor_slices(patches).batch(1)
+
+    function_output_5 = TiledPredictor(model, 12).predict_patches(
+        dataset, mixer, [4, 4], str(tmp_path / 'patches_1.npy'))
+    function_output_6 = TiledPredictor(model, 16).predict_patches(
+        dataset, mixer, [4, 4], str(tmp_path / 'patches_2.npy'))
+
+    np.testing.assert_array_equal(function_output_5, expected[:32, :40])
+    assert function_output_6 is None
+
+    return
@@ -1,7 +1,13 @@
 from .cloud_mask import * # noqa
+from .composite_cache import * # noqa
 from .compute_indices import * # noqa
 from .image_segmentation import * # noqa
+from .index_registry import * # noqa
+from .index_tables import * # noqa
+from .local_composite import * # noqa
 from .other_functions import * # noqa
+from .qa_decoder import * # noqa
+from .task_monitor import * # noqa
 
 from pkg_resources import get_distribution, DistributionNotFound
 try:
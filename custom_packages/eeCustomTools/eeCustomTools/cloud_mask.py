@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 
 # This script contains functions to mask out clouds from Sentinel-2 and
-# Landsat 5-7-8 Images
+# Landsat 5-7-8 Images. The bits of the QA bands are decoded with the table
+# of the qa_decoder module, with a single bitmask comparison per image.
 #
 # Author: Davide Lomeo,
 # Email: davide.lomeo20@imperial.ac.uk
@@ -10,10 +11,13 @@
 # Date: 19 July 2021
 # Version: 0.1.0
 
-import math
+from .qa_decoder import qa_mask
 
 __all__ = ['mask_sentinel_clouds', 'mask_landsat_clouds']
 
+# The parameters identifying each mask (e.g., in the keys of CompositeCache)
+# are declared after the functions, as key_parameters
+
 
 def mask_sentinel_clouds(img):
     """
@@ -32,18 +36,9 @@ def mask_sentinel_clouds(img):
     """
 
     try:
-        # selecting the qa band
-        qa = img.select('QA60')
-
-        # Bits 10 belong to clouds, bits 11 belong to cirrus
-        cloudBitMask = 1 << 10
-        cirrusBitMask = 1 << 11
-
-        # Setting flags to 0 to indicate no cloudy condtions
-        mask = qa.bitwiseAnd(cloudBitMask).eq(0) \
-            .And(qa.bitwiseAnd(cirrusBitMask).eq(0))
-
-        return img.updateMask(mask).divide(10000)
+        # Masking the pixels flagged as opaque clouds (bit 10) or as
+        # cirrus (bit 11)
+        return qa_mask('sentinel2')(img).divide(10000)
 
     # The function will return an error message if the input is not
     # of type <class 'ee.image.Image'>
@@ -73,40 +68,9 @@ def mask_landsat_clouds(img):
     """
 
     try:
-        def get_qa_bits(img, start, end, new_name):
-
-            # Computing the bits tha need to be extacted
-            bits_etxracted = 0
-            for i in range(start, end, 1):
-                bits_etxracted += math.pow(2, i)
-
-            # Returning a single band img of the extracted qa bits,
-            # and giving it a new name
-            return img.select([0], [new_name]) \
-                      .bitwiseAnd(bits_etxracted) \
-                      .rightShift(start)
-
-        def compute_shadow(img):
-            "Function to mask out cloud shadows pixels"
-
-            # Select the pixel_qa band
-            qa = img.select(['pixel_qa'])
-            return get_qa_bits(qa, 3, 3, 'Cloud_shadows').eq(0)
-
-        def compute_clouds(img):
-            "Function to mask out cloudy pixels"
-
-            # Select the pixel_qa band
-            qa = img.select(['pixel_qa'])
-            return get_qa_bits(qa, 5, 5, 'Cloud').eq(0)
-
-        # Calling the function to mask both clouds and clouds shadows
-        # and returning the maksed image
-        clouds_shadow = compute_shadow(img)
-        clouds = compute_clouds(img)
-        img = img.updateMask(clouds_shadow)
-
-        return img.updateMask(clouds)
+        # Masking the pixels flagged as cloud shadows (bit 3) or as clouds
+        # (bit 5), bits common to the pixel_qa band of all Landsat sensors
+        return qa_mask('landsat57')(img)
 
     # The function will return an error message if the input is not
     # of type <class 'ee.image.Image'>
@@ -115,3 +79,9 @@ def mask_landsat_clouds(img):
         Error: the input is {}. It needs to be a <class 'ee.image.Image'>
         """.format(str(type(img))))
         return None
+
+
+mask_sentinel_clouds.key_parameters = {
+    'qa_sensor': 'sentinel2', 'qa_flags': None, 'scale_factor': 10000}
+mask_landsat_clouds.key_parameters = {
+    'qa_sensor': 'landsat57', 'qa_flags': None}
@@ -0,0 +1,383 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script contains a cache of the median composites built in Earth
+# Engine (ImageCollection -> cloud filter -> cloud masking -> median ->
+# spectral indices -> clip), so that the same composite is not computed
+# again for every notebook, region and run.
+#
+# The key of a composite is derived from the parameters that define it:
+# the collection ID, the date range, the region of interest, the cloud
+# filter, the mask (the band, bitmask and value compiled from the table of
+# the QA flags), the indices (their formulas and bands, from the registry
+# of the indices), the scale and an optional version (to change when the
+# code changes). The first time a composite is requested (miss), it is
+# exported once as an asset named after its key, and the composite computed
+# on the fly is returned meanwhile. When the asset exists (hit), the
+# composite is loaded from it, so Earth Engine reads the stored pixels
+# instead of computing the median again. While the export is still
+# running, no other export is started.
+#
+# The assets are handled by a store (EarthEngineAssets by default), which
+# can be replaced, e.g., by a local fake store in the tests.
+#
+# Author: Davide Lomeo,
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import json
+import hashlib
+import ee
+from .cloud_mask import mask_sentinel_clouds
+from .compute_indices import sentinel2_spectral_indices
+from .qa_decoder import qa_bitmask
+from .index_tables import INDEX_FORMULAS, INDEX_DEFINITIONS, SENSOR_BANDS
+
+__all__ = ['EarthEngineAssets', 'CompositeCache']
+
+# States of an export task that has not finished
+RUNNING_STATES = ['UNSUBMITTED', 'READY', 'RUNNING']
+
+
+class EarthEngineAssets:
+    """
+    Class that stores the composites as Earth Engine assets.
+
+    Functions
+    ---------
+    exists(asset_id)
+        Check if the asset exists
+    load(asset_id)
+        Return the image of the asset
+    pending(description)
+        Return the status of the running export task with the description
+    export(image, asset_id, description, region, scale)
+        Start the export of the image to the asset
+    """
+
+    def __init__(self):
+        "Class constructor"
+
+        super().__init__()
+
+    def exists(self, asset_id):
+        """
+        Function that checks if the asset exists.
+
+        Parameters
+        ----------
+        asset_id : str
+            ID of the asset
+
+        Returns
+        -------
+        bool
+            True if the asset exists
+        """
+
+        try:
+            return ee.data.getAsset(asset_id) is not None
+        except ee.EEException:
+            return False
+
+    def load(self, asset_id):
+        """
+        Function that returns the image of the asset.
+
+        Parameters
+        ----------
+        asset_id : str
+            ID of the asset
+
+        Returns
+        -------
+        ee.image.Image
+            The image of the asset
+        """
+
+        return ee.Image(asset_id)
+
+    def pending(self, description):
+        """
+        Function that returns the status of the export task with the
+        input description, if it has not finished yet.
+
+        Parameters
+        ----------
+        description : str
+            Description of the export task
+
+        Returns
+        -------
+        dictionary
+            The status of the task, or None if no task is running
+        """
+
+        for status in ee.data.getTaskList():
+            if (status.get('description') == description) & \
+                    (status.get('state') in RUNNING_STATES):
+                return status
+
+        return None
+
+    def export(self, image, asset_id, description, region, scale):
+        """
+        Function that starts the export of the image to the asset.
+
+        Parameters
+        ----------
+        image : ee.image.Image
+            Image to export
+        asset_id : str
+            ID of the asset
+        description : str
+            Description of the export task
+        region : ee.geometry.Geometry
+            Region to export
+        scale : float
+            Resolution of the export in metres
+
+        Returns
+        -------
+        ee.batch.Task
+            The export task started
+        """
+
+        task = ee.batch.Export.image.toAsset(
+            image=image,
+            description=description,
+            assetId=asset_id,
+            region=region,
+            scale=scale,
+            maxPixels=3784216672400)
+        task.start()
+
+        return task
+
+
+class CompositeCache:
+    """
+    Class that builds the median composites of a collection, exporting
+    each composite once as an asset and loading it from the asset
+    afterwards.
+
+    Parameters
+    ----------
+    asset_folder : str
+        Folder (or image collection) of the assets, e.g., 'users/name/cache'
+    store : object, optional
+        Store of the assets (default EarthEngineAssets)
+
+    Functions
+    ---------
+    key(collection_id, start_date, end_date, roi, ...)
+        Return the key of the composite
+    asset_id(key)
+        Return the ID of the asset of the composite
+    get(collection_id, start_date, end_date, roi, ...)
+        Return the composite, exporting it on a miss
+    """
+
+    def __init__(self, asset_folder, store=None):
+        "Class constructor"
+
+        super().__init__()
+        self.asset_folder = asset_folder.rstrip('/')
+        self.store = EarthEngineAssets() if store is None else store
+
+    def key(self, collection_id, start_date, end_date, roi, max_cloud=30,
+            mask_function=mask_sentinel_clouds,
+            indices_function=sentinel2_spectral_indices, scale=10,
+            cloud_property='CLOUDY_PIXEL_PERCENTAGE', version=None):
+        """
+        Function that derives the key of the composite from its parameters.
+        The Earth Engine objects (e.g., ee.Date or the region of interest)
+        are identified by their serialisation. The masks and the indices of
+        this package (e.g., from qa_mask() or compile_indices()) are
+        identified by what they compute, i.e. the bitmask of the QA band
+        and the formulas and bands of the indices, taken from the tables of
+        the package, so the key changes when the tables change. The other
+        functions are only identified by their name and the values they
+        were built with, so the version needs changing when their code
+        changes.
+
+        Parameters
+        ----------
+        collection_id : str
+            ID of the ImageCollection, e.g., 'COPERNICUS/S2'
+        start_date : str or ee.Date
+            First date of the composite
+        end_date : str or ee.Date
+            Last date of the composite
+        roi : ee.Geometry or ee.FeatureCollection
+            Region of interest
+        max_cloud : float, optional
+            Maximum cloud percentage of the images (default 30). No filter
+            is applied if None
+        mask_function : function, optional
+            Function masking the clouds of an image (default
+            mask_sentinel_clouds). No mask is applied if None
+        indices_function : function, optional
+            Function adding the indices to the median image (default
+            sentinel2_spectral_indices). No index is added if None
+        scale : float, optional
+            Resolution of the asset in metres (default 10)
+        cloud_property : str, optional
+            Property of the images holding the cloud percentage (default
+            'CLOUDY_PIXEL_PERCENTAGE')
+        version : str, optional
+            Version of the composite, to change when the code of the
+            functions changes
+
+        Returns
+        -------
+        str
+            The key of the composite
+        """
+
+        parameters = {
+            'collection_id': collection_id,
+            'start_date': _key_value(start_date),
+            'end_date': _key_value(end_date),
+            'roi': _key_value(roi),
+            'max_cloud': max_cloud,
+            'cloud_property': cloud_property,
+            'mask_function': _key_value(mask_function),
+            'indices_function': _key_value(indices_function),
+            'scale': scale,
+            'version': version
+        }
+
+        return hashlib.sha1(json.dumps(
+            parameters, sort_keys=True).encode()).hexdigest()
+
+    def asset_id(self, key):
+        """
+        Function that returns the ID of the asset of a composite.
+
+        Parameters
+        ----------
+        key : str
+            Key of the composite
+
+        Returns
+        -------
+        str
+            The ID of the asset
+        """
+
+        return '{}/composite_{}'.format(self.asset_folder, key[:16])
+
+    def get(self, collection_id, start_date, end_date, roi, max_cloud=30,
+            mask_function=mask_sentinel_clouds,
+            indices_function=sentinel2_spectral_indices, scale=10,
+            cloud_property='CLOUDY_PIXEL_PERCENTAGE', version=None):
+        """
+        Function that returns the composite. If its asset exists, the
+        composite is loaded from it. Otherwise, the composite is computed
+        on the fly and, unless an export of the composite is already
+        running, its export to the asset is started. The parameters are
+        the same as for key().
+
+        Returns
+        -------
+        tuple
+            The composite (ee.Image) and the export task started (None if
+            the composite was loaded from its asset or is already being
+            exported). The task can be monitored with TaskMonitor
+        """
+
+        key = self.key(collection_id, start_date, end_date, roi, max_cloud,
+                       mask_function, indices_function, scale,
+                       cloud_property, version)
+        asset_id = self.asset_id(key)
+
+        # Hit: loading the composite from its asset
+        if self.store.exists(asset_id):
+            return self.store.load(asset_id), None
+
+        composite = self.__build(collection_id, start_date, end_date, roi,
+                                 max_cloud, mask_function, indices_function,
+                                 cloud_property)
+
+        # Miss: exporting the composite, unless it is already exported
+        description = 'composite_{}'.format(key[:16])
+        if self.store.pending(description) is not None:
+            return composite, None
+
+        task = self.store.export(composite.set('composite_key', key),
+                                 asset_id, description,
+                                 ee.FeatureCollection(roi).geometry(), scale)
+
+        return composite, task
+
+    def __build(self, collection_id, start_date, end_date, roi, max_cloud,
+                mask_function, indices_function, cloud_property):
+        "Function that builds the median composite"
+
+        collection = ee.ImageCollection(collection_id) \
+            .filterDate(start_date, end_date) \
+            .filterBounds(roi)
+        if max_cloud is not None:
+            collection = collection.filter(
+                ee.Filter.lt(cloud_property, max_cloud))
+        if mask_function is not None:
+            collection = collection.map(mask_function)
+
+        composite = collection.median()
+        if indices_function is not None:
+            composite = indices_function(composite)
+
+        return composite.clip(roi)
+
+
+def _key_value(value):
+    """
+    Helper function that returns a value that identifies a parameter of
+    the composite in its key
+    """
+
+    # Earth Engine objects
+    if callable(getattr(value, 'serialize', None)):
+        return value.serialize()
+
+    # Masks and indices of this package, by what they compute
+    if callable(value) and hasattr(value, 'key_parameters'):
+        return _function_key(value.key_parameters)
+
+    # Other functions, with the simple values of their closure
+    if callable(value):
+        closure = [cell.cell_contents for cell in value.__closure__ or []]
+        return '{}.{}{}'.format(
+            value.__module__, value.__qualname__,
+            [c for c in closure
+             if isinstance(c, (str, int, float, list, tuple, dict))])
+
+    return value
+
+
+def _function_key(parameters):
+    """
+    Helper function that describes a mask or the indices from their
+    key_parameters: the band, bitmask and value of the QA band, the
+    formula and the bands of each index, and the scale factor
+    """
+
+    key = {'scale_factor': parameters.get('scale_factor')}
+
+    if 'qa_sensor' in parameters:
+        key['qa'] = qa_bitmask(parameters['qa_sensor'],
+                               parameters.get('qa_flags'))
+
+    if 'index_sensor' in parameters:
+        definitions = INDEX_DEFINITIONS[parameters['index_sensor']]
+        bands = parameters.get('bands') or SENSOR_BANDS[parameters.get(
+            'band_sensor', parameters['index_sensor'])]
+        key['indices'] = [
+            [name, INDEX_FORMULAS[definitions[name][0]],
+             [bands.get(role) for role in definitions[name][1]]]
+            for name in parameters.get('indices') or definitions]
+
+    return key
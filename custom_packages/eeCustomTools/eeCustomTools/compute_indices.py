@@ -6,7 +6,9 @@
 # for Sentinel-2 and Landsats 5-6-7 sensors.
 #
 # The functions can be called on a single image or can be used
-# with the .map() method on an ImageCollection.
+# with the .map() method on an ImageCollection. The indices and the bands
+# of each sensor are declared in the registry of the index_registry
+# module, and they are computed with a single fused expression.
 #
 # Author: Davide Lomeo,
 # Email: davide.lomeo20@imperial.ac.uk
@@ -14,11 +16,17 @@
 # Date: 19 July 2021
 # Version: 0.1.0
 
+from .index_registry import compile_indices, SENSOR_BANDS
+
 __all__ = ['sentinel2_spectral_indices', 'get_landsat_indices',
            'landsat57_spectral_indices', 'landsat8_spectral_indices']
 
+# The parameters identifying the indices of each function (e.g., in the
+# keys of CompositeCache) are declared after the functions, as
+# key_parameters
+
 
-def sentinel2_spectral_indices(img):
+def sentinel2_spectral_indices(img, ee_module=None):
     """
     Function that computes several spectral indices with particular
     focus in detecting vegetation phenology, and water and salt content
@@ -31,6 +39,8 @@ def sentinel2_spectral_indices(img):
     ----------
     img : ee.image.Image
         Single Earth Engine Image that needs adding of the spectral indices
+    ee_module : module, optional
+        Module creating the constant images, as in compile_indices()
 
     Returns
     -------
@@ -38,48 +48,7 @@ def sentinel2_spectral_indices(img):
         The image with the added indices as bands
     """
     try:
-        # Computing the Normalised Difference Vegetation Index
-        ndvi = img.normalizedDifference(['B8', 'B4']).rename('NDVI')
-
-        # Computing the Normalised Difference Water Index
-        ndwi = img.normalizedDifference(['B8', 'B3']).rename('NDWI')
-
-        # Computing the Modified Normalised Difference Water Index
-        mndwi = img.normalizedDifference(['B11', 'B3']).rename('MNDWI')
-
-        # Computing the Normalised Difference Salinity Index
-        ndsi = img.normalizedDifference(['B12', 'B11']).rename('NDSI')
-
-        # Computing the Normalised Difference Moisture Index
-        ndmi = img.normalizedDifference(['B11', 'B8']).rename('NDMI')
-
-        # Computing the Enhanced Vegetation Index
-        evi = img.expression(
-            '2.5 * ((NIR - RED) / (NIR + 6 * RED - 7.5 * BLUE + 1))', {
-                'NIR': img.select('B8'),
-                'RED': img.select('B4'),
-                'BLUE': img.select('B2')}).rename('EVI')
-
-        # Computing the Enhanced Vegetation Index 2
-        evi2 = img.expression(
-            '2.4 * ((NIR - RED) / (NIR + RED + 1))', {
-                'NIR': img.select('B8'),
-                'RED': img.select('B4')}).rename('EVI2')
-
-        # Computing the Green Optimized Soil Adjusted Vegetation Index
-        gosavi = img.expression(
-            '(NIR - G) / (NIR + G + 0.16) ', {
-                'NIR': img.select('B8'),
-                'G': img.select('B3')}).rename('GOSAVI')
-
-        # Computing the Soil Adjusted Vegetation Index
-        savi = img.expression(
-            '1.5 * (NIR - RED) / (NIR + RED + 0.5) ', {
-                'NIR': img.select('B8'),
-                'RED': img.select('B4')}).rename('SAVI')
-
-        return img.addBands([ndvi, ndwi, mndwi, ndsi,
-                             ndmi, evi, evi2, gosavi, savi])
+        return compile_indices('sentinel2', ee_module=ee_module)(img)
 
     # The function will return an error message if the input is not
     # of type <class 'ee.image.Image'>
@@ -90,60 +59,21 @@ def sentinel2_spectral_indices(img):
         return None
 
 
-def get_landsat_indices(img, bands):
+def get_landsat_indices(img, bands, ee_module=None):
     """
     Helper function that computes several spectral indices
     for the input image using the specified bands dictionary
     """
 
+    # The Landsat sensors share the definitions of the indices. The
+    # compilation fails (and prints the error) if a band is missing
+    fused_indices = compile_indices('landsat8', bands=bands,
+                                    ee_module=ee_module)
+    if fused_indices is None:
+        return None
+
     try:
-        # Computing the Normalised Difference Vegetation Index
-        ndvi = img.normalizedDifference(
-            [bands['NIR'], bands['RED']]).rename('NDVI')
-
-        # Computing the Normalised Difference Water Index
-        ndwi = img.normalizedDifference(
-            [bands['SWIR'], bands['NIR']]).rename('NDWI')
-
-        # Computing the Modified Normalised Difference Water Index
-        mndwi = img.normalizedDifference(
-            [bands['SWIR'], bands['RED']]).rename('MNDWI')
-
-        # Computing the Normalised Difference Salinity Index
-        ndsi = img.normalizedDifference(
-            [bands['MIR'], bands['YELLOW']]).rename('NDSI')
-
-        # Computing the Normalised Difference Moisture Index
-        ndmi = img.normalizedDifference(
-            [bands['SWIR'], bands['NIR']]).rename('NDMI')
-
-        # Computing the Enhanced Vegetation Index
-        evi = img.expression(
-            '2.5 * ((NIR - RED) / (NIR + 6 * RED - 7.5 * BLUE + 1))', {
-                'NIR': img.select(bands['NIR']),
-                'RED': img.select(bands['RED']),
-                'BLUE': img.select(bands['BLUE'])}).rename('EVI')
-
-        # Computing the Enhanced Vegetation Index 2
-        evi2 = img.expression(
-            '2.4 * ((NIR - RED) / (NIR + RED + 1))', {
-                'NIR': img.select(bands['NIR']),
-                'RED': img.select(bands['RED'])}).rename('EVI2')
-
-        # Computing the Green Optimized Soil Adjusted Vegetation Index
-        gosavi = img.expression(
-            '(NIR - G) / (NIR + G + 0.16) ', {
-                'NIR': img.select(bands['NIR']),
-                'G': img.select(bands['YELLOW'])}).rename('GOSAVI')
-
-        # Computing the Soil Adjusted Vegetation Index
-        savi = img.expression(
-            '1.5 * (NIR - RED) / (NIR + RED + 0.5) ', {
-                'NIR': img.select(bands['NIR']),
-                'RED': img.select(bands['RED'])}).rename('SAVI')
-
-        return img.addBands([ndvi, ndwi, mndwi, ndsi,
-                            ndmi, evi, evi2, gosavi, savi])
+        return fused_indices(img)
 
     # The function will return an error message if the input is not
     # of type <class 'ee.image.Image'>
@@ -154,7 +84,7 @@ def get_landsat_indices(img, bands):
         return None
 
 
-def landsat57_spectral_indices(img):
+def landsat57_spectral_indices(img, ee_module=None):
     """
     Function that computes several spectral indices for Landsat 5 and 7
     sensors. The indices specifically focus in detecting vegetation phenology,
@@ -167,6 +97,8 @@ def landsat57_spectral_indices(img):
     ----------
     img : ee.image.Image
         Single Earth Engine L5-7 Image that needs adding the spectral indices
+    ee_module : module, optional
+        Module creating the constant images, as in compile_indices()
 
     Returns
     -------
@@ -174,21 +106,14 @@ def landsat57_spectral_indices(img):
         The image with the added indices as bands
     """
 
-    # Specifying the list of bands needed to compute the spectral indices
-    bands = {
-        'BLUE': 'B1',
-        'YELLOW': 'B2',
-        'RED': 'B3',
-        'NIR': 'B4',
-        'SWIR': 'B5',
-        'MIR': 'B7'
-    }
+    # Bands needed to compute the spectral indices
+    bands = SENSOR_BANDS['landsat57']
 
-    # Calling the function taht computes the spectral inidces
-    return get_landsat_indices(img, bands)
+    # Calling the function that computes the spectral indices
+    return get_landsat_indices(img, bands, ee_module)
 
 
-def landsat8_spectral_indices(img):
+def landsat8_spectral_indices(img, ee_module=None):
     """
     Function that computes several spectral indices for Landsat 8 sensor.
     The indices specifically focus in detecting vegetation phenology,
@@ -201,6 +126,8 @@ def landsat8_spectral_indices(img):
     ----------
     img : ee.image.Image
         Single Earth Engine L8 Image that needs adding the spectral indices
+    ee_module : module, optional
+        Module creating the constant images, as in compile_indices()
 
     Returns
     -------
@@ -208,15 +135,14 @@ def landsat8_spectral_indices(img):
         The image with the added indices as bands
     """
 
-    # Specifying the list of bands needed to compute the spectral indices
-    bands = {
-        'BLUE': 'B2',
-        'YELLOW': 'B3',
-        'RED': 'B4',
-        'NIR': 'B5',
-        'SWIR': 'B7',
-        'MIR': 'B8'
-    }
-
-    # Calling the function taht computes the spectral inidces
-    return get_landsat_indices(img, bands)
+    # Bands needed to compute the spectral indices
+    bands = SENSOR_BANDS['landsat8']
+
+    # Calling the function that computes the spectral indices
+    return get_landsat_indices(img, bands, ee_module)
+
+
+sentinel2_spectral_indices.key_parameters = {'index_sensor': 'sentinel2'}
+landsat57_spectral_indices.key_parameters = {'index_sensor': 'landsat8',
+                                             'band_sensor': 'landsat57'}
+landsat8_spectral_indices.key_parameters = {'index_sensor': 'landsat8'}
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script contains a registry of the spectral indices (NDVI, NDWI,
+# MNDWI, NDSI, NDMI, EVI, EVI2, GOSAVI, SAVI) and of the bands of each
+# sensor, and a function that compiles the indices requested into a single
+# band-math expression. All the indices used in this package have the form
+#
+#     SCALE * (P - Q) / (P + A * Q + B * R + C)
+#
+# so each index is declared by its formula (the coefficients SCALE, A, B
+# and C) and by the roles of its P, Q and R bands, which are mapped to the
+# bands of each sensor. The compiled function selects all the P, Q and R
+# bands at once and evaluates the indices with one ee.Image.expression over
+# multi-band images, instead of one normalizedDifference() or expression()
+# per index, so the computation graph of each image has the same (small)
+# number of nodes whatever the number of indices. The coefficients equal
+# for all the indices requested are written in the expression as numbers.
+# As normalizedDifference() does, the pixels where one of the bands of a
+# normalised difference is negative are masked.
+#
+# The compiled function can be called on a single image or used with the
+# .map() method on an ImageCollection. The count_graph_nodes() function
+# counts the nodes created by a function on an image, passing it a mock of
+# the ee module (as ee_module) so that the graphs can be compared without
+# Earth Engine.
+#
+# The tables of the indices (INDEX_FORMULAS, INDEX_DEFINITIONS and
+# SENSOR_BANDS) are declared in index_tables.py, which does not import ee,
+# and are re-exported here.
+#
+# Author: Davide Lomeo,
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import inspect
+import ee
+from .index_tables import INDEX_FORMULAS, INDEX_DEFINITIONS, SENSOR_BANDS
+
+__all__ = ['INDEX_FORMULAS', 'INDEX_DEFINITIONS', 'SENSOR_BANDS',
+           'compile_indices', 'add_indices', 'count_graph_nodes']
+
+
+def compile_indices(sensor, indices=None, bands=None, ee_module=None):
+    """
+    Function that compiles the indices requested into a single band-math
+    expression. The work on the registry is done once, and the function
+    returned only builds the fused expression, so it can be called on a
+    single image or used with the .map() method on an ImageCollection.
+
+    Parameters
+    ----------
+    sensor : str
+        'sentinel2', 'landsat57' or 'landsat8'
+    indices : list, optional
+        List of indices to compute (default all the indices, in the order
+        of the registry)
+    bands : dict, optional
+        Band of each role, in place of the bands of the sensor
+    ee_module : module, optional
+        Module creating the constant images (default the ee module), e.g.
+        the mock passed by count_graph_nodes(). The function returned also
+        accepts it as ee_module
+
+    Returns
+    -------
+    function
+        Function that adds the indices to the input image as bands
+    """
+
+    if sensor not in INDEX_DEFINITIONS:
+        print('ERROR: the sensor needs to be one of {}'.format(
+            list(INDEX_DEFINITIONS)))
+        return None
+
+    definitions = INDEX_DEFINITIONS[sensor]
+    if indices is None:
+        indices = list(definitions)
+
+    unknown = [i for i in indices if i not in definitions]
+    if unknown != []:
+        print('ERROR: {} are not valid indices'.format(unknown))
+        return None
+
+    # Parameters identifying the indices, e.g. in the keys of CompositeCache
+    key_parameters = {'index_sensor': sensor, 'indices': indices,
+                      'bands': bands}
+
+    if bands is None:
+        bands = SENSOR_BANDS[sensor]
+
+    # Bands selected as P, Q and R (P where the formula has no R band) and
+    # coefficients of the expression, one per index
+    selectors = {'P': [], 'Q': [], 'R': []}
+    coefficients = {'SCALE': [], 'A': [], 'B': [], 'C': []}
+    nd = []
+    try:
+        for name in indices:
+            formula, roles = definitions[name]
+            roles = roles + roles[:1] * (3 - len(roles))
+            for key, role in zip(selectors, roles):
+                selectors[key].append(bands[role])
+            for key, value in zip(coefficients, INDEX_FORMULAS[formula]):
+                coefficients[key].append(value)
+            nd.append(int(formula == 'nd'))
+    except KeyError as role:
+        print('ERROR: the band of the role {} is missing'.format(role))
+        return None
+
+    # The selected bands are renamed, as a band can have several roles
+    renamed = {key: ['{}{}'.format(key, i) for i in range(len(indices))]
+               for key in selectors}
+    expression, constants = _fuse_expression(coefficients)
+
+    def fused_indices(img, ee_module=ee_module):
+        "Function that adds the compiled indices to the input image"
+
+        if ee_module is None:
+            ee_module = ee
+
+        p = img.select(selectors['P'], renamed['P']).toFloat()
+        q = img.select(selectors['Q'], renamed['Q'])
+        variables = {'P': p, 'Q': q}
+        if 'R' in expression:
+            variables['R'] = img.select(selectors['R'], renamed['R'])
+        for key, values in constants.items():
+            variables[key] = ee_module.Image.constant(values)
+
+        fused = img.expression(expression, variables).rename(indices)
+
+        # Masking the normalised differences where a band is negative
+        if all(nd):
+            fused = fused.updateMask(p.min(q).gte(0))
+        elif any(nd):
+            fused = fused.updateMask(
+                p.min(q).gte(0).Or(ee_module.Image.constant(nd).Not()))
+
+        return img.addBands(fused)
+
+    fused_indices.key_parameters = key_parameters
+
+    return fused_indices
+
+
+def _fuse_expression(coefficients):
+    """
+    Helper function that writes the expression of the indices. The
+    coefficients equal for all the indices are written as numbers (and the
+    terms equal to 0 are dropped), the others are passed as constant
+    images with one band per index.
+    """
+
+    terms = {}
+    constants = {}
+    for key, values in coefficients.items():
+        if len(set(values)) == 1:
+            terms[key] = '{:g}'.format(values[0])
+        else:
+            terms[key] = key
+            constants[key] = values
+
+    denominator = ['P', '{} * Q'.format(terms['A'])]
+    if terms['B'] != '0':
+        denominator.append('{} * R'.format(terms['B']))
+    if terms['C'] != '0':
+        denominator.append(terms['C'])
+
+    expression = '{} * (P - Q) / ({})'.format(terms['SCALE'],
+                                                ' + '.join(denominator))
+
+    return expression, constants
+
+
+def add_indices(collection, sensor, indices=None):
+    """
+    Function that adds the indices requested to each image of the input
+    ImageCollection, compiling them once into a single expression.
+
+    Parameters
+    ----------
+    collection : ee.imagecollection.ImageCollection
+        Collection of images of the sensor
+    sensor : str
+        'sentinel2', 'landsat57' or 'landsat8'
+    indices : list, optional
+        List of indices to compute (default all the indices)
+
+    Returns
+    -------
+    ee.imagecollection.ImageCollection
+        The collection with the indices added to each image as bands
+    """
+
+    fused_indices = compile_indices(sensor, indices)
+    if fused_indices is None:
+        return None
+
+    return collection.map(fused_indices)
+
+
+class _MockEE:
+    "Mock of the ee module, creating the nodes of _MockImage"
+
+    def __init__(self):
+        self.nodes = []
+        self.Image = self
+
+    def constant(self, value):
+        return _MockImage(self, 'constant')
+
+
+class _MockImage:
+    "Mock of ee.Image, in which every method call creates a node"
+
+    def __init__(self, ee_mock, operation=None):
+        self.ee_mock = ee_mock
+        if operation is not None:
+            ee_mock.nodes.append(operation)
+
+    def __getattr__(self, operation):
+        if operation.startswith('_'):
+            raise AttributeError(operation)
+        return lambda *args, **kwargs: _MockImage(self.ee_mock, operation)
+
+
+def count_graph_nodes(function):
+    """
+    Function that counts the nodes of the computation graph that the input
+    function (e.g., a function compiled by compile_indices() or
+    sentinel2_spectral_indices()) builds for an image, so that the size of
+    the graphs sent to the server can be compared. The function is called
+    on a mock image and, if it accepts an ee_module argument, with a mock
+    of the ee module, so Earth Engine is not needed. Every operation
+    (method of the image or constant image) counts as a node.
+
+    Parameters
+    ----------
+    function : function
+        Function taking an ee.Image, as passed to the .map() method
+
+    Returns
+    -------
+    dict
+        Number of nodes created, in total and by operation
+    """
+
+    ee_mock = _MockEE()
+    if 'ee_module' in inspect.signature(function).parameters:
+        function(_MockImage(ee_mock), ee_module=ee_mock)
+    else:
+        function(_MockImage(ee_mock))
+    nodes = ee_mock.nodes
+
+    counts = {'total': len(nodes)}
+    for operation in sorted(set(nodes)):
+        counts[operation] = nodes.count(operation)
+
+    return counts
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script contains the tables of the spectral indices (NDVI, NDWI,
+# MNDWI, NDSI, NDMI, EVI, EVI2, GOSAVI, SAVI): the coefficients of each
+# formula, the roles of the bands of each index and the band of each role
+# for each sensor. All the indices have the form
+#
+#     SCALE * (P - Q) / (P + A * Q + B * R + C)
+#
+# The tables are plain data and the script does not import ee, so they are
+# the single place where the indices are declared: compile_indices() builds
+# the Earth Engine expression from them, and the SENSOR_INDICES map of the
+# eeCustomDeepTools package, which computes the indices in the input
+# pipeline, is tested against them.
+#
+# Author: Davide Lomeo,
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+__all__ = ['INDEX_FORMULAS', 'INDEX_DEFINITIONS', 'SENSOR_BANDS']
+
+# Coefficients SCALE, A, B and C of each formula
+INDEX_FORMULAS = {
+    'nd': (1, 1, 0, 0),
+    'evi': (2.5, 6, -7.5, 1),
+    'evi2': (2.4, 1, 0, 1),
+    'gosavi': (1, 1, 0, 0.16),
+    'savi': (1.5, 1, 0, 0.5)
+}
+
+# Indices computed for the Landsat sensors
+_LANDSAT_INDICES = {
+    'NDVI': ('nd', ['NIR', 'RED']),
+    'NDWI': ('nd', ['SWIR', 'NIR']),
+    'MNDWI': ('nd', ['SWIR', 'RED']),
+    'NDSI': ('nd', ['MIR', 'YELLOW']),
+    'NDMI': ('nd', ['SWIR', 'NIR']),
+    'EVI': ('evi', ['NIR', 'RED', 'BLUE']),
+    'EVI2': ('evi2', ['NIR', 'RED']),
+    'GOSAVI': ('gosavi', ['NIR', 'YELLOW']),
+    'SAVI': ('savi', ['NIR', 'RED'])
+}
+
+# Formula and roles of the P, Q (and R) bands of each index, for each sensor
+INDEX_DEFINITIONS = {
+    'sentinel2': {
+        'NDVI': ('nd', ['NIR', 'RED']),
+        'NDWI': ('nd', ['NIR', 'GREEN']),
+        'MNDWI': ('nd', ['SWIR1', 'GREEN']),
+        'NDSI': ('nd', ['SWIR2', 'SWIR1']),
+        'NDMI': ('nd', ['SWIR1', 'NIR']),
+        'EVI': ('evi', ['NIR', 'RED', 'BLUE']),
+        'EVI2': ('evi2', ['NIR', 'RED']),
+        'GOSAVI': ('gosavi', ['NIR', 'GREEN']),
+        'SAVI': ('savi', ['NIR', 'RED'])
+    },
+    'landsat57': _LANDSAT_INDICES,
+    'landsat8': _LANDSAT_INDICES
+}
+
+# Band of each role, for each sensor
+SENSOR_BANDS = {
+    'sentinel2': {'BLUE': 'B2', 'GREEN': 'B3', 'RED': 'B4', 'NIR': 'B8',
+                  'SWIR1': 'B11', 'SWIR2': 'B12'},
+    'landsat57': {'BLUE': 'B1', 'YELLOW': 'B2', 'RED': 'B3', 'NIR': 'B4',
+                  'SWIR': 'B5', 'MIR': 'B7'},
+    'landsat8': {'BLUE': 'B2', 'YELLOW': 'B3', 'RED': 'B4', 'NIR': 'B5',
+                 'SWIR': 'B7', 'MIR': 'B8'}
+}
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script contains an offline equivalent of the median composites
+# built in Earth Engine (cloud masking with mask_sentinel_clouds() and
+# .median() on the collection), for stacks of scenes already downloaded
+# locally. This avoids the queue of the export tasks when many small
+# regions need to be composited again.
+#
+# The pixels are masked with the same bits of the QA band as in Earth
+# Engine (decode_qa() of the qa_decoder module), scaled as done by
+# mask_sentinel_clouds() and set to NaN, and the median of each pixel is
+# computed over the scenes where it is not masked (NaN where it is masked
+# in all the scenes, as Earth Engine masks it). The stack is processed in
+# chunks of rows, in parallel on several threads, and the size of the
+# chunks is chosen so that the chunks processed at the same time fit in a
+# memory budget. The stack can be a np.memmap (e.g., of the GeoTIFFs
+# downloaded), in which case only the chunks being processed are read.
+#
+# Author: Davide Lomeo,
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from .qa_decoder import decode_qa, qa_bitmask
+
+__all__ = ['local_median_composite']
+
+# Copies of a chunk held in memory while computing its median (the masked
+# chunk, its sorted copy and the mask of the valid pixels)
+CHUNK_COPIES = 2.5
+
+
+def local_median_composite(scenes, qa=None, sensor='sentinel2', flags=None,
+                           scale_factor=10000, memory_budget=2 ** 30,
+                           workers=None):
+    """
+    Function that computes the median composite of a stack of scenes,
+    masking the pixels with the flags of their QA band as done in Earth
+    Engine.
+
+    Parameters
+    ----------
+    scenes : array
+        Stack of the scenes (scenes, height, width, bands), e.g., a
+        np.memmap
+    qa : array, optional
+        QA band of the scenes (scenes, height, width). If None, the scenes
+        are expected to be already masked, with NaN in the masked pixels
+    sensor : str, optional
+        Sensor of the QA band, as in decode_qa() (default 'sentinel2')
+    flags : list or dict, optional
+        Flags of the QA band, as in decode_qa() (default the clouds and
+        cirrus for Sentinel-2, as in mask_sentinel_clouds())
+    scale_factor : float, optional
+        Factor dividing the values of the scenes, as mask_sentinel_clouds()
+        does (default 10000)
+    memory_budget : int, optional
+        Memory in bytes for the chunks processed at the same time (default
+        1 GiB). The output composite is not included
+    workers : int, optional
+        Number of threads (default the number of cores)
+
+    Returns
+    -------
+    array
+        The median composite (height, width, bands) in float32
+    """
+
+    if np.ndim(scenes) != 4:
+        print('ERROR: the scenes need to be a 4D array '
+              '(scenes, height, width, bands)')
+        return None
+    elif (qa is not None) and (np.shape(qa) != np.shape(scenes)[:3]):
+        print('ERROR: the QA band needs to have the shape {}'.format(
+            np.shape(scenes)[:3]))
+        return None
+    elif (qa is not None) and (qa_bitmask(sensor, flags) is None):
+        return None
+
+    n_scenes, height, width, bands = np.shape(scenes)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Rows of a chunk, so that the chunks of all the workers fit the budget
+    row_bytes = n_scenes * width * bands * 4 * CHUNK_COPIES
+    rows = int(max(1, min(height, memory_budget // (workers * row_bytes))))
+
+    composite = np.empty((height, width, bands), np.float32)
+
+    def process(start):
+        "Function that computes the median of the chunk starting at a row"
+
+        chunk = np.array(scenes[:, start:start + rows], np.float32)
+        if scale_factor is not None:
+            chunk /= scale_factor
+        if qa is not None:
+            keep = decode_qa(np.asarray(qa[:, start:start + rows]), sensor,
+                             flags)
+            chunk[~keep] = np.nan
+        composite[start:start + rows] = _nanmedian(chunk)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(process, range(0, height, rows)))
+
+    return composite
+
+
+def _nanmedian(chunk):
+    """
+    Helper function that computes the median over the first axis, ignoring
+    the NaN. It is equivalent to np.nanmedian, but sorts the chunk once
+    (NaN are sorted last) and takes the middle values of each pixel
+    """
+
+    chunk.sort(axis=0)
+    valid = np.sum(~np.isnan(chunk), axis=0)
+
+    low = np.maximum((valid - 1) // 2, 0)[np.newaxis]
+    high = (valid // 2)[np.newaxis]
+    median = (np.take_along_axis(chunk, low, axis=0)[0] +
+              np.take_along_axis(chunk, high, axis=0)[0]) / 2
+
+    return np.where(valid > 0, median, np.nan)
@@ -4,7 +4,10 @@
 # This script contains functions that don't belong to a specific category.
 # The buffer_size function computes a buffer around the input ee.Element
 # whilst the get_metrics function returns the accuracy metrics of the input
-# classifier and test set.
+# classifier and test set. All the metrics requested are gathered into a
+# single ee.Dictionary, so they are retrieved from the server with a single
+# .getInfo() call, and the metrics retrieved are kept in memory for each
+# classifier and test set, so they are not requested again.
 #
 # Author: Davide Lomeo,
 # Email: davide.lomeo20@imperial.ac.uk
@@ -12,8 +15,17 @@
 # Date: 19 July 2021
 # Version: 0.1.0
 
+import ee
+
 __all__ = ['buffer_size', 'get_metrics']
 
+# Metrics available in get_metrics()
+METRICS = ['train_accuracy', 'test_accuracy', 'kappa_coefficient',
+           'producers_accuracy', 'consumers_accuracy', 'error_matrix']
+
+# Metrics already retrieved, by classifier, test set and class column
+_metrics_cache = {}
+
 
 def buffer_size(size):
     """
@@ -42,16 +54,16 @@ def buffer_size(size):
 
 
 def get_metrics(classifier, test_dataset, class_columns_name,
-                metrics=['error_matrix'], decimal=4):
+                metrics=['error_matrix'], decimal=4, use_cache=True):
     """
     Function that requires a trained classifier and a test set to return
     a dictionary that contains the chosen metrics. metrics available are:
     'train_accuracy', 'test_accuracy', 'kappa_coefficient',
     'producers_accuracy', 'consumers_accuracy', 'error_matrix'.
-    NOTE: use this function carefully, especially if wanting to return more
-    than one of the available metrics. This is because the values are retrieved
-    directly from the Google sevrer using the method .getInfo() and it may take
-    up to 15 minutes to get all the metrics.
+    All the chosen metrics are computed on the Google server and retrieved
+    together with a single .getInfo() call. The metrics retrieved are kept
+    in memory, so asking again for the metrics of the same classifier and
+    test set does not contact the server (unless use_cache is False).
 
     Parameters
     ----------
@@ -65,6 +77,8 @@ def get_metrics(classifier, test_dataset, class_columns_name,
         List of metrics to return as a dictionary
     decimal : int, optional
         Number of decimals for each figure
+    use_cache : bool, optional
+        Flag to reuse the metrics already retrieved (default True)
 
     Returns
     -------
@@ -72,19 +86,47 @@ def get_metrics(classifier, test_dataset, class_columns_name,
         A dictionary containing the selected metrics
     """
 
-    try:
-        # Clssification of the test dataset
-        test = test_dataset.classify(classifier)
-
-        # Accuracy of the training dataset classifier
-        training_accuracy = classifier.confusionMatrix().accuracy()
-
-        # Error matrix of the test set
-        error_matrix = test.errorMatrix(class_columns_name, 'classification')
+    for i in metrics:
+        if i not in METRICS:
+            print(
+                "'{}' isn't a valid metric. Please correct the input".format(i)
+            )
+            return None
 
-        # Computing consumers and producers accuracies
-        producers_accuracy = error_matrix.producersAccuracy()
-        consumers_accuracy = error_matrix.consumersAccuracy()
+    try:
+        # The classifier and test set are identified by their serialised
+        # form, which is computed locally
+        key = (classifier.serialize(), test_dataset.serialize(),
+               class_columns_name)
+
+        cached = _metrics_cache.get(key, {}) if use_cache else {}
+        missing = [i for i in metrics if i not in cached]
+
+        if missing != []:
+            # Clssification of the test dataset
+            test = test_dataset.classify(classifier)
+
+            # Error matrix of the test set
+            error_matrix = test.errorMatrix(class_columns_name,
+                                            'classification')
+
+            # Only the missing metrics are added to the server dictionary
+            server_dict = {}
+            for i in missing:
+                if i == 'train_accuracy':
+                    server_dict[i] = classifier.confusionMatrix().accuracy()
+                elif i == 'test_accuracy':
+                    server_dict[i] = error_matrix.accuracy()
+                elif i == 'kappa_coefficient':
+                    server_dict[i] = error_matrix.kappa()
+                elif i == 'producers_accuracy':
+                    server_dict[i] = error_matrix.producersAccuracy()
+                elif i == 'consumers_accuracy':
+                    server_dict[i] = error_matrix.consumersAccuracy()
+                elif i == 'error_matrix':
+                    server_dict[i] = error_matrix.array()
+
+            server_dict = ee.Dictionary(server_dict)
 
     except AttributeError:
         print("""
@@ -92,29 +134,26 @@ def get_metrics(classifier, test_dataset, class_columns_name,
         a ee.FeatureCollection and a string respectively""")
         return None
 
-    metrics_dict = {}
+    if missing != []:
+        # Single round trip to the server for all the missing metrics,
+        # merged with the metrics already retrieved
+        cached = _metrics_cache.setdefault(key, {})
+        cached.update(server_dict.getInfo())
 
+    metrics_dict = {}
     for i in metrics:
-        if i == 'train_accuracy':
-            metrics_dict[i] = round(training_accuracy.getInfo(), decimal)
-        elif i == 'test_accuracy:':
-            metrics_dict[i] = round(error_matrix.accuracy().getInfo(), decimal)
-        elif i == 'kappa_coefficient:':
-            metrics_dict[i] = round(error_matrix.kappa().getInfo(), decimal)
-        elif i == 'producers_accuracy':
-            metrics_dict[i] = producers_accuracy.getInfo()
-            for i, j in enumerate(metrics_dict['producers_accuracy'][0]):
-                metrics_dict['producers_accuracy'][0][i] = round(j, decimal)
-        elif i == 'consumers_accuracy':
-            metrics_dict[i] = consumers_accuracy.getInfo()
-            for i, j in enumerate(metrics_dict['consumers_accuracy'][0]):
-                metrics_dict['consumers_accuracy'][0][i] = round(j, decimal)
-        elif i == 'error_matrix':
-            metrics_dict[i] = error_matrix.getInfo()
+        if i == 'error_matrix':
+            metrics_dict[i] = cached[i]
         else:
-            print(
-                "'{}' isn't a valid metric. Please correct the input".format(i)
-            )
-            return None
+            metrics_dict[i] = _round_values(cached[i], decimal)
 
     return metrics_dict
+
+
+def _round_values(values, decimal):
+    "Helper function that rounds a number or the numbers of nested lists"
+
+    if isinstance(values, list):
+        return [_round_values(v, decimal) for v in values]
+
+    return round(values, decimal)
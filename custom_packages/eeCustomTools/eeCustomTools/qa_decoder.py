@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script contains a table of the bits of the quality assessment (QA)
+# bands of Sentinel-2 (QA60) and Landsat (pixel_qa of Collection 1 and
+# QA_PIXEL of Collection 2), and the functions that decode them.
+#
+# Each flag is a field of bits (first bit and number of bits), and any set
+# of flags, each with the value required to keep a pixel (0 to reject the
+# pixels flagged, e.g., as clouds), is compiled into one bitmask and one
+# value. A pixel is then kept if (QA & bitmask) == value, so the mask of an
+# image is computed with a single bitwiseAnd, a single comparison and a
+# single updateMask, whatever the number of flags, instead of one chain of
+# select/bitwiseAnd/rightShift and one updateMask per flag.
+#
+# The same bitmask is used to mask patches locally, with NumPy arrays or
+# TensorFlow tensors (e.g., the QA band exported with the patches), so the
+# pixels masked are the same as in Earth Engine.
+#
+# Author: Davide Lomeo,
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import numpy as np
+
+__all__ = ['QA_FLAGS', 'qa_bitmask', 'qa_mask', 'decode_qa',
+           'mask_qa_patches']
+
+# Landsat 4-7 Surface Reflectance pixel_qa (Collection 1)
+_PIXEL_QA = {'fill': (0, 1), 'clear': (1, 1), 'water': (2, 1),
+             'cloud_shadow': (3, 1), 'snow': (4, 1), 'cloud': (5, 1),
+             'cloud_confidence': (6, 2)}
+
+# QA band, flags (first bit, number of bits) and default flags rejected,
+# for each sensor
+QA_FLAGS = {
+    'sentinel2': {
+        'band': 'QA60',
+        'flags': {'opaque_clouds': (10, 1), 'cirrus': (11, 1)},
+        'default': ['opaque_clouds', 'cirrus']
+    },
+    'landsat57': {
+        'band': 'pixel_qa',
+        'flags': _PIXEL_QA,
+        'default': ['cloud_shadow', 'cloud']
+    },
+    'landsat8': {
+        'band': 'pixel_qa',
+        'flags': dict(_PIXEL_QA, cirrus_confidence=(8, 2),
+                      terrain_occlusion=(10, 1)),
+        'default': ['cloud_shadow', 'cloud']
+    },
+    'landsat_c2': {
+        'band': 'QA_PIXEL',
+        'flags': {'fill': (0, 1), 'dilated_cloud': (1, 1), 'cirrus': (2, 1),
+                  'cloud': (3, 1), 'cloud_shadow': (4, 1), 'snow': (5, 1),
+                  'clear': (6, 1), 'water': (7, 1),
+                  'cloud_confidence': (8, 2),
+                  'cloud_shadow_confidence': (10, 2),
+                  'snow_confidence': (12, 2),
+                  'cirrus_confidence': (14, 2)},
+        'default': ['dilated_cloud', 'cirrus', 'cloud', 'cloud_shadow']
+    }
+}
+
+
+def qa_bitmask(sensor, flags=None):
+    """
+    Function that compiles a set of flags of the QA band of a sensor into
+    one bitmask and one value, so that a pixel is kept if
+    (QA & bitmask) == value.
+
+    Parameters
+    ----------
+    sensor : str
+        'sentinel2', 'landsat57', 'landsat8' or 'landsat_c2'
+    flags : list or dict, optional
+        Flags that reject a pixel when set, or dictionary of the value of
+        each flag required to keep a pixel (default the clouds and, for
+        Landsat, their shadows)
+
+    Returns
+    -------
+    tuple
+        The name of the QA band, the bitmask and the value
+    """
+
+    if sensor not in QA_FLAGS:
+        print('ERROR: the sensor needs to be one of {}'.format(
+            list(QA_FLAGS)))
+        return None
+
+    table = QA_FLAGS[sensor]
+    if flags is None:
+        flags = table['default']
+    if not isinstance(flags, dict):
+        flags = {flag: 0 for flag in flags}
+
+    unknown = [f for f in flags if f not in table['flags']]
+    if unknown != []:
+        print('ERROR: {} are not valid flags for {}'.format(unknown, sensor))
+        return None
+
+    bitmask = 0
+    value = 0
+    for flag, required in flags.items():
+        start, width = table['flags'][flag]
+        if not 0 <= required < 2 ** width:
+            print('ERROR: the value of {} needs to fit in {} bit(s)'.format(
+                flag, width))
+            return None
+        bitmask |= (2 ** width - 1) << start
+        value |= required << start
+
+    return table['band'], bitmask, value
+
+
+def qa_mask(sensor, flags=None):
+    """
+    Function that returns a function masking the pixels of an image
+    according to the flags of its QA band, with a single bitmask
+    comparison and a single updateMask. The function returned can be
+    called on a single image or used with the .map() method on an
+    ImageCollection.
+
+    Parameters
+    ----------
+    sensor : str
+        'sentinel2', 'landsat57', 'landsat8' or 'landsat_c2'
+    flags : list or dict, optional
+        Flags that reject a pixel when set, or dictionary of the value of
+        each flag required to keep a pixel (default the clouds and, for
+        Landsat, their shadows)
+
+    Returns
+    -------
+    function
+        Function that returns the masked image
+    """
+
+    decoded = qa_bitmask(sensor, flags)
+    if decoded is None:
+        return None
+    band, bitmask, value = decoded
+
+    def mask_image(img):
+        "Function that masks the image with the compiled bitmask"
+
+        return img.updateMask(img.select(band).bitwiseAnd(bitmask).eq(value))
+
+    # Parameters identifying the mask, e.g. in the keys of CompositeCache
+    mask_image.key_parameters = {'qa_sensor': sensor, 'qa_flags': flags}
+
+    return mask_image
+
+
+def decode_qa(qa, sensor, flags=None):
+    """
+    Function that computes locally the mask of the pixels kept, from the
+    QA band of a patch or of a batch of patches. The QA band can be a
+    NumPy array or a TensorFlow tensor, of integers or of floats (as
+    exported in the TFRecords).
+
+    Parameters
+    ----------
+    qa : array or tensor
+        QA band of the patches
+    sensor : str
+        'sentinel2', 'landsat57', 'landsat8' or 'landsat_c2'
+    flags : list or dict, optional
+        Flags that reject a pixel when set, or dictionary of the value of
+        each flag required to keep a pixel (default the clouds and, for
+        Landsat, their shadows)
+
+    Returns
+    -------
+    array or tensor
+        Boolean mask, True where the pixel is kept
+    """
+
+    decoded = qa_bitmask(sensor, flags)
+    if decoded is None:
+        return None
+    _, bitmask, value = decoded
+
+    if isinstance(qa, (np.ndarray, list, int, float)):
+        return np.bitwise_and(np.asarray(qa).astype(np.int64),
+                              bitmask) == value
+
+    # TensorFlow is only needed to decode tensors
+    import tensorflow as tf
+
+    qa = tf.cast(qa, tf.int64)
+    return tf.equal(tf.bitwise.bitwise_and(qa, bitmask), value)
+
+
+def mask_qa_patches(features, sensor, flags=None, fill_value=0):
+    """
+    Function that masks locally the pixels of the patches according to the
+    flags of their QA band, setting all the bands (QA band included) to the
+    fill value written by Earth Engine in the masked pixels. The patches
+    can be NumPy arrays or TensorFlow tensors, so the function can be used
+    in a tf.data map.
+
+    Parameters
+    ----------
+    features : dict
+        Dictionary of the bands of a patch or of a batch of patches,
+        including the QA band
+    sensor : str
+        'sentinel2', 'landsat57', 'landsat8' or 'landsat_c2'
+    flags : list or dict, optional
+        Flags that reject a pixel when set, or dictionary of the value of
+        each flag required to keep a pixel (default the clouds and, for
+        Landsat, their shadows)
+    fill_value : float, optional
+        Value written in the masked pixels (default 0)
+
+    Returns
+    -------
+    dict
+        The dictionary of the masked bands
+    """
+
+    decoded = qa_bitmask(sensor, flags)
+    if decoded is None:
+        return None
+
+    band = decoded[0]
+    if band not in features:
+        print('ERROR: the {} band is missing'.format(band))
+        return None
+
+    keep = decode_qa(features[band], sensor, flags)
+
+    if isinstance(keep, np.ndarray):
+        return {k: np.where(keep, v, fill_value).astype(np.asarray(v).dtype)
+                for k, v in features.items()}
+
+    import tensorflow as tf
+
+    return {k: tf.where(keep, v, tf.cast(fill_value, v.dtype))
+            for k, v in features.items()}
@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script contains a class that monitors many Earth Engine export tasks
+# (ee.batch.Task) at once, replacing the loops that check one task at a
+# time with a fixed time.sleep(). Each task is checked by its own asyncio
+# coroutine, on a thread so that the requests to the server do not block
+# the others, and the time between two checks grows while the state of the
+# task does not change (backoff) and goes back to the minimum when it
+# changes. As soon as a task completes, its callback is run (e.g. to list
+# the exported TFRecords with GetFilesInfo.get_files), while the other
+# tasks are still monitored. A check that fails (e.g., a transient error of
+# the server) is retried later, so it does not stop the monitoring, while
+# the programming errors (e.g., a wrong task object) are raised.
+#
+# In a notebook, the monitor is run with: await monitor.watch()
+# In a script, the monitor is run with: monitor.run()
+#
+# Author: Davide Lomeo,
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 0.1.0
+
+import time
+import asyncio
+import inspect
+import functools
+
+__all__ = ['TaskMonitor']
+
+# States of a task that has finished
+FINISHED_STATES = ['COMPLETED', 'FAILED', 'CANCELLED']
+
+# Errors of the code rather than of the server, which are not retried
+PROGRAMMING_ERRORS = (AttributeError, TypeError, NameError)
+
+
+class TaskMonitor:
+    """
+    Class that monitors several Earth Engine export tasks concurrently and
+    runs a callback as soon as each task completes.
+
+    Parameters
+    ----------
+    min_interval : float, optional
+        Minimum time between two checks of a task in seconds (default 5)
+    max_interval : float, optional
+        Maximum time between two checks of a task in seconds (default 120)
+    backoff : float, optional
+        Factor increasing the time between two checks while the state of
+        the task does not change (default 1.5)
+    verbose : bool, optional
+        Flag to print the changes of state of the tasks (default True)
+    max_errors : int, optional
+        Number of consecutive failed checks of a task (e.g., a transient
+        error of the server) after which the task is no longer monitored
+        (default 5)
+
+    Functions
+    ---------
+    add(task, callback)
+        Add a task to monitor and the function to run once it completes
+    watch()
+        Coroutine that monitors the tasks until they have all finished
+    run()
+        Monitor the tasks until they have all finished (outside notebooks)
+    """
+
+    def __init__(self, min_interval=5, max_interval=120, backoff=1.5,
+                 verbose=True, max_errors=5):
+        "Class constructor"
+
+        super().__init__()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.verbose = verbose
+        self.max_errors = max_errors
+        self.__tasks = []
+
+    def add(self, task, callback=None):
+        """
+        Function that adds a task to the monitor. The callback is called
+        as callback(task, status) once the task completes, where status is
+        the dictionary returned by task.status(). It can be a function or a
+        coroutine function (async def). The callback is not called if the
+        task fails or is cancelled.
+
+        Parameters
+        ----------
+        task : ee.batch.Task
+            Started export task (or any object with a status() function)
+        callback : function, optional
+            Function to run once the task completes
+
+        Returns
+        -------
+        TaskMonitor
+            The monitor itself, so that the calls can be chained
+        """
+
+        if not callable(getattr(task, 'status', None)):
+            print('ERROR: the task needs to be an ee.batch.Task')
+            return None
+        elif (callback is not None) & (not callable(callback)):
+            print('ERROR: the callback needs to be a function')
+            return None
+
+        self.__tasks.append((task, callback))
+
+        return self
+
+    async def watch(self):
+        """
+        Coroutine that monitors all the tasks added until they have all
+        finished (and their callbacks have returned).
+
+        Returns
+        -------
+        dictionary
+            A dictionary with the ids of the tasks as keys and their final
+            status as values. The status of a task whose callback raised an
+            exception contains the exception under 'callback_error', and
+            the status of a task that could not be checked max_errors times
+            in a row has the state 'UNKNOWN' and the last exception under
+            'status_error'
+        """
+
+        # The errors of a task do not stop the monitoring of the others,
+        # and the programming errors are raised once all have finished
+        results = await asyncio.gather(
+            *[self.__watch_task(task, callback)
+              for task, callback in self.__tasks], return_exceptions=True)
+        for r in results:
+            if isinstance(r, PROGRAMMING_ERRORS):
+                raise r
+        results = [_error_status(task, r) if isinstance(r, Exception) else r
+                   for (task, _), r in zip(self.__tasks, results)]
+
+        return {status.get('id', str(i)): status
+                for i, status in enumerate(results)}
+
+    def run(self):
+        """
+        Function that monitors all the tasks added until they have all
+        finished. In notebooks, which already run an event loop, use
+        'await monitor.watch()' instead.
+
+        Returns
+        -------
+        dictionary
+            A dictionary with the ids of the tasks as keys and their final
+            status as values
+        """
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.watch())
+
+        print("ERROR: an event loop is already running (e.g., in a notebook). "
+              "Please use 'await monitor.watch()' instead")
+        return None
+
+    async def __watch_task(self, task, callback):
+        "Coroutine that checks a task until it finishes and runs its callback"
+
+        start = time.monotonic()
+        interval = self.min_interval
+        state = None
+        errors = 0
+
+        while True:
+            # Checking the status on a thread, as it requests the server.
+            # A failed check is retried later, backing off, up to
+            # max_errors times in a row
+            try:
+                status = await _run_on_thread(task.status)
+                errors = 0
+            except PROGRAMMING_ERRORS:
+                raise
+            except Exception as e:
+                errors += 1
+                print('ERROR: the check {} of task {} failed: {}'.format(
+                    errors, getattr(task, 'id', None), e))
+                if errors >= self.max_errors:
+                    return _error_status(task, e)
+                interval = min(interval * self.backoff, self.max_interval)
+                await asyncio.sleep(interval)
+                continue
+
+            if status['state'] != state:
+                state = status['state']
+                interval = self.min_interval
+                if self.verbose:
+                    print('Task {}: {} after {:.0f}s'.format(
+                        status.get('id'), state, time.monotonic() - start))
+            else:
+                interval = min(interval * self.backoff, self.max_interval)
+
+            if state in FINISHED_STATES:
+                break
+
+            await asyncio.sleep(interval)
+
+        if state != 'COMPLETED':
+            print('ERROR: task {} {}: {}'.format(
+                status.get('id'), state.lower(),
+                status.get('error_message', '')))
+            return status
+
+        if callback is not None:
+            try:
+                # Running plain functions on a thread, so that they do not
+                # stop the monitoring of the other tasks
+                if inspect.iscoroutinefunction(callback):
+                    await callback(task, status)
+                else:
+                    await _run_on_thread(callback, task, status)
+            except Exception as e:
+                print('ERROR: the callback of task {} failed: {}'.format(
+                    status.get('id'), e))
+                status = dict(status, callback_error=e)
+
+        return status
+
+
+async def _run_on_thread(function, *args):
+    """
+    Helper coroutine that runs a function on a thread of the default
+    executor (as asyncio.to_thread(), which needs Python 3.9)
+    """
+
+    return await asyncio.get_running_loop().run_in_executor(
+        None, functools.partial(function, *args))
+
+
+def _error_status(task, error):
+    "Helper function that returns the status of a task that failed checks"
+
+    return {'id': getattr(task, 'id', None), 'state': 'UNKNOWN',
+            'status_error': error}
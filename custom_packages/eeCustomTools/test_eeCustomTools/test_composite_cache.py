@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the cache of the median composites, using a local fake
+# store of the assets and a mock of the ee module recording the operations
+# of the composites, so that nothing is computed or exported in Earth
+# Engine.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+from eeCustomTools import CompositeCache, qa_mask, compile_indices, \
+                          composite_cache, QA_FLAGS, SENSOR_BANDS, \
+                          INDEX_DEFINITIONS
+
+
+class MockObject:
+    "Mock of an Earth Engine object, recording the operations applied"
+
+    def __init__(self, path):
+        self.path = path
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return MockObject('{}.{}'.format(self.path, name))
+
+    def __call__(self, *args, **kwargs):
+        names = [getattr(a, '__name__', repr(a)) for a in args]
+        return MockObject('{}({})'.format(self.path, ', '.join(names)))
+
+    def __repr__(self):
+        return self.path
+
+    def serialize(self):
+        return self.path
+
+
+class FakeAssetStore:
+    "Local fake store of the assets, whose exports complete on request"
+
+    def __init__(self):
+        self.assets = {}
+        self.running = {}
+        self.exports = 0
+
+    def exists(self, asset_id):
+        return asset_id in self.assets
+
+    def load(self, asset_id):
+        return ('asset', asset_id)
+
+    def pending(self, description):
+        return self.running.get(description)
+
+    def export(self, image, asset_id, description, region, scale):
+        self.exports += 1
+        self.running[description] = {'state': 'RUNNING',
+                                     'asset_id': asset_id, 'image': image}
+        return self.running[description]
+
+    def complete(self):
+        for task in self.running.values():
+            self.assets[task['asset_id']] = task['image']
+        self.running = {}
+
+
+def test_composite_cache(monkeypatch):
+    "Testing the CompositeCache class"
+
+    monkeypatch.setattr(composite_cache, 'ee', MockObject('ee'))
+
+    store = FakeAssetStore()
+    cache = CompositeCache('users/name/cache/', store)
+    roi = MockObject('roi')
+    parameters = ('COPERNICUS/S2', '2018-01-01', '2018-12-31', roi)
+
+    def identity(img):
+        return img
+
+    # Miss: the composite is built and exported
+    composite_1, task_1 = cache.get(*parameters, indices_function=identity)
+
+    # The export is running: no other export is started
+    composite_2, task_2 = cache.get(*parameters, indices_function=identity)
+
+    # Hit: the composite is loaded from its asset
+    store.complete()
+    composite_3, task_3 = cache.get(*parameters, indices_function=identity)
+
+    key = cache.key(*parameters, indices_function=identity)
+    asset_id = 'users/name/cache/composite_' + key[:16]
+
+    assert composite_1.path == (
+        "ee.ImageCollection('COPERNICUS/S2').filterDate('2018-01-01', "
+        "'2018-12-31').filterBounds(roi).filter(ee.Filter.lt("
+        "'CLOUDY_PIXEL_PERCENTAGE', 30)).map(mask_sentinel_clouds)"
+        ".median().clip(roi)")
+    assert task_1['asset_id'] == asset_id
+    assert task_1['image'].path.endswith(".set('composite_key', '{}')".format(
+        key))
+    assert task_2 is None
+    assert composite_2.path == composite_1.path
+    assert (composite_3, task_3) == (('asset', asset_id), None)
+    assert store.exports == 1
+
+    # The key changes with any of the parameters
+    keys = {
+        key,
+        cache.key(*parameters),
+        cache.key('COPERNICUS/S2_SR', *parameters[1:],
+                  indices_function=identity),
+        cache.key(*parameters[:3], MockObject('other_roi'),
+                  indices_function=identity),
+        cache.key(*parameters, max_cloud=20, indices_function=identity),
+        cache.key(*parameters, mask_function=qa_mask('sentinel2'),
+                  indices_function=identity),
+        cache.key(*parameters, mask_function=qa_mask('sentinel2', ['cirrus']),
+                  indices_function=identity),
+        cache.key(*parameters, scale=20, indices_function=identity)
+    }
+
+    assert len(keys) == 8
+    assert cache.key(*parameters, indices_function=identity) == key
+
+    # The key follows the tables of the QA flags and of the indices
+    key_1 = cache.key(*parameters)
+    monkeypatch.setitem(QA_FLAGS['sentinel2'], 'default', ['opaque_clouds'])
+    key_2 = cache.key(*parameters)
+    monkeypatch.setitem(SENSOR_BANDS['sentinel2'], 'NIR', 'B8A')
+    key_3 = cache.key(*parameters)
+    monkeypatch.setitem(INDEX_DEFINITIONS['sentinel2'], 'NDVI',
+                        ('savi', ['NIR', 'RED']))
+    key_4 = cache.key(*parameters)
+    key_5 = cache.key(*parameters, indices_function=compile_indices(
+        'sentinel2', ['NDVI']))
+    key_6 = cache.key(*parameters, indices_function=compile_indices(
+        'sentinel2', ['NDVI'], {'NIR': 'B8A', 'RED': 'B4'}))
+
+    assert len({key_1, key_2, key_3, key_4, key_5}) == 5
+    assert key_6 == key_5
+
+    # The other functions are identified by their name and the version
+    def mask(img):
+        return img
+
+    key_7 = cache.key(*parameters, mask_function=mask)
+    key_8 = cache.key(*parameters, mask_function=mask, version='2')
+
+    assert key_7 != key_8
+    assert cache.key(*parameters, mask_function=mask) == key_7
+
+    return
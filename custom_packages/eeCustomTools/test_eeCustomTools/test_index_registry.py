@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the registry of the spectral indices and the functions
+# that compile them into a single expression.
+#
+# The compiled expression is evaluated with a NumPy mock of ee.Image (and
+# of the ee module, passed as ee_module), so that the indices can be
+# checked against the formulas of the indices without Earth Engine, and the
+# size of the computation graphs is checked with the count_graph_nodes()
+# function.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import numpy as np
+from eeCustomTools import compile_indices, add_indices, count_graph_nodes, \
+                          sentinel2_spectral_indices, \
+                          landsat8_spectral_indices, get_landsat_indices
+
+
+class NumpyImage:
+    "Mock of ee.Image evaluating the band math with NumPy"
+
+    def __init__(self, data, names):
+        self.data = np.asarray(data, dtype=np.float64)
+        self.names = list(names)
+
+    @staticmethod
+    def constant(values):
+        values = np.reshape(values, (-1, 1, 1))
+        return NumpyImage(values, ['constant'] * len(values))
+
+    def select(self, selectors, names=None):
+        data = [self.data[self.names.index(b)] for b in selectors]
+        return NumpyImage(data, names or selectors)
+
+    def toFloat(self):
+        return self
+
+    def expression(self, expression, variables):
+        data = eval(expression, {}, {k: v.data for k, v in variables.items()})
+        return NumpyImage(data, ['expression'] * len(data))
+
+    def rename(self, names):
+        return NumpyImage(self.data, names)
+
+    def min(self, other):
+        return NumpyImage(np.minimum(self.data, other.data), self.names)
+
+    def gte(self, value):
+        return NumpyImage(self.data >= value, self.names)
+
+    def Or(self, other):
+        return NumpyImage((self.data != 0) | (other.data != 0), self.names)
+
+    def Not(self):
+        return NumpyImage(self.data == 0, self.names)
+
+    def updateMask(self, mask):
+        return NumpyImage(np.where(mask.data != 0, self.data, np.nan),
+                          self.names)
+
+    def addBands(self, other):
+        return NumpyImage(np.concatenate([self.data, other.data]),
+                          self.names + other.names)
+
+
+class MockEE:
+    "Mock of the ee module"
+    Image = NumpyImage
+
+
+class MockCollection:
+    "Mock of ee.ImageCollection"
+
+    def __init__(self, images):
+        self.images = images
+
+    def map(self, function):
+        return MockCollection([function(img) for img in self.images])
+
+
+def nd(a, b):
+    "Normalised difference, masked where a band is negative"
+    return np.where((a < 0) | (b < 0), np.nan, (a - b) / (a + b))
+
+
+def test_compile_indices():
+    "Testing the compile_indices() and add_indices() functions"
+
+    rng = np.random.default_rng(0)
+    bands = ['B2', 'B3', 'B4', 'B8', 'B11', 'B12']
+    img = NumpyImage(rng.random((6, 4, 4)) + 0.1, bands)
+    img.data[1, 0, 0] = -0.05
+    b = dict(zip(bands, img.data))
+
+    function_output_1 = compile_indices('sentinel2', ee_module=MockEE())(img)
+    function_output_2 = compile_indices('sentinel2', ['SAVI', 'NDVI'],
+                                        ee_module=MockEE())(img)
+    function_output_3 = add_indices(MockCollection([img]), 'sentinel2',
+                                    ['NDWI'])
+    function_output_4 = compile_indices('landsat9')
+    function_output_5 = compile_indices('sentinel2', ['NDVI', 'NDBI'])
+    function_output_6 = compile_indices('landsat8', bands={'NIR': 'B5'})
+    function_output_7 = get_landsat_indices(img, {'NIR': 'B5'})
+
+    expected = {
+        'NDVI': nd(b['B8'], b['B4']),
+        'NDWI': nd(b['B8'], b['B3']),
+        'MNDWI': nd(b['B11'], b['B3']),
+        'NDSI': nd(b['B12'], b['B11']),
+        'NDMI': nd(b['B11'], b['B8']),
+        'EVI': 2.5 * ((b['B8'] - b['B4']) /
+                      (b['B8'] + 6 * b['B4'] - 7.5 * b['B2'] + 1)),
+        'EVI2': 2.4 * ((b['B8'] - b['B4']) / (b['B8'] + b['B4'] + 1)),
+        'GOSAVI': (b['B8'] - b['B3']) / (b['B8'] + b['B3'] + 0.16),
+        'SAVI': 1.5 * (b['B8'] - b['B4']) / (b['B8'] + b['B4'] + 0.5)
+    }
+
+    assert function_output_1.names == bands + list(expected)
+    for k, v in expected.items():
+        np.testing.assert_allclose(
+            function_output_1.select([k]).data[0], v)
+
+    assert function_output_2.names == bands + ['SAVI', 'NDVI']
+    np.testing.assert_allclose(function_output_2.select(['SAVI']).data[0],
+                               expected['SAVI'])
+    np.testing.assert_allclose(function_output_2.select(['NDVI']).data[0],
+                               expected['NDVI'])
+    ndwi = function_output_3.images[0].select(['NDWI']).data[0]
+    np.testing.assert_allclose(ndwi, expected['NDWI'])
+    assert np.isnan(ndwi[0, 0])
+    assert function_output_4 is None
+    assert function_output_5 is None
+    assert function_output_6 is None
+    assert function_output_7 is None
+
+    return
+
+
+def test_count_graph_nodes():
+    "Testing the count_graph_nodes() function"
+
+    function_output_1 = count_graph_nodes(sentinel2_spectral_indices)
+    function_output_2 = count_graph_nodes(landsat8_spectral_indices)
+    function_output_3 = count_graph_nodes(compile_indices('sentinel2',
+                                                          ['NDVI']))
+    function_output_4 = count_graph_nodes(compile_indices(
+        'sentinel2', ['NDVI', 'NDWI', 'MNDWI', 'NDSI', 'NDMI']))
+
+    # One expression for all the indices, and no normalised differences
+    assert function_output_1['expression'] == 1
+    assert 'normalizedDifference' not in function_output_1
+    assert function_output_1['total'] == 17
+    assert function_output_2 == function_output_1
+
+    # The graph does not grow with the number of indices
+    assert function_output_3['total'] == 9
+    assert function_output_4 == function_output_3
+
+    return
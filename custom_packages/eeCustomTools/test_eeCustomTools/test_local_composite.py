@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the local median composite of a stack of scenes,
+# against np.nanmedian on the scenes masked with the QA60 bits used by
+# mask_sentinel_clouds(), with chunks of different sizes and several
+# threads, and with a stack stored in a np.memmap.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import warnings
+import numpy as np
+from eeCustomTools import local_median_composite
+
+
+def test_local_median_composite(tmp_path):
+    "Testing the local_median_composite() function"
+
+    rng = np.random.default_rng(0)
+    scenes = rng.integers(0, 10000, (6, 20, 8, 3)).astype(np.uint16)
+
+    # Clear, opaque clouds (bit 10) and cirrus (bit 11) pixels, with one
+    # pixel cloudy in all the scenes
+    qa = rng.choice([0, 1024, 2048], (6, 20, 8), p=[0.6, 0.2, 0.2])
+    qa[:, 0, 0] = 1024
+
+    masked = np.where((qa == 0)[..., np.newaxis], scenes / 10000, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        expected = np.nanmedian(masked, axis=0)
+
+    stack = np.memmap(tmp_path / 'scenes.dat', np.uint16, 'w+',
+                      shape=scenes.shape)
+    stack[:] = scenes
+
+    function_output_1 = local_median_composite(scenes, qa)
+    function_output_2 = local_median_composite(
+        stack, qa, memory_budget=6 * 8 * 3 * 4 * 3 * 2, workers=2)
+    function_output_3 = local_median_composite(masked, scale_factor=None,
+                                               memory_budget=1, workers=3)
+    function_output_4 = local_median_composite(scenes[0], qa)
+    function_output_5 = local_median_composite(scenes, qa[:, :10])
+    function_output_6 = local_median_composite(scenes, qa, 'landsat9')
+
+    for output in [function_output_1, function_output_2, function_output_3]:
+        assert output.shape == (20, 8, 3)
+        assert output.dtype == np.float32
+        np.testing.assert_allclose(output, expected, rtol=1e-6)
+        assert np.isnan(output[0, 0]).all()
+    assert function_output_4 is None
+    assert function_output_5 is None
+    assert function_output_6 is None
+
+    return
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the get_metrics function using a mock of the ee module
+# and of the classifier and test set, which count the requests sent to the
+# server, so that no classifier needs to be trained in Earth Engine.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+from eeCustomTools import get_metrics, other_functions
+
+
+class MockObject:
+    "Server-side object holding a value, counting the getInfo() calls"
+
+    def __init__(self, ee, value):
+        self.ee = ee
+        self.value = value
+
+    def getInfo(self):
+        self.ee.requests += 1
+        return self.value
+
+
+class MockEE:
+    "Mock of the ee module, counting the requests sent to the server"
+
+    def __init__(self):
+        self.requests = 0
+
+    def Dictionary(self, objects):
+        return MockObject(self, {k: v.value for k, v in objects.items()})
+
+
+class MockErrorMatrix:
+    "Mock of ee.ConfusionMatrix"
+
+    def __init__(self, ee):
+        self.ee = ee
+
+    def accuracy(self):
+        return MockObject(self.ee, 0.912345)
+
+    def kappa(self):
+        return MockObject(self.ee, 0.854321)
+
+    def producersAccuracy(self):
+        return MockObject(self.ee, [[0.912345], [0.812345]])
+
+    def consumersAccuracy(self):
+        return MockObject(self.ee, [[0.712345, 0.612345]])
+
+    def array(self):
+        return MockObject(self.ee, [[10, 1], [2, 9]])
+
+
+class MockClassifier:
+    "Mock of a trained ee.Classifier"
+
+    def __init__(self, ee, name):
+        self.ee = ee
+        self.name = name
+
+    def serialize(self):
+        return self.name
+
+    def confusionMatrix(self):
+        return MockErrorMatrix(self.ee)
+
+
+class MockTestDataset:
+    "Mock of the ee.FeatureCollection of the test set"
+
+    def __init__(self, ee):
+        self.ee = ee
+
+    def serialize(self):
+        return 'test_dataset'
+
+    def classify(self, classifier):
+        return self
+
+    def errorMatrix(self, actual, predicted):
+        return MockErrorMatrix(self.ee)
+
+
+def test_get_metrics(monkeypatch):
+    "Testing the get_metrics() function"
+
+    ee = MockEE()
+    monkeypatch.setattr(other_functions, 'ee', ee)
+
+    classifier_1 = MockClassifier(ee, 'classifier_1')
+    classifier_2 = MockClassifier(ee, 'classifier_2')
+    test_dataset = MockTestDataset(ee)
+
+    function_output_1 = get_metrics(
+        classifier_1, test_dataset, 'classes', other_functions.METRICS, 2)
+    requests_1 = ee.requests
+
+    function_output_2 = get_metrics(
+        classifier_1, test_dataset, 'classes', ['kappa_coefficient'])
+    requests_2 = ee.requests
+
+    function_output_3 = get_metrics(
+        classifier_2, test_dataset, 'classes', ['test_accuracy'])
+    function_output_4 = get_metrics(
+        classifier_1, test_dataset, 'classes', ['test_accuracy:'])
+    function_output_5 = get_metrics(
+        'classifier', test_dataset, 'classes', ['test_accuracy'])
+
+    # Metrics retrieved again without the cache are merged with the others
+    get_metrics(classifier_2, test_dataset, 'classes', ['kappa_coefficient'],
+                use_cache=False)
+    function_output_6 = get_metrics(
+        classifier_2, test_dataset, 'classes',
+        ['test_accuracy', 'kappa_coefficient'])
+
+    assert requests_1 == 1
+    assert requests_2 == 1
+    assert ee.requests == 3
+    assert function_output_1 == {
+        'train_accuracy': 0.91,
+        'test_accuracy': 0.91,
+        'kappa_coefficient': 0.85,
+        'producers_accuracy': [[0.91], [0.81]],
+        'consumers_accuracy': [[0.71, 0.61]],
+        'error_matrix': [[10, 1], [2, 9]]
+    }
+    assert function_output_2 == {'kappa_coefficient': 0.8543}
+    assert function_output_3 == {'test_accuracy': 0.9123}
+    assert function_output_4 is None
+    assert function_output_5 is None
+    assert function_output_6 == {'test_accuracy': 0.9123,
+                                 'kappa_coefficient': 0.8543}
+
+    return
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the functions that decode the QA bands of Sentinel-2
+# and Landsat.
+#
+# The bitmasks are checked against the bits of the flags, the masks are
+# computed locally on NumPy arrays and TensorFlow tensors, and on a NumPy
+# mock of ee.Image for the cloud masking functions, whose computation
+# graphs are checked with the count_graph_nodes() function.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import numpy as np
+import tensorflow as tf
+from eeCustomTools import qa_bitmask, qa_mask, decode_qa, mask_qa_patches, \
+                          mask_sentinel_clouds, mask_landsat_clouds, \
+                          count_graph_nodes
+
+
+class NumpyImage:
+    "Mock of ee.Image evaluating the masks with NumPy"
+
+    def __init__(self, bands, mask=True):
+        self.bands = bands
+        self.mask = mask
+
+    def select(self, band):
+        return NumpyImage({band: self.bands[band]}, self.mask)
+
+    def bitwiseAnd(self, value):
+        band, = self.bands
+        return NumpyImage({band: self.bands[band].astype(int) & value})
+
+    def eq(self, value):
+        band, = self.bands
+        return NumpyImage({band: self.bands[band] == value})
+
+    def updateMask(self, mask):
+        band, = mask.bands
+        return NumpyImage(self.bands, self.mask & mask.bands[band])
+
+    def divide(self, value):
+        return NumpyImage({k: v / value for k, v in self.bands.items()},
+                          self.mask)
+
+
+def test_qa_bitmask():
+    "Testing the qa_bitmask() and qa_mask() functions"
+
+    function_output_1 = qa_bitmask('sentinel2')
+    function_output_2 = qa_bitmask('landsat8', ['cloud', 'cloud_shadow'])
+    function_output_3 = qa_bitmask('landsat_c2', {'cloud_confidence': 1,
+                                                  'clear': 1})
+    function_output_4 = qa_bitmask('landsat9')
+    function_output_5 = qa_bitmask('landsat57', ['cirrus'])
+    function_output_6 = qa_bitmask('landsat57', {'cloud_confidence': 4})
+    function_output_7 = qa_mask('sentinel2', ['clouds'])
+
+    assert function_output_1 == ('QA60', 2 ** 10 + 2 ** 11, 0)
+    assert function_output_2 == ('pixel_qa', 2 ** 3 + 2 ** 5, 0)
+    assert function_output_3 == ('QA_PIXEL', 3 * 2 ** 8 + 2 ** 6,
+                                 2 ** 8 + 2 ** 6)
+    assert function_output_4 is None
+    assert function_output_5 is None
+    assert function_output_6 is None
+    assert function_output_7 is None
+
+    return
+
+
+def test_decode_qa():
+    "Testing the decode_qa() and mask_qa_patches() functions"
+
+    # Clear, opaque clouds, cirrus, both, and a bit not used for clouds
+    qa = np.array([[0, 1024, 2048], [3072, 1, 0]], np.float32)
+    expected = np.array([[True, False, False], [False, True, True]])
+    features = {'B2': np.ones((2, 3), np.float32) * 0.3, 'QA60': qa}
+
+    function_output_1 = decode_qa(qa, 'sentinel2')
+    function_output_2 = decode_qa(tf.constant(qa), 'sentinel2')
+    function_output_3 = mask_qa_patches(features, 'sentinel2')
+    function_output_4 = mask_qa_patches(
+        {k: tf.constant(v) for k, v in features.items()}, 'sentinel2')
+    function_output_5 = mask_qa_patches({'B2': qa}, 'sentinel2')
+
+    np.testing.assert_array_equal(function_output_1, expected)
+    np.testing.assert_array_equal(function_output_2.numpy(), expected)
+    for output in [function_output_3, function_output_4]:
+        np.testing.assert_allclose(np.asarray(output['B2']),
+                                   np.where(expected, 0.3, 0))
+        np.testing.assert_allclose(np.asarray(output['QA60']),
+                                   np.where(expected, qa, 0))
+    assert function_output_5 is None
+
+    return
+
+
+def test_cloud_masking_graph():
+    "Testing the masks and graphs of the cloud masking functions"
+
+    # Clear, cloud shadows (bit 3), clouds (bit 5), and water (bit 2)
+    pixel_qa = np.array([0, 8, 32, 4])
+    qa60 = np.array([0, 1024, 2048, 1])
+    landsat = NumpyImage({'pixel_qa': pixel_qa})
+    sentinel = NumpyImage({'QA60': qa60, 'B2': np.full(4, 1000.0)})
+
+    function_output_1 = mask_landsat_clouds(landsat)
+    function_output_2 = mask_sentinel_clouds(sentinel)
+    function_output_3 = count_graph_nodes(mask_landsat_clouds)
+    function_output_4 = count_graph_nodes(mask_sentinel_clouds)
+    function_output_5 = count_graph_nodes(
+        qa_mask('landsat_c2', ['cloud', 'cloud_shadow', 'cirrus', 'snow']))
+
+    assert function_output_1.mask.tolist() == [True, False, False, True]
+    assert function_output_2.mask.tolist() == [True, False, False, True]
+    np.testing.assert_allclose(function_output_2.bands['B2'], 0.1)
+
+    # One bitmask comparison and one updateMask, whatever the flags
+    assert function_output_3 == {'total': 4, 'bitwiseAnd': 1, 'eq': 1,
+                                 'select': 1, 'updateMask': 1}
+    assert function_output_4['total'] == 5
+    assert function_output_5 == function_output_3
+
+    return
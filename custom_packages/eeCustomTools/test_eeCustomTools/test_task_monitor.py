@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This script tests the TaskMonitor class using fake export tasks, which
+# go through a given list of states (one per call of status()), and whose
+# checks can fail, so that no export needs to be started in Earth Engine.
+#
+# Author: Davide Lomeo
+# Email: davide.lomeo20@imperial.ac.uk
+# GitHub: https://github.com/acse-2020/acse2020-acse9-finalreport-acse-dl1420-3
+# Date: 17 October 2026
+# Version: 1.0
+
+import asyncio
+from eeCustomTools import TaskMonitor
+
+
+class FakeTask:
+    "Task returning the next state of the input list at every status()"
+
+    def __init__(self, task_id, states, failed_checks=()):
+        self.id = task_id
+        self.states = list(states)
+        self.failed_checks = failed_checks
+        self.checks = 0
+        self.calls = 0
+
+    def status(self):
+        self.calls += 1
+        if self.calls in self.failed_checks:
+            raise ConnectionError('Server unavailable')
+        state = self.states[min(self.checks, len(self.states) - 1)]
+        self.checks += 1
+        status = {'id': self.id, 'state': state}
+        if state == 'FAILED':
+            status['error_message'] = 'Export too large'
+        return status
+
+
+def test_task_monitor():
+    "Testing the TaskMonitor class"
+
+    short_task = FakeTask('short', ['READY', 'RUNNING', 'COMPLETED'])
+    long_task = FakeTask('long', ['READY'] + ['RUNNING'] * 10 +
+                         ['COMPLETED'])
+    failed_task = FakeTask('failed', ['READY', 'FAILED'])
+
+    # Checking that a task is completed as soon as the callback starts
+    finished = []
+
+    def callback(task, status):
+        finished.append((task.id, long_task.checks))
+
+    async def async_callback(task, status):
+        finished.append((task.id, long_task.checks))
+
+    monitor = TaskMonitor(min_interval=0.01, max_interval=0.02, backoff=2,
+                          verbose=False)
+    monitor.add(short_task, callback).add(long_task, async_callback)
+    monitor.add(failed_task, callback)
+
+    function_output_1 = monitor.run()
+    function_output_2 = monitor.add(FakeTask('task', ['READY']), 'callback')
+    function_output_3 = monitor.add('task')
+
+    assert function_output_1['short']['state'] == 'COMPLETED'
+    assert function_output_1['long']['state'] == 'COMPLETED'
+    assert function_output_1['failed']['state'] == 'FAILED'
+    assert [f[0] for f in finished] == ['short', 'long']
+    assert finished[0][1] < 12
+    assert long_task.checks == 12
+    assert function_output_2 is None
+    assert function_output_3 is None
+
+    # A failing callback is reported in the status of the task
+    def wrong_callback(task, status):
+        raise ValueError('wrong callback')
+
+    monitor = TaskMonitor(min_interval=0.01, verbose=False)
+    monitor.add(FakeTask('task', ['COMPLETED']), wrong_callback)
+
+    function_output_4 = asyncio.run(monitor.watch())
+
+    assert isinstance(function_output_4['task']['callback_error'],
+                      ValueError)
+
+    return
+
+
+def test_task_monitor_errors():
+    "Testing the TaskMonitor class with checks failing"
+
+    finished = []
+
+    def callback(task, status):
+        finished.append(task.id)
+
+    # A task whose check fails once, and a task always failing
+    flaky_task = FakeTask('flaky', ['READY', 'RUNNING', 'COMPLETED'],
+                          failed_checks=[2])
+    broken_task = FakeTask('broken', ['READY'], failed_checks=range(100))
+    other_task = FakeTask('other', ['RUNNING', 'COMPLETED'])
+
+    monitor = TaskMonitor(min_interval=0.01, max_interval=0.02,
+                          verbose=False, max_errors=3)
+    monitor.add(flaky_task, callback).add(broken_task, callback)
+    monitor.add(other_task, callback)
+
+    function_output_1 = monitor.run()
+
+    assert function_output_1['flaky']['state'] == 'COMPLETED'
+    assert function_output_1['other']['state'] == 'COMPLETED'
+    assert function_output_1['broken']['state'] == 'UNKNOWN'
+    assert isinstance(function_output_1['broken']['status_error'],
+                      ConnectionError)
+    assert broken_task.calls == 3
+    assert sorted(finished) == ['flaky', 'other']
+
+    # A programming error is raised rather than retried
+    wrong_task = FakeTask('wrong', ['READY'])
+    wrong_task.status = lambda: wrong_task.states.state
+    monitor = TaskMonitor(min_interval=0.01, verbose=False, max_errors=3)
+    monitor.add(wrong_task).add(FakeTask('task', ['COMPLETED']))
+
+    try:
+        monitor.run()
+        raised = None
+    except AttributeError as e:
+        raised = e
+
+    assert isinstance(raised, AttributeError)
+
+    return